@@ -1,12 +1,29 @@
 #!/usr/bin/env python3
 """
 Convert the remaining JSON files that weren't processed
+
+Batch mode (--batch DIR) recursively discovers video-analysis JSON files and
+converts them on a worker pool, skipping files whose Markdown is already current.
 """
 
+import argparse
 import json
 import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Top-level keys read by convert_json_to_markdown. A JSON file with none of them
+# is not a video analysis.
+ANALYSIS_KEYS = (
+    'videoTitle', 'videoUrl', 'analysisTimestamp', 'coreTopicsDiscussed',
+    'advocatedProcesses', 'faeIntelligenceStrategicInsights', 'generalVideoSummary',
+)
+STREAM_CHUNK_SIZE = 1024 * 1024
+# The pipeline modules (record_stream.py for --streaming)
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+
 def convert_json_to_markdown(json_data, filename):
     """Convert JSON video analysis to structured markdown"""
     
@@ -106,9 +123,166 @@ def convert_json_to_markdown(json_data, filename):
     
     return '\n'.join(md_content)
 
-def main():
+def load_analysis_streaming(json_file, keys=ANALYSIS_KEYS, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Reads the top-level object of a JSON file incrementally, keeping only `keys`.
+
+    Values of other keys (e.g. full transcripts) are decoded one at a time and
+    dropped, so peak memory is bounded by the largest single value rather than the
+    whole file. Uses the incremental decoder of scripts/record_stream.py.
+
+    Returns:
+        dict: The wanted top-level keys, or None if the file is not a JSON object.
+    """
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.append(SCRIPTS_DIR)
+    from record_stream import is_json_object, iter_json_object
+
+    if not is_json_object(json_file):
+        return None
+    wanted = set(keys)
+    return {key: value for key, value in iter_json_object(json_file, chunk_size) if key in wanted}
+
+def output_path_for(json_file, output_dir=None, root=None):
+    """
+    Returns the Markdown path for `json_file`: next to it, or under `output_dir`.
+    With `root`, the file's directory relative to `root` is kept under
+    `output_dir`, so equally named files from different folders do not collide.
+    """
+    base_name = os.path.splitext(os.path.basename(json_file))[0]
+    safe_name = base_name.replace("'", "").replace(" ", "_")
+    directory = os.path.dirname(json_file)
+    if output_dir:
+        relative_dir = os.path.relpath(directory, root) if root else os.curdir
+        directory = os.path.normpath(os.path.join(output_dir, relative_dir))
+    return os.path.join(directory, f"{safe_name}_analysis.md")
+
+def find_output_collisions(json_files, output_dir=None, root=None):
+    """
+    Returns {output path: [json files]} for every output path that more than one
+    input file would be written to.
+    """
+    sources = {}
+    for json_file in json_files:
+        sources.setdefault(output_path_for(json_file, output_dir, root), []).append(json_file)
+    return {output_file: files for output_file, files in sources.items() if len(files) > 1}
+
+def discover_json_files(root):
+    """
+    Recursively lists the .json files under `root`, in sorted order.
+    """
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        found.extend(os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith('.json'))
+    return found
+
+def convert_file(json_file, output_dir=None, force=False, streaming=False, root=None):
+    """
+    Converts one JSON file, writing the Markdown atomically.
+
+    Returns:
+        tuple: (status, output path, error), where status is 'converted', 'current'
+               (output newer than the input), 'not_analysis' or 'error'.
+    """
+    output_file = output_path_for(json_file, output_dir, root)
+    try:
+        if not force and os.path.exists(output_file) and \
+                os.path.getmtime(output_file) >= os.path.getmtime(json_file):
+            return 'current', output_file, None
+
+        if streaming:
+            json_data = load_analysis_streaming(json_file)
+        else:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                json_data = json.load(f)
+        if not isinstance(json_data, dict) or not any(key in json_data for key in ANALYSIS_KEYS):
+            return 'not_analysis', output_file, None
+
+        markdown_content = convert_json_to_markdown(json_data, os.path.basename(json_file))
+
+        # Write to a temporary file in the same directory and rename it into place,
+        # so an interrupted run never leaves a truncated Markdown file behind.
+        directory = os.path.dirname(os.path.abspath(output_file))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(markdown_content)
+            os.replace(tmp_path, output_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return 'converted', output_file, None
+    except Exception as e:
+        return 'error', output_file, str(e)
+
+def _convert_file_star(args):
+    return convert_file(*args)
+
+def convert_batch(root, output_dir=None, workers=None, force=False, streaming=False):
+    """
+    Converts every video-analysis JSON file under `root` on a process pool.
+    With `output_dir`, the folder structure below `root` is mirrored there.
+
+    Returns:
+        dict: Counts per status.
+
+    Raises:
+        ValueError: If two input files would be written to the same Markdown file.
+    """
+    json_files = discover_json_files(root)
+    print(f"🔍 Found {len(json_files)} JSON files under {root}")
+    collisions = find_output_collisions(json_files, output_dir, root)
+    if collisions:
+        details = "\n".join(f"  {output_file} <- {', '.join(files)}" for output_file, files in collisions.items())
+        raise ValueError(f"{len(collisions)} output files would be written by more than one JSON file:\n{details}")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    counts = {'converted': 0, 'current': 0, 'not_analysis': 0, 'error': 0}
+    jobs = [(json_file, output_dir, force, streaming, root) for json_file in json_files]
+    executor = None if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+    try:
+        results = executor.map(_convert_file_star, jobs, chunksize=8) if executor else map(_convert_file_star, jobs)
+        for json_file, (status, output_file, error) in zip(json_files, results):
+            counts[status] += 1
+            if status == 'converted':
+                print(f"✅ Converted: {json_file} -> {output_file}")
+            elif status == 'error':
+                print(f"❌ Error processing {json_file}: {error}")
+    finally:
+        if executor:
+            executor.shutdown()
+
+    print(f"\n🎉 Converted {counts['converted']} JSON files "
+          f"({counts['current']} already current, {counts['not_analysis']} not video analyses, "
+          f"{counts['error']} errors)")
+    return counts
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert video-analysis JSON files to Markdown.")
+    parser.add_argument("files", nargs="*", help="JSON files to convert (default: the remaining files).")
+    parser.add_argument("--batch", metavar="DIR", help="Recursively convert every video-analysis JSON file under DIR.")
+    parser.add_argument("--output-dir", help="Write the Markdown files here instead of next to each JSON file.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes in batch mode (default: one per CPU; 1 converts serially).")
+    parser.add_argument("--force", action="store_true", help="Convert even if the Markdown file is current.")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Read JSON incrementally, keeping only the keys the converter uses (for very large files).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.batch:
+        try:
+            convert_batch(args.batch, args.output_dir, args.workers, args.force, args.streaming)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        return
+
     # Files that need conversion
-    remaining_files = [
+    remaining_files = args.files or [
         "Gemini's real power2.json",
         "AI Agent from a PDF using Function Calling.json", 
         "sD7z46Q7s_E.json"
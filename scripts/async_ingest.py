@@ -0,0 +1,158 @@
+import asyncio
+from collections import defaultdict
+
+# This module requires the neo4j library (5.x), which ships the asyncio driver.
+from neo4j import AsyncGraphDatabase
+
+from ingest_to_neo4j import (BATCH_SIZE, SCHEMA_LABELS, group_document, node_rows, edge_rows,
+                             merge_nodes_query, merge_relationships_query, delete_outgoing_query)
+
+_END = object()
+
+class AsyncNeo4jIngestor:
+    """
+    Asyncio ingestion pipeline with bounded concurrency.
+
+    A producer stage pulls structured documents from an iterable (advancing it in a
+    worker thread, so CPU-bound extraction overlaps with database I/O), groups them
+    into batches of roughly `batch_size` rows with the same grouping as
+    Neo4jIngestor.ingest_data_bulk() and puts the batches on a bounded queue.
+    `writers` concurrent tasks take batches off the queue and write each one in
+    a single managed transaction, which the driver retries on transient errors
+    (deadlocks between concurrent writers, lost connections) with backoff. When
+    all writers are busy the queue fills up and the producer waits
+    (backpressure), so memory stays bounded.
+
+    The driver is injected, so any object exposing the AsyncDriver interface
+    (`session()` as an async context manager with `execute_write` and `run`) can
+    stand in for a live database, e.g. an in-process fake in tests.
+    """
+
+    def __init__(self, driver, writers=4, queue_size=8, batch_size=BATCH_SIZE, snapshot=None):
+        self.driver = driver
+        # Optional GraphSnapshotBuilder that records every document written
+        self.snapshot = snapshot
+        self.writers = writers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.stats = {"documents": 0, "batches": 0, "retries": 0}
+        self._attempts = 0
+
+    @classmethod
+    def connect(cls, uri, user, password, **kwargs):
+        return cls(AsyncGraphDatabase.driver(uri, auth=(user, password)), **kwargs)
+
+    async def close(self):
+        await self.driver.close()
+
+    async def ensure_schema(self, labels=SCHEMA_LABELS):
+        """
+        Creates a uniqueness constraint (and with it an index) on `name` for each label.
+        """
+        async with self.driver.session() as session:
+            for label in labels:
+                query = (
+                    f"CREATE CONSTRAINT {label}_name_unique IF NOT EXISTS "
+                    f"FOR (n:{label}) REQUIRE n.name IS UNIQUE"
+                )
+                try:
+                    result = await session.run(query)
+                    await result.consume()
+                except Exception as e:
+                    print(f"Warning: could not create name constraint for label {label}: {e}")
+
+    async def ingest(self, documents):
+        """
+        Runs the pipeline over `documents` until every batch has been written.
+
+        Args:
+            documents (iterable): Items with 'file_path', 'entities' and 'relationships'.
+
+        Returns:
+            dict: Counters for documents, batches (transactions) and retries.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        tasks = [asyncio.create_task(self._produce(documents, queue))]
+        tasks += [asyncio.create_task(self._write(queue)) for _ in range(self.writers)]
+
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.stats["retries"] = self._attempts - self.stats["batches"]
+        return self.stats
+
+    async def _produce(self, documents, queue):
+        iterator = iter(documents)
+        nodes, edges, sources = defaultdict(dict), defaultdict(set), set()
+        rows = 0
+        while True:
+            item = await asyncio.to_thread(next, iterator, _END)
+            if item is _END:
+                break
+            added = group_document(item, nodes, edges, sources)
+            if not added:
+                continue
+
+            self.stats["documents"] += 1
+            if self.snapshot is not None:
+                self.snapshot.add_document(item)
+            rows += added
+            if rows >= self.batch_size:
+                await queue.put((nodes, edges, sources))
+                nodes, edges, sources = defaultdict(dict), defaultdict(set), set()
+                rows = 0
+
+        if rows or sources:
+            await queue.put((nodes, edges, sources))
+        for _ in range(self.writers):
+            await queue.put(None)
+
+    async def _write(self, queue):
+        async with self.driver.session() as session:
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+                await session.execute_write(self._write_batch, *batch)
+                self.stats["batches"] += 1
+
+    async def _write_batch(self, tx, nodes, edges, sources):
+        # Called once per attempt; the driver reruns it after a transient error
+        self._attempts += 1
+        # The replaced documents' CONTAINS edges go first, then nodes, whose
+        # element ids address the edge endpoints directly
+        if sources:
+            result = await tx.run(delete_outgoing_query('CONTAINS'), names=sorted(sources))
+            await result.consume()
+        node_index = {}
+        for label, rows_by_name in nodes.items():
+            result = await tx.run(merge_nodes_query(label), rows=node_rows(rows_by_name))
+            async for record in result:
+                node_index[(label, record["name"])] = record["id"]
+
+        for rel_type, pairs in edges.items():
+            result = await tx.run(merge_relationships_query(rel_type), rows=edge_rows(pairs, node_index))
+            await result.consume()
+
+async def run_async_ingestion(uri, user, password, documents, writers=4, batch_size=BATCH_SIZE, queue_size=None,
+                              snapshot=None):
+    """
+    Connects to Neo4j and ingests `documents` through the async pipeline.
+
+    Returns:
+        dict: The pipeline counters.
+    """
+    ingestor = AsyncNeo4jIngestor.connect(uri, user, password, writers=writers, batch_size=batch_size,
+                                          queue_size=queue_size or writers * 2, snapshot=snapshot)
+    try:
+        await ingestor.ensure_schema()
+        return await ingestor.ingest(documents)
+    finally:
+        await ingestor.close()
@@ -0,0 +1,525 @@
+"""
+Benchmark harness for the knowledge ingestion pipeline.
+
+Generates a synthetic corpus (Markdown with frontmatter and wiki links, video
+analysis JSON, DOCX and PDF) and times each pipeline stage over it:
+
+    parse    - parse_document
+    triage   - triage_file_with_llm
+    extract  - extract_schema_from_content_with_llm
+    convert  - convert_json_to_markdown (video analysis JSON -> Markdown)
+    ingest   - Neo4jIngestor.ingest_data_bulk against an in-process stand-in driver
+
+For each stage it reports throughput (docs/s, MB/s), p50/p99 latency and the
+stage's own peak RSS as JSON, and can compare the results against a stored
+baseline to catch regressions.
+
+Usage:
+    python benchmark_pipeline.py --docs 500 --output bench.json
+    python benchmark_pipeline.py --docs 500 --baseline bench_baseline.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONVERTER_SCRIPT = os.path.join(
+    REPO_ROOT, "knowledge-assets", "Script", "[Script][Relevance-3][automation,code]-convert_remaining_json.py")
+
+STAGES = ("parse", "triage", "extract", "convert", "ingest")
+FORMATS = ("md", "json", "docx", "pdf")
+
+# A stage regresses if its throughput drops, or its p99 latency grows, by more
+# than this fraction relative to the baseline.
+DEFAULT_TOLERANCE = 0.2
+
+_FILLER_WORDS = (
+    "the operations team reviewed throughput downtime quality customer supplier schedule "
+    "inventory maintenance workflow training budget process improvement dashboard report "
+    "integration pilot rollout metrics savings shift floor line"
+).split()
+
+def _keyword_vocabulary():
+    try:
+        from entity_extraction import ENTITY_RULES
+    except ImportError:
+        return ["AI", "automation", "Neo4j", "Docker", "strategy", "report"]
+    return [keyword for _, _, keywords in ENTITY_RULES for keyword in keywords]
+
+def _paragraphs(rng, keywords, count, words_per_paragraph):
+    paragraphs = []
+    for _ in range(count):
+        words = [rng.choice(_FILLER_WORDS) for _ in range(words_per_paragraph)]
+        for _ in range(max(1, words_per_paragraph // 25)):
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        paragraphs.append(" ".join(words) + ".")
+    return paragraphs
+
+def _write_markdown(path, rng, keywords, doc_id, paragraphs):
+    links = [f"[[Note {rng.randrange(1000)}]]" for _ in range(rng.randint(1, 6))]
+    links.append(f"[[Tool_ {rng.choice(keywords)}|alias]]")
+    links.append(f"[[Note {rng.randrange(1000)}#Heading]]")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("---\n")
+        f.write(f"title: Synthetic Note {doc_id}\n")
+        f.write(f"tags: [synthetic, {rng.choice(['plan', 'notes', 'ops'])}]\n")
+        f.write("created: 2025-07-22\n")
+        f.write("---\n")
+        f.write(f"# Synthetic Note {doc_id}\n\n")
+        f.write("\n\n".join(paragraphs))
+        f.write("\n\nRelated: " + " ".join(links) + "\n")
+
+def _write_video_analysis_json(path, rng, keywords, doc_id, paragraphs):
+    data = {
+        "videoTitle": f"Synthetic Video {doc_id}",
+        "videoUrl": f"https://www.youtube.com/watch?v=synthetic{doc_id}",
+        "analysisTimestamp": "2025-07-22T00:00:00Z",
+        "coreTopicsDiscussed": rng.sample(keywords, min(5, len(keywords))),
+        "advocatedProcesses": [
+            {
+                "processName": f"Process {i}",
+                "processDescription": paragraphs[i % len(paragraphs)],
+                "targetAudience": ["SMB owners", "Operations managers"],
+                "stepByStepGuide": [
+                    {
+                        "stepNumber": step,
+                        "action": f"Step {step} action",
+                        "detailsAndConsiderations": paragraphs[(i + step) % len(paragraphs)],
+                        "toolsMentioned": rng.sample(keywords, 2),
+                        "estimatedTimeOrEffort": f"{step} hours",
+                    }
+                    for step in range(1, 4)
+                ],
+                "userBenefitsAndSavings": {
+                    "quantitativeSavings": [{"metric": "Time", "value": "20%", "context": "per week"}],
+                    "qualitativeBenefits": ["Less manual work"],
+                },
+            }
+            for i in range(2)
+        ],
+        "faeIntelligenceStrategicInsights": {
+            "operationalWisdomIntegrationPoints": paragraphs[:2],
+            "aiApplicationAngles": paragraphs[-2:],
+            "alignmentWithFaeMission": paragraphs[0],
+        },
+        "generalVideoSummary": "\n".join(paragraphs),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+def _write_docx(path, paragraphs):
+    from docx import Document
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    document.save(path)
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _write_pdf(path, paragraphs, lines_per_page=40, chars_per_line=90):
+    """
+    Writes a minimal, valid multi-page PDF with Helvetica text, without any
+    third-party dependency.
+    """
+    lines = []
+    for paragraph in paragraphs:
+        for start in range(0, len(paragraph), chars_per_line):
+            lines.append(paragraph[start:start + chars_per_line])
+        lines.append("")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[""]]
+
+    objects = []  # object bodies; object number = index + 1
+    objects.append("<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(None)  # pages tree, filled in below
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    page_refs = []
+    for page_lines in pages:
+        text_ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        text_ops += [f"({_pdf_escape(line)}) Tj T*" for line in page_lines]
+        text_ops.append("ET")
+        stream = "\n".join(text_ops)
+        objects.append(f"<< /Length {len(stream.encode('latin-1', 'replace'))} >>\nstream\n{stream}\nendstream")
+        content_ref = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_ref} 0 R >>")
+        page_refs.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>"
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1", "replace"))
+        xref_offset = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+        f.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n"
+                .encode("latin-1"))
+
+def generate_corpus(output_dir, num_docs, formats=FORMATS, seed=0, paragraphs_per_doc=20, words_per_paragraph=80):
+    """
+    Generates a synthetic corpus of `num_docs` documents, cycling through `formats`.
+
+    Args:
+        output_dir (str): Directory the documents are written to (created if needed).
+        num_docs (int): Number of documents to generate.
+        formats (tuple): File formats to generate ('md', 'json', 'docx', 'pdf').
+        seed (int): Random seed, so corpora are reproducible.
+        paragraphs_per_doc (int): Paragraphs per document (controls document size).
+        words_per_paragraph (int): Words per paragraph.
+
+    Returns:
+        list: Paths of the generated documents.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    keywords = _keyword_vocabulary()
+    formats = list(formats)
+    if "docx" in formats and importlib.util.find_spec("docx") is None:
+        print("python-docx is not installed; skipping DOCX documents in the synthetic corpus.")
+        formats.remove("docx")
+
+    paths = []
+    for doc_id in range(num_docs):
+        file_format = formats[doc_id % len(formats)]
+        path = os.path.join(output_dir, f"synthetic_{doc_id:06d}.{file_format}")
+        paragraphs = _paragraphs(rng, keywords, paragraphs_per_doc, words_per_paragraph)
+        if file_format == "md":
+            _write_markdown(path, rng, keywords, doc_id, paragraphs)
+        elif file_format == "json":
+            _write_video_analysis_json(path, rng, keywords, doc_id, paragraphs)
+        elif file_format == "docx":
+            _write_docx(path, paragraphs)
+        elif file_format == "pdf":
+            _write_pdf(path, paragraphs)
+        paths.append(path)
+    return paths
+
+class _StandInResult(list):
+    def consume(self):
+        return None
+
+class _StandInTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, **params):
+        self.driver.statements += 1
+        rows = params.get("rows", [])
+        self.driver.rows += len(rows)
+        if "RETURN row.name" in query:
+            return _StandInResult({"name": row["name"], "id": f"stand-in:{row['name']}"} for row in rows)
+        return _StandInResult()
+
+class _StandInSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def run(self, query, **params):
+        return _StandInTransaction(self.driver).run(query, **params)
+
+    def write_transaction(self, transaction_function, *args, **kwargs):
+        self.driver.transactions += 1
+        result = transaction_function(_StandInTransaction(self.driver), *args, **kwargs)
+        self.driver.commit()
+        return result
+
+    execute_write = write_transaction
+
+class StandInDriver:
+    """
+    In-process stand-in for the Neo4j driver. Queries are not executed, only
+    counted, so the ingest stage measures the ingestor's own overhead
+    (grouping, batching, parameter building).
+    """
+
+    def __init__(self):
+        self.transactions = 0
+        self.statements = 0
+        self.rows = 0
+        self.latencies = []   # seconds between consecutive commits
+        self.last_commit = time.perf_counter()
+
+    def commit(self):
+        now = time.perf_counter()
+        self.latencies.append(now - self.last_commit)
+        self.last_commit = now
+
+    def session(self, **kwargs):
+        return _StandInSession(self)
+
+    def close(self):
+        pass
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def _peak_rss_mb():
+    try:
+        # VmHWM, unlike ru_maxrss, can be reset between stages (see _begin_stage)
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _begin_stage():
+    """
+    Starts measuring the peak RSS of a stage. On Linux the process's high-water
+    mark is reset through /proc/self/clear_refs, so each stage reports its own
+    peak rather than the largest one of the stages before it.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        reset = True
+    except OSError:
+        reset = False
+    return reset, _peak_rss_mb()
+
+def _stage_peak_rss_mb(stage_start):
+    reset, peak_before = stage_start
+    peak = _peak_rss_mb()
+    if reset or peak > peak_before:
+        return round(peak, 2)
+    # The high-water mark cannot be reset here and the stage stayed below an
+    # earlier stage's peak, so its own peak is unknown
+    return None
+
+def _summarize(latencies, total_bytes, wall_seconds, stage_start, extra=None):
+    latencies = sorted(latencies)
+    docs = len(latencies)
+    summary = {
+        "docs": docs,
+        "bytes": total_bytes,
+        "wall_seconds": round(wall_seconds, 6),
+        "docs_per_s": round(docs / wall_seconds, 3) if wall_seconds else 0.0,
+        "mb_per_s": round(total_bytes / (1024 * 1024) / wall_seconds, 3) if wall_seconds else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 4),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 4),
+        "peak_rss_mb": _stage_peak_rss_mb(stage_start),
+    }
+    if extra:
+        summary.update(extra)
+    return summary
+
+def _time_each(items, fn, size_of):
+    latencies = []
+    total_bytes = 0
+    results = []
+    stage_start = _begin_stage()
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        results.append(fn(item))
+        latencies.append(time.perf_counter() - t0)
+        total_bytes += size_of(item)
+    return results, latencies, total_bytes, time.perf_counter() - start, stage_start
+
+def _load_converter():
+    spec = importlib.util.spec_from_file_location("convert_remaining_json", CONVERTER_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.convert_json_to_markdown
+
+def run_benchmark(corpus_paths, stages=STAGES, batch_size=None):
+    """
+    Times each pipeline stage over the corpus.
+
+    Stages whose dependencies are not installed are reported as skipped.
+
+    Returns:
+        dict: Per-stage results keyed by stage name.
+    """
+    results = {}
+    file_size = os.path.getsize
+    parsed_contents = {}
+
+    if "parse" in stages:
+        try:
+            import parse_documents
+            parse = lambda path: parse_documents.parse_document(path, use_cache=False)
+            parsed, latencies, total_bytes, wall, stage_start = _time_each(corpus_paths, parse, file_size)
+            parsed_contents = {p: (d or {}).get("content", "") for p, d in zip(corpus_paths, parsed)}
+            results["parse"] = _summarize(latencies, total_bytes, wall, stage_start,
+                                          {"failures": sum(1 for d in parsed if d is None)})
+        except ImportError as e:
+            results["parse"] = {"skipped": str(e)}
+
+    if "triage" in stages:
+        try:
+            import triage_and_tag
+            # Measure real parsing, not cache hits
+            triage = lambda path: triage_and_tag.triage_file_with_llm(path, use_cache=False)
+            triaged, latencies, total_bytes, wall, stage_start = _time_each(corpus_paths, triage, file_size)
+            if not parsed_contents:
+                parsed_contents = {p: content for p, (_, content) in zip(corpus_paths, triaged)}
+            results["triage"] = _summarize(latencies, total_bytes, wall, stage_start)
+        except ImportError as e:
+            results["triage"] = {"skipped": str(e)}
+
+    extracted = []
+    if "extract" in stages or "ingest" in stages:
+        if not parsed_contents:
+            # Without the parsers, fall back to the raw text of the text-based formats
+            for path in corpus_paths:
+                if path.endswith((".md", ".json")):
+                    with open(path, "r", encoding="utf-8") as f:
+                        parsed_contents[path] = f.read()
+        from entity_extraction import extract_schema_from_content_with_llm
+        items = [(p, c) for p, c in parsed_contents.items() if c]
+        schemas, latencies, total_bytes, wall, stage_start = _time_each(
+            items, lambda item: extract_schema_from_content_with_llm(item[1]),
+            lambda item: len(item[1].encode("utf-8")))
+        extracted = [{"file_path": p, **schema} for (p, _), schema in zip(items, schemas)]
+        if "extract" in stages:
+            results["extract"] = _summarize(latencies, total_bytes, wall, stage_start, {
+                "entities": sum(len(s["entities"]) for s in schemas),
+                "relationships": sum(len(s["relationships"]) for s in schemas),
+            })
+
+    if "convert" in stages:
+        json_paths = [p for p in corpus_paths if p.endswith(".json")]
+        convert_json_to_markdown = _load_converter()
+
+        def convert(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return convert_json_to_markdown(json.load(f), os.path.basename(path))
+
+        _, latencies, total_bytes, wall, stage_start = _time_each(json_paths, convert, file_size)
+        results["convert"] = _summarize(latencies, total_bytes, wall, stage_start)
+
+    if "ingest" in stages:
+        try:
+            import ingest_to_neo4j
+            driver = StandInDriver()
+            ingestor = ingest_to_neo4j.Neo4jIngestor(None, None, None, driver=driver)
+            stage_start = _begin_stage()
+            start = driver.last_commit = time.perf_counter()
+            ingestor.ingest_data_bulk(extracted, batch_size=batch_size or ingest_to_neo4j.BATCH_SIZE)
+            wall = time.perf_counter() - start
+            # Bulk ingestion is not per-document, so latency is measured per
+            # transaction: the time since the previous commit, which includes the
+            # grouping and parameter building for the batch
+            results["ingest"] = _summarize(driver.latencies, 0, wall, stage_start, {
+                "docs": len(extracted),
+                "docs_per_s": round(len(extracted) / wall, 3) if wall else 0.0,
+                "transactions": driver.transactions,
+                "rows": driver.rows,
+            })
+        except ImportError as e:
+            results["ingest"] = {"skipped": str(e)}
+
+    return results
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares benchmark results against a baseline.
+
+    Returns:
+        list: Human-readable descriptions of every regression found.
+    """
+    regressions = []
+    for stage, current in results.get("stages", {}).items():
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous or "skipped" in current or "skipped" in previous:
+            continue
+        if previous.get("docs_per_s") and current["docs_per_s"] < previous["docs_per_s"] * (1 - tolerance):
+            regressions.append(f"{stage}: throughput {current['docs_per_s']} docs/s "
+                               f"vs baseline {previous['docs_per_s']} docs/s")
+        if previous.get("p99_ms") and current["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{stage}: p99 latency {current['p99_ms']} ms vs baseline {previous['p99_ms']} ms")
+        if (previous.get("peak_rss_mb") and current.get("peak_rss_mb")
+                and current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + tolerance)):
+            regressions.append(f"{stage}: peak RSS {current['peak_rss_mb']} MB "
+                               f"vs baseline {previous['peak_rss_mb']} MB")
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the knowledge ingestion pipeline on a synthetic corpus.")
+    parser.add_argument("--docs", type=int, default=200, help="Number of synthetic documents (default: 200).")
+    parser.add_argument("--formats", default=",".join(FORMATS),
+                        help="Comma-separated document formats to generate (default: md,json,docx,pdf).")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="Comma-separated stages to run (default: all).")
+    parser.add_argument("--paragraphs", type=int, default=20, help="Paragraphs per document (default: 20).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the corpus (default: 0).")
+    parser.add_argument("--batch-size", type=int, default=None, help="Batch size for the ingest stage.")
+    parser.add_argument("--corpus-dir", default=None,
+                        help="Keep the generated corpus in this directory instead of a temporary one.")
+    parser.add_argument("--output", default=None, help="Write the JSON results to this file.")
+    parser.add_argument("--baseline", default=None, help="Compare against this stored results file.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed relative regression against the baseline (default: {DEFAULT_TOLERANCE}).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix="fae-bench-")
+    try:
+        start = time.perf_counter()
+        corpus_paths = generate_corpus(corpus_dir, args.docs, formats=formats, seed=args.seed,
+                                       paragraphs_per_doc=args.paragraphs)
+        generation_seconds = time.perf_counter() - start
+        print(f"Generated {len(corpus_paths)} documents in {generation_seconds:.2f}s at {corpus_dir}",
+              file=sys.stderr)
+
+        results = {
+            "corpus": {
+                "docs": len(corpus_paths),
+                "bytes": sum(os.path.getsize(p) for p in corpus_paths),
+                "formats": formats,
+                "seed": args.seed,
+            },
+            "stages": run_benchmark(corpus_paths, stages=stages, batch_size=args.batch_size),
+        }
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    print(report)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, tolerance=args.tolerance)
+        if regressions:
+            print("Performance regressions against baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  - {regression}", file=sys.stderr)
+            return 1
+        print("No regressions against baseline.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,483 @@
+import os
+import re
+import json
+import math
+import mmap
+import time
+import argparse
+import tempfile
+from collections import Counter, OrderedDict, defaultdict
+
+# This module requires numpy. You can install it with: pip install numpy
+import numpy as np
+
+from record_stream import iter_records
+from ingestion_manifest import hash_text
+
+# --- Configuration ---
+BM25_INDEX_DIR = "/home/rosie/projects/fae-intelligence/.search-index"
+TRIAGE_OUTPUT = "/home/rosie/projects/fae-intelligence/scripts/triage_output.jsonl"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+COMPACT_DELETED_RATIO = 0.25   # save() rewrites the postings once this share of documents is deleted
+POSTINGS_CACHE_SIZE = 1024     # Decoded posting lists kept in memory
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+    return _TOKEN_PATTERN.findall(text.lower())
+
+def encode_varints(values):
+    """
+    Encodes non-negative integers as LEB128 varints (7 bits per byte, high bit set
+    on every byte but the last).
+    """
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+def decode_varints(data):
+    """
+    Decodes a LEB128 varint stream into a uint64 array, vectorized with NumPy.
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        return np.zeros(0, dtype=np.uint64)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    shifts = np.arange(len(raw)) - np.repeat(starts, ends - starts + 1)
+    parts = (raw & 0x7F).astype(np.uint64) << (7 * shifts).astype(np.uint64)
+    return np.add.reduceat(parts, starts)
+
+class BM25Index:
+    """
+    Persistent inverted full-text index over triage records, ranked with BM25.
+
+    Posting lists hold (doc id delta, term frequency) pairs as varints in one
+    append-only file, postings.bin. Documents only ever receive increasing ids,
+    so the postings added by a later save() continue a term's delta stream and
+    are recorded as another extent of that term. Term dictionary, document
+    lengths and metadata (type, relevance, tags) live in the index.json sidecar,
+    which is replaced atomically after the postings are written.
+
+    Re-indexing a document under the same key tombstones its previous version;
+    save() compacts the postings once too many documents are deleted. Deleted
+    documents are skipped when scoring, so they count neither towards document
+    frequencies nor towards the collection size.
+    """
+
+    def __init__(self, directory=BM25_INDEX_DIR, k1=BM25_K1, b=BM25_B, cache_size=POSTINGS_CACHE_SIZE):
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        os.makedirs(directory, exist_ok=True)
+        self._postings_path = os.path.join(directory, "postings.bin")
+        self._meta_path = os.path.join(directory, "index.json")
+
+        self._terms = {}      # term -> [df, last doc id, [offset, length, ...]]
+        self._keys = []       # doc id -> key (the triaged file's path)
+        self._hashes = []
+        self._types = []
+        self._relevance = []
+        self._tags = []
+        self._lengths = []
+        self._deleted = set()
+        if os.path.exists(self._meta_path):
+            self._load()
+        self._doc_by_key = {key: doc for doc, key in enumerate(self._keys) if doc not in self._deleted}
+
+        self._pending = defaultdict(list)   # term -> [doc id, tf, doc id, tf, ...] not yet saved
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._columns = None
+        self._postings = None
+        self._postings_file = None
+        self._map_postings()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.save()
+        self.close()
+
+    def __len__(self):
+        return len(self._doc_by_key)
+
+    def __contains__(self, key):
+        return key in self._doc_by_key
+
+    def _load(self):
+        with open(self._meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self._terms = meta["terms"]
+        docs = meta["docs"]
+        self._keys = docs["keys"]
+        self._hashes = docs["hashes"]
+        self._types = docs["types"]
+        self._relevance = docs["relevance"]
+        self._tags = docs["tags"]
+        self._lengths = docs["lengths"]
+        self._deleted = set(meta["deleted"])
+        # Bytes past the recorded size belong to a save() that did not complete
+        if os.path.exists(self._postings_path):
+            with open(self._postings_path, 'r+b') as f:
+                f.truncate(meta["postings_size"])
+
+    def _map_postings(self):
+        if self._postings_file is not None:
+            self._postings_file.close()
+        self._postings = self._postings_file = None
+        if os.path.exists(self._postings_path) and os.path.getsize(self._postings_path):
+            self._postings_file = open(self._postings_path, 'rb')
+            self._postings = mmap.mmap(self._postings_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        if self._postings is not None:
+            self._postings.close()
+        if self._postings_file is not None:
+            self._postings_file.close()
+        self._postings = self._postings_file = None
+
+    def add_document(self, key, content, metadata=None, content_hash=None):
+        """
+        Indexes one document, replacing any earlier version stored under `key`.
+
+        Args:
+            key (str): Identifies the document, normally its file path.
+            content (str): The text to index.
+            metadata (dict): Triage metadata; 'type', 'relevance' and 'tags' are
+                             kept for filtering.
+            content_hash (str): If given and equal to the hash of the indexed
+                                version, the document is left as it is.
+
+        Returns:
+            bool: Whether the document was (re)indexed.
+        """
+        metadata = metadata or {}
+        previous = self._doc_by_key.get(key)
+        if previous is not None:
+            if content_hash and self._hashes[previous] == content_hash:
+                return False
+            self._deleted.add(previous)
+
+        doc = len(self._keys)
+        tokens = tokenize(content or "")
+        pending = self._pending
+        for term, tf in Counter(tokens).items():
+            pending[term] += (doc, tf)
+        self._keys.append(key)
+        self._hashes.append(content_hash)
+        self._types.append(metadata.get("type"))
+        self._relevance.append(int(metadata.get("relevance") or 0))
+        self._tags.append(list(metadata.get("tags") or []))
+        self._lengths.append(len(tokens))
+        self._doc_by_key[key] = doc
+        self._columns = None
+        return True
+
+    def add_record(self, record):
+        """
+        Indexes a triage record ({'file_path', 'content_hash', 'metadata', 'content'}).
+        Records from older triage runs carry no content hash; their content is hashed.
+        """
+        content = record.get("content") or ""
+        return self.add_document(record["file_path"], content, record.get("metadata"),
+                                 record.get("content_hash") or hash_text(content))
+
+    def delete(self, key):
+        doc = self._doc_by_key.pop(key, None)
+        if doc is None:
+            return False
+        self._deleted.add(doc)
+        self._columns = None
+        return True
+
+    def save(self, compact=None):
+        """
+        Appends the pending postings and atomically replaces the sidecar.
+
+        Args:
+            compact (bool): Rewrite the postings without deleted documents. By
+                            default this happens once COMPACT_DELETED_RATIO of the
+                            documents are deleted.
+        """
+        if compact is None:
+            compact = bool(self._keys) and len(self._deleted) / len(self._keys) >= COMPACT_DELETED_RATIO
+        if compact:
+            self._compact()
+            return
+
+        postings_size = os.path.getsize(self._postings_path) if os.path.exists(self._postings_path) else 0
+        if self._pending:
+            with open(self._postings_path, 'ab') as f:
+                for term, pairs in self._pending.items():
+                    entry = self._terms.get(term)
+                    if entry is None:
+                        entry = self._terms[term] = [0, 0, []]
+                    values = list(pairs)
+                    last_doc = entry[1]
+                    for i in range(0, len(values), 2):
+                        values[i], last_doc = values[i] - last_doc, values[i]
+                    data = encode_varints(values)
+                    f.write(data)
+                    entry[0] += len(pairs) // 2
+                    entry[1] = last_doc
+                    entry[2].extend((postings_size, len(data)))
+                    postings_size += len(data)
+                    self._cache.pop(term, None)
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending.clear()
+        self._write_meta(postings_size)
+        self._map_postings()
+
+    def _write_meta(self, postings_size):
+        meta = {
+            "postings_size": postings_size,
+            "terms": self._terms,
+            "docs": {
+                "keys": self._keys,
+                "hashes": self._hashes,
+                "types": self._types,
+                "relevance": self._relevance,
+                "tags": self._tags,
+                "lengths": self._lengths,
+            },
+            "deleted": sorted(self._deleted),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def _compact(self):
+        live = [doc for doc in range(len(self._keys)) if doc not in self._deleted]
+        new_ids = np.full(len(self._keys), -1, dtype=np.int64)
+        new_ids[live] = np.arange(len(live))
+
+        terms = {}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        offset = 0
+        with os.fdopen(fd, 'wb') as f:
+            for term in sorted(set(self._terms) | set(self._pending)):
+                docs, tfs = self._postings_for(term)
+                docs = new_ids[docs]
+                keep = docs >= 0
+                docs, tfs = docs[keep], tfs[keep]
+                if not len(docs):
+                    continue
+                values = np.empty(2 * len(docs), dtype=np.int64)
+                values[0::2] = np.diff(docs, prepend=0)
+                values[1::2] = tfs
+                data = encode_varints(values.tolist())
+                f.write(data)
+                terms[term] = [len(docs), int(docs[-1]), [offset, len(data)]]
+                offset += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.close()
+        os.replace(tmp_path, self._postings_path)
+        self._terms = terms
+        for column in ("_keys", "_hashes", "_types", "_relevance", "_tags", "_lengths"):
+            values = getattr(self, column)
+            setattr(self, column, [values[doc] for doc in live])
+        self._deleted = set()
+        self._doc_by_key = {key: doc for doc, key in enumerate(self._keys)}
+        self._pending.clear()
+        self._cache.clear()
+        self._columns = None
+        self._write_meta(offset)
+        self._map_postings()
+
+    def _saved_postings(self, term):
+        cached = self._cache.get(term)
+        if cached is not None:
+            self._cache.move_to_end(term)
+            return cached
+
+        docs = tfs = np.zeros(0, dtype=np.int64)
+        entry = self._terms.get(term)
+        if entry is not None:
+            extents = entry[2]
+            data = b"".join(self._postings[extents[i]:extents[i] + extents[i + 1]]
+                            for i in range(0, len(extents), 2))
+            values = decode_varints(data).astype(np.int64)
+            docs, tfs = np.cumsum(values[0::2]), values[1::2]
+
+        self._cache[term] = (docs, tfs)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return docs, tfs
+
+    def _postings_for(self, term):
+        """
+        Returns (doc ids, term frequencies) of `term`, saved and pending postings
+        together, including deleted documents.
+        """
+        docs, tfs = self._saved_postings(term)
+        pending = self._pending.get(term)
+        if pending:
+            pending = np.array(pending, dtype=np.int64)
+            docs = np.concatenate([docs, pending[0::2]])
+            tfs = np.concatenate([tfs, pending[1::2]])
+        return docs, tfs
+
+    def _doc_columns(self):
+        if self._columns is None:
+            n_docs = len(self._keys)
+            live = np.ones(n_docs, dtype=bool)
+            if self._deleted:
+                live[list(self._deleted)] = False
+            type_codes = {}
+            types = np.array([type_codes.setdefault(t, len(type_codes)) for t in self._types], dtype=np.int32)
+            tag_masks = {}
+            for doc, tags in enumerate(self._tags):
+                for tag in tags:
+                    mask = tag_masks.get(tag)
+                    if mask is None:
+                        mask = tag_masks[tag] = np.zeros(n_docs, dtype=bool)
+                    mask[doc] = True
+            self._columns = {
+                "live": live,
+                "lengths": np.array(self._lengths, dtype=np.float64),
+                "relevance": np.array(self._relevance, dtype=np.int64),
+                "type_codes": type_codes,
+                "types": types,
+                "tags": tag_masks,
+            }
+        return self._columns
+
+    def _filter_mask(self, columns, doc_type, min_relevance, tags):
+        mask = columns["live"].copy()
+        if doc_type is not None:
+            wanted = [doc_type] if isinstance(doc_type, str) else list(doc_type)
+            codes = [columns["type_codes"][t] for t in wanted if t in columns["type_codes"]]
+            mask &= np.isin(columns["types"], codes)
+        if min_relevance is not None:
+            mask &= columns["relevance"] >= min_relevance
+        for tag in tags or ():
+            tagged = columns["tags"].get(tag)
+            if tagged is None:
+                mask[:] = False
+                break
+            mask &= tagged
+        return mask
+
+    def search(self, query, top_k=10, doc_type=None, min_relevance=None, tags=None):
+        """
+        Ranks the documents matching any query term with BM25.
+
+        Args:
+            query (str): Free text; tokenized like the indexed content.
+            top_k (int): Number of results.
+            doc_type (str or list): Only documents of this type (or these types).
+            min_relevance (int): Only documents with at least this relevance.
+            tags (list): Only documents carrying all of these tags.
+
+        Returns:
+            list: Dicts with 'key', 'score', 'type', 'relevance' and 'tags', best first.
+        """
+        terms = Counter(tokenize(query))
+        if not terms or not self._doc_by_key:
+            return []
+        columns = self._doc_columns()
+        mask = self._filter_mask(columns, doc_type, min_relevance, tags)
+        lengths = columns["lengths"]
+        live = columns["live"]
+        n_docs = len(self._doc_by_key)
+        avg_length = float(lengths[live].mean()) or 1.0
+        norms = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+
+        scores = np.zeros(len(self._keys), dtype=np.float64)
+        for term, query_tf in terms.items():
+            docs, tfs = self._postings_for(term)
+            if self._deleted:
+                alive = live[docs]
+                docs, tfs = docs[alive], tfs[alive]
+            if not len(docs):
+                continue
+            df = len(docs)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            scores[docs] += query_tf * idf * tfs * (self.k1 + 1) / (tfs + norms[docs])
+
+        scores[~mask] = 0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [{"key": self._keys[doc], "score": float(scores[doc]), "type": self._types[doc],
+                 "relevance": self._relevance[doc], "tags": self._tags[doc]} for doc in candidates]
+
+    def stats(self):
+        return {
+            "documents": len(self._doc_by_key),
+            "deleted": len(self._deleted),
+            "terms": len(set(self._terms) | set(self._pending)),
+            "postings_bytes": os.path.getsize(self._postings_path) if os.path.exists(self._postings_path) else 0,
+        }
+
+def index_records(index, records):
+    """
+    Adds triage records to the index. Returns (indexed, unchanged) counts.
+    """
+    indexed = unchanged = 0
+    for record in records:
+        if index.add_record(record):
+            indexed += 1
+        else:
+            unchanged += 1
+    return indexed, unchanged
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text BM25 search over the triaged knowledge assets.")
+    parser.add_argument("query", nargs="?", help="Text to search for.")
+    parser.add_argument("--index", default=BM25_INDEX_DIR, help=f"Index directory (default: {BM25_INDEX_DIR}).")
+    parser.add_argument("--add", metavar="FILE", nargs="?", const=TRIAGE_OUTPUT,
+                        help=f"Index the records of a triage output file first (default: {TRIAGE_OUTPUT}).")
+    parser.add_argument("--type", help="Only return documents of this type.")
+    parser.add_argument("--min-relevance", type=int, help="Only return documents with at least this relevance.")
+    parser.add_argument("--tag", action="append", default=[], help="Only return documents with this tag (repeatable).")
+    parser.add_argument("--top", type=int, default=10, help="Number of results (default: 10).")
+    parser.add_argument("--compact", action="store_true", help="Rewrite the postings without deleted documents.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    index = BM25Index(args.index)
+    try:
+        if args.add:
+            start = time.perf_counter()
+            indexed, unchanged = index_records(index, iter_records(args.add))
+            index.save()
+            print(f"Indexed {indexed} documents ({unchanged} unchanged) in {time.perf_counter() - start:.2f}s.")
+        if args.compact:
+            index.save(compact=True)
+        stats = index.stats()
+        print(f"Index holds {stats['documents']} documents, {stats['terms']} terms, "
+              f"{stats['postings_bytes'] / 1024:.1f} KiB of postings.")
+
+        if args.query:
+            start = time.perf_counter()
+            results = index.search(args.query, top_k=args.top, doc_type=args.type,
+                                   min_relevance=args.min_relevance, tags=args.tag)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if not results:
+                print("No matching documents found.")
+            for rank, result in enumerate(results, 1):
+                print(f"{rank:2d}. {os.path.basename(result['key'])}  (score {result['score']:.3f}; "
+                      f"{result['type']}, relevance {result['relevance']}, tags {','.join(result['tags'])})")
+            print(f"Query answered in {elapsed_ms:.1f} ms.")
+    finally:
+        index.close()
+
+if __name__ == "__main__":
+    main()
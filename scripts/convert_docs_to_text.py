@@ -1,29 +1,182 @@
 import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
 from docx import Document
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+from ingestion_manifest import hash_file
+
+# --- Configuration ---
+INPUT_DIR = "/home/rosie/projects/fae-intelligence/knowledge-assets/Document"
+OUTPUT_DIR = "/home/rosie/projects/fae-intelligence/knowledge-assets/Converted_Documents"
+
+# Records the content hash of every converted .docx, so a file whose mtime changed
+# without its content changing (e.g. after a copy or sync) is not converted again.
+CONVERSION_MANIFEST = ".conversion_manifest.json"
+# Bump whenever docx_to_lines() changes its output: files whose manifest entry
+# is missing or was written by another version are converted again.
+CONVERTER_VERSION = 2
+
+def _table_lines(table):
+    lines = []
+    for row in table.rows:
+        cells = []
+        seen = set()
+        for cell in row.cells:
+            # Merged cells are returned once per grid column they span
+            if id(cell._tc) in seen:
+                continue
+            seen.add(id(cell._tc))
+            cells.append(" ".join(cell.text.split()))
+        lines.append("\t".join(cells))
+    return lines
+
+def _header_footer_lines(document, attribute):
+    lines = []
+    seen = set()
+    for section in document.sections:
+        part = getattr(section, attribute)
+        if part.is_linked_to_previous:
+            continue
+        for paragraph in part.paragraphs:
+            if paragraph.text and paragraph.text not in seen:
+                seen.add(paragraph.text)
+                lines.append(paragraph.text)
+    return lines
+
+def docx_to_lines(docx_path):
+    """
+    Extracts the text of a .docx file: headers, then the body in document order
+    (paragraphs and tables, one tab-separated line per table row), then footers.
+
+    Args:
+        docx_path (str): The path to the .docx file.
+
+    Returns:
+        list: The lines of text.
+    """
+    document = Document(docx_path)
+    lines = _header_footer_lines(document, "header")
+    body = document.element.body
+    for child in body.iterchildren():
+        if child.tag.endswith('}p'):
+            lines.append(Paragraph(child, document).text)
+        elif child.tag.endswith('}tbl'):
+            lines.extend(_table_lines(Table(child, document)))
+    lines.extend(_header_footer_lines(document, "footer"))
+    return lines
+
+def _convert_one(docx_path, txt_path, known_hash, force):
+    """
+    Converts one file unless it is up to date. Runs in a worker process.
+
+    Returns:
+        tuple: (status, content hash or None, error message or None), where status
+               is 'converted', 'skipped' or 'error'.
+    """
+    try:
+        if not force and known_hash is not None and os.path.exists(txt_path):
+            if os.path.getmtime(txt_path) >= os.path.getmtime(docx_path):
+                return "skipped", known_hash, None
+            digest = hash_file(docx_path)
+            if digest == known_hash:
+                os.utime(txt_path)
+                return "skipped", digest, None
+        else:
+            digest = hash_file(docx_path)
 
-def convert_docx_to_txt(input_folder, output_folder):
+        text = "\n".join(docx_to_lines(docx_path)) + "\n"
+        tmp_path = txt_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", buffering=1024 * 1024) as f:
+            f.write(text)
+        os.replace(tmp_path, txt_path)
+        return "converted", digest, None
+    except Exception as e:
+        return "error", None, str(e)
+
+def _convert_one_star(args):
+    return _convert_one(*args)
+
+def convert_docx_to_txt(input_folder, output_folder, workers=None, force=False):
     """
     Converts all .docx files in the input_folder to .txt files in the output_folder.
+
+    Files whose .txt is newer than the .docx, or whose content hash matches the
+    last conversion, are skipped, unless that conversion was done by another
+    CONVERTER_VERSION (or is not in the manifest). Conversions run on a process
+    pool.
+
+    Args:
+        input_folder (str): Folder containing the .docx files.
+        output_folder (str): Folder receiving the .txt files.
+        workers (int): Number of worker processes (default: one per CPU).
+        force (bool): Convert every file, even if it is up to date.
+
+    Returns:
+        dict: Counters for converted, skipped and failed files.
     """
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    for filename in os.listdir(input_folder):
-        if filename.endswith(".docx"):
-            docx_path = os.path.join(input_folder, filename)
-            txt_filename = os.path.splitext(filename)[0] + ".txt"
-            txt_path = os.path.join(output_folder, txt_filename)
-
-            try:
-                document = Document(docx_path)
-                with open(txt_path, "w", encoding="utf-8") as f:
-                    for paragraph in document.paragraphs:
-                        f.write(paragraph.text + "\n")
-                print(f"Converted '{filename}' to '{txt_filename}'")
-            except Exception as e:
-                print(f"Error converting '{filename}': {e}")
+    manifest_path = os.path.join(output_folder, CONVERSION_MANIFEST)
+    hashes = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            hashes = json.load(f)
+
+    filenames = sorted(f for f in os.listdir(input_folder) if f.endswith(".docx"))
+    jobs = []
+    for filename in filenames:
+        txt_filename = os.path.splitext(filename)[0] + ".txt"
+        entry = hashes.get(filename)
+        # Entries of older versions are plain hashes
+        current = isinstance(entry, dict) and entry.get("converter") == CONVERTER_VERSION
+        jobs.append((os.path.join(input_folder, filename), os.path.join(output_folder, txt_filename),
+                     entry["hash"] if current else None, force))
+
+    stats = {"converted": 0, "skipped": 0, "errors": 0}
+    if workers == 1:
+        results = map(_convert_one_star, jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_convert_one_star, jobs, chunksize=4)
+    try:
+        for filename, (status, digest, error) in zip(filenames, results):
+            if status == "error":
+                stats["errors"] += 1
+                print(f"Error converting '{filename}': {error}")
+                continue
+            if digest:
+                hashes[filename] = {"hash": digest, "converter": CONVERTER_VERSION}
+            if status == "converted":
+                stats["converted"] += 1
+                print(f"Converted '{filename}' to '{os.path.splitext(filename)[0]}.txt'")
+            else:
+                stats["skipped"] += 1
+    finally:
+        if workers != 1:
+            executor.shutdown()
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(hashes, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+
+    print(f"Converted {stats['converted']} files, skipped {stats['skipped']} up-to-date files, "
+          f"{stats['errors']} errors.")
+    return stats
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert .docx files to plain text.")
+    parser.add_argument("input", nargs="?", default=INPUT_DIR, help=f"Folder of .docx files (default: {INPUT_DIR}).")
+    parser.add_argument("output", nargs="?", default=OUTPUT_DIR, help=f"Output folder (default: {OUTPUT_DIR}).")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (default: one per CPU; 1 converts serially).")
+    parser.add_argument("--force", action="store_true", help="Convert every file, even if it is up to date.")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    input_dir = "/home/rosie/projects/fae-intelligence/knowledge-assets/Document"
-    output_dir = "/home/rosie/projects/fae-intelligence/knowledge-assets/Converted_Documents"
-    convert_docx_to_txt(input_dir, output_dir)
\ No newline at end of file
+    args = parse_args()
+    convert_docx_to_txt(args.input, args.output, workers=args.workers, force=args.force)
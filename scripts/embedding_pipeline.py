@@ -0,0 +1,316 @@
+import os
+import re
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# This module requires numpy. You can install it with: pip install numpy
+import numpy as np
+
+from local_vector_index import LocalVectorIndex, LOCAL_INDEX_DIR, INDEX_NAME, DIMENSION
+from record_stream import iter_records
+from pipeline_metrics import NULL_METRICS, add_metrics_arguments, metrics_from_args
+
+# --- Configuration ---
+# Triage records as JSON Lines (legacy triage_output.json arrays are also accepted)
+INPUT_FILE = "/home/rosie/projects/fae-intelligence/scripts/triage_output.jsonl"
+
+CHUNK_TOKENS = 256      # Maximum tokens per chunk
+CHUNK_OVERLAP = 32      # Tokens shared by consecutive chunks
+EMBED_BATCH_SIZE = 64   # Chunks per embedding request
+EMBED_CONCURRENCY = 4   # Embedding requests in flight
+UPSERT_BATCH_SIZE = 200 # Vectors per index upsert
+
+GEMINI_EMBEDDING_MODEL = "models/gemini-embedding-001"
+
+_TOKEN_PATTERN = re.compile(r"\S+")
+
+def chunk_text(text, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP):
+    """
+    Splits text into overlapping chunks of at most `max_tokens` whitespace tokens.
+
+    Chunks are slices of the original text, so their whitespace and line breaks
+    are preserved.
+
+    Args:
+        text (str): The document content.
+        max_tokens (int): Maximum number of tokens per chunk.
+        overlap (int): Number of tokens repeated at the start of the next chunk.
+
+    Returns:
+        list: The chunk strings, in document order.
+    """
+    if overlap >= max_tokens:
+        raise ValueError("overlap must be smaller than max_tokens")
+    spans = [match.span() for match in _TOKEN_PATTERN.finditer(text)]
+    chunks = []
+    start = 0
+    while start < len(spans):
+        end = min(start + max_tokens, len(spans))
+        chunks.append(text[spans[start][0]:spans[end - 1][1]])
+        if end == len(spans):
+            break
+        start = end - overlap
+    return chunks
+
+def chunk_id(chunk):
+    """
+    Content-addressed id of a chunk: identical chunks share an id (and a vector).
+    """
+    return hashlib.sha256(chunk.encode('utf-8')).hexdigest()
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder (signed feature hashing of lowercased tokens).
+
+    Needs no network or API key, so it stands in for the real model in tests and
+    offline runs. The vectors only capture token overlap, not meaning.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension=DIMENSION):
+        self.dimension = dimension
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in _TOKEN_PATTERN.findall(text.lower()):
+                digest = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+                sign = 1.0 if digest & 1 else -1.0
+                vectors[row, (digest >> 1) % self.dimension] += sign
+        return vectors
+
+class GeminiEmbedder:
+    """
+    Embeds with the Gemini embedding model (3072 dimensions, matching the index).
+    Requires the google-generativeai library and GOOGLE_API_KEY.
+    """
+
+    name = "gemini"
+
+    def __init__(self, dimension=DIMENSION, model=GEMINI_EMBEDDING_MODEL):
+        import google.generativeai as genai
+        genai.configure(api_key=os.environ.get("GOOGLE_API_KEY"))
+        self._genai = genai
+        self.dimension = dimension
+        self.model = model
+
+    def embed(self, texts):
+        result = self._genai.embed_content(model=self.model, content=list(texts),
+                                           task_type="retrieval_document",
+                                           output_dimensionality=self.dimension)
+        return np.asarray(result["embedding"], dtype=np.float32)
+
+EMBEDDERS = {
+    "hashing": HashingEmbedder,
+    "gemini": GeminiEmbedder,
+}
+
+def delete_previous_chunks(index, file_path, keep):
+    """
+    Deletes the chunks of an earlier version of `file_path` from the index.
+
+    The local index looks up the ids stored for the path and keeps those for
+    which `keep(id)` is true (chunks the document still has, or that another
+    document of this run shares). Pinecone indexes delete by metadata filter,
+    so the document's unchanged chunks are embedded again.
+
+    Returns:
+        int: The number of ids deleted, or None when unknown (Pinecone).
+    """
+    if hasattr(index, "ids_for_file"):
+        stale = [vector_id for vector_id in index.ids_for_file(file_path) if not keep(vector_id)]
+        if stale:
+            index.delete(stale)
+        return len(stale)
+    index.delete(filter={"file_path": {"$eq": file_path}})
+    return None
+
+def iter_chunks(records, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP, stats=None, metrics=NULL_METRICS,
+                index=None):
+    """
+    Yields one {'id', 'text', 'metadata'} dict per distinct chunk of the records.
+
+    A chunk that was already yielded (same content, in this or an earlier document)
+    is skipped, so it is embedded once. With `index`, chunks of an earlier
+    version of each document that it no longer contains are deleted from the
+    index before its chunks are yielded. Metadata fields without a value are
+    left out, as Pinecone rejects null metadata.
+    """
+    seen = set()
+    for item in records:
+        content = item.get("content") or ""
+        if not content:
+            continue
+        file_path = item.get("file_path")
+        with metrics.stage("chunk", file_path):
+            chunks = chunk_text(content, max_tokens, overlap)
+        ids = [chunk_id(chunk) for chunk in chunks]
+        if index is not None and file_path is not None:
+            current = set(ids)
+            deleted = delete_previous_chunks(index, file_path,
+                                             lambda vector_id: vector_id in current or vector_id in seen)
+            if stats is not None and deleted:
+                stats["deleted"] = stats.get("deleted", 0) + deleted
+        metadata = item.get("metadata") or {}
+        for position, (cid, chunk) in enumerate(zip(ids, chunks)):
+            if stats is not None:
+                stats["chunks"] = stats.get("chunks", 0) + 1
+            if cid in seen:
+                if stats is not None:
+                    stats["duplicates"] = stats.get("duplicates", 0) + 1
+                continue
+            seen.add(cid)
+            chunk_metadata = {
+                "file_path": file_path,
+                "chunk_index": position,
+                "type": metadata.get("type"),
+                "relevance": metadata.get("relevance"),
+                "tags": metadata.get("tags", []),
+                "text": chunk,
+            }
+            yield {
+                "id": cid,
+                "text": chunk,
+                "metadata": {key: value for key, value in chunk_metadata.items() if value is not None},
+            }
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _existing_ids(index, ids):
+    if hasattr(index, "__contains__"):
+        return {vector_id for vector_id in ids if vector_id in index}
+    # Pinecone indexes answer fetch() with a response whose `vectors` maps id -> vector
+    fetched = index.fetch(ids=list(ids))
+    vectors = fetched.get("vectors", {}) if isinstance(fetched, dict) else fetched.vectors
+    return set(vectors)
+
+def embed_and_upsert(chunks, embedder, index, batch_size=EMBED_BATCH_SIZE, concurrency=EMBED_CONCURRENCY,
+                     upsert_batch_size=UPSERT_BATCH_SIZE, full=False, stats=None, metrics=NULL_METRICS):
+    """
+    Embeds chunks in batches on a thread pool and upserts the vectors in batches.
+
+    Chunks whose id is already in the index are unchanged (ids are content hashes)
+    and are not embedded again unless `full` is set. At most `concurrency` * 2
+    embedding batches are queued at a time, so memory stays bounded.
+
+    Returns:
+        dict: Counters for embedded, skipped and upserted chunks.
+    """
+    stats = stats if stats is not None else {}
+    for key in ("embedded", "skipped", "upserted"):
+        stats.setdefault(key, 0)
+    pending_upserts = []
+
+    def embed_batch(batch):
+        with metrics.stage("embed"):
+            return batch, embedder.embed([chunk["text"] for chunk in batch])
+
+    def flush_upserts():
+        with metrics.stage("upsert"):
+            index.upsert(vectors=pending_upserts)
+        stats["upserted"] += len(pending_upserts)
+        pending_upserts.clear()
+
+    def collect(future):
+        batch, vectors = future.result()
+        stats["embedded"] += len(batch)
+        for chunk, values in zip(batch, vectors):
+            # Plain lists, as the Pinecone client does not serialize NumPy arrays
+            pending_upserts.append({"id": chunk["id"], "values": values.tolist(), "metadata": chunk["metadata"]})
+        if len(pending_upserts) >= upsert_batch_size:
+            flush_upserts()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight = []
+        for batch in _batched(chunks, batch_size):
+            if not full:
+                existing = _existing_ids(index, [chunk["id"] for chunk in batch])
+                if existing:
+                    stats["skipped"] += len(existing)
+                    batch = [chunk for chunk in batch if chunk["id"] not in existing]
+                    if not batch:
+                        continue
+            in_flight.append(executor.submit(embed_batch, batch))
+            if len(in_flight) >= concurrency * 2:
+                collect(in_flight.pop(0))
+        for future in in_flight:
+            collect(future)
+    if pending_upserts:
+        flush_upserts()
+
+    metrics.incr("chunks_embedded", stats["embedded"])
+    metrics.incr("chunks_skipped", stats["skipped"])
+    return stats
+
+def open_index(backend, index_dir=LOCAL_INDEX_DIR, dimension=DIMENSION):
+    """
+    Opens the "seo-writer" index: the local embedded index or the Pinecone one.
+    """
+    if backend == "local":
+        return LocalVectorIndex(index_dir, dimension=dimension)
+    from pinecone import Pinecone
+    pc = Pinecone(api_key=os.environ.get("PINECONE_API_KEY"))
+    return pc.Index(INDEX_NAME)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Chunk triaged documents, embed the chunks and upsert them into the vector index.")
+    parser.add_argument("--input", default=INPUT_FILE,
+                        help="Triage records to embed (JSON Lines, or a legacy JSON array).")
+    parser.add_argument("--index", choices=["local", "pinecone"], default="local",
+                        help="Vector index backend (default: local).")
+    parser.add_argument("--index-dir", default=LOCAL_INDEX_DIR, help="Directory of the local index.")
+    parser.add_argument("--embedder", choices=sorted(EMBEDDERS), default="hashing",
+                        help="Embedding backend (default: hashing, the deterministic local embedder).")
+    parser.add_argument("--chunk-tokens", type=int, default=CHUNK_TOKENS,
+                        help=f"Maximum tokens per chunk (default: {CHUNK_TOKENS}).")
+    parser.add_argument("--overlap", type=int, default=CHUNK_OVERLAP,
+                        help=f"Tokens shared by consecutive chunks (default: {CHUNK_OVERLAP}).")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE,
+                        help=f"Chunks per embedding request (default: {EMBED_BATCH_SIZE}).")
+    parser.add_argument("--concurrency", type=int, default=EMBED_CONCURRENCY,
+                        help=f"Embedding requests in flight (default: {EMBED_CONCURRENCY}).")
+    parser.add_argument("--upsert-batch-size", type=int, default=UPSERT_BATCH_SIZE,
+                        help=f"Vectors per index upsert (default: {UPSERT_BATCH_SIZE}).")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-embed every chunk, even those already in the index.")
+    parser.add_argument("--build-ivf", action="store_true",
+                        help="Rebuild the local index's IVF structure after upserting.")
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    metrics = metrics_from_args(args, run_name="embed")
+    embedder = EMBEDDERS[args.embedder]()
+    index = open_index(args.index, args.index_dir, embedder.dimension)
+
+    print(f"Embedding chunks of {args.input} with the '{args.embedder}' embedder...")
+    stats = {}
+    chunks = iter_chunks(iter_records(args.input), args.chunk_tokens, args.overlap, stats=stats, metrics=metrics,
+                         index=index)
+    try:
+        embed_and_upsert(chunks, embedder, index, batch_size=args.batch_size, concurrency=args.concurrency,
+                         upsert_batch_size=args.upsert_batch_size, full=args.full, stats=stats, metrics=metrics)
+        if args.index == "local":
+            if args.build_ivf:
+                index.build_ivf()
+            index.flush()
+    finally:
+        metrics.write_outputs(args.metrics_report, args.metrics_prometheus)
+
+    print(f"Chunks: {stats.get('chunks', 0)} ({stats.get('duplicates', 0)} duplicates), "
+          f"embedded: {stats['embedded']}, unchanged: {stats['skipped']}, upserted: {stats['upserted']}, "
+          f"stale deleted: {stats.get('deleted', 0)}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+from keyword_automaton import KeywordAutomaton
+
+# --- Entity and Relationship Extraction Rules (Simulated LLM Logic) ---
+# Declarative rule table for the refined v1 schema. Each entity rule fires when any
+# of its keywords occurs in the content (case-sensitive substring match). The table
+# is compiled once into a single keyword automaton, so every document is scanned
+# exactly once no matter how many rules are defined here.
+
+# (entity name, entity type, keywords)
+ENTITY_RULES = [
+    # General Concepts
+    ("Artificial Intelligence", "Concept", ("AI", "artificial intelligence")),
+    ("Large Language Models", "Concept", ("LLM", "Large Language Model", "Gemini", "Claude", "ChatGPT", "Perplexity")),
+    ("Automation", "Concept", ("automation",)),
+    ("Project Management", "Concept", ("project management",)),
+    ("Data Quality", "Concept", ("data quality",)),
+    ("Data Governance", "Concept", ("data governance",)),
+    ("Semantic Understanding", "Concept", ("semantic",)),
+    ("Containerization", "Concept", ("containerization", "containers")),
+    ("Business Process Automation", "Concept", ("business process automation",)),
+
+    # Methodologies
+    ("BMAD Method", "Methodology", ("BMAD Method", "Breakthrough Method for Agile AI Driven Development")),
+    ("Agile Development", "Methodology", ("Agile", "Agile Development")),
+    ("KATA Methodology", "Methodology", ("KATA Methodology", "KATA cycle")),
+
+    # Tools
+    ("Neo4j", "Tool", ("Neo4j",)),
+    ("Obsidian", "Tool", ("Obsidian",)),
+    ("Docker", "Tool", ("Docker",)),
+    ("N8N", "Tool", ("N8N",)),
+    ("PyTorch", "Tool", ("PyTorch",)),
+    ("Git", "Tool", ("Git", "GitHub")),
+    ("VS Code", "Tool", ("VS Code",)),
+    ("Firecrawl", "Tool", ("Firecrawl",)),
+    ("ElevenLabs", "Tool", ("ElevenLabs",)),
+    ("Pip", "Tool", ("Pip",)),
+    ("Google Gemini", "Tool", ("Gemini",)),
+    ("Claude", "Tool", ("Claude",)),
+    ("ChatGPT", "Tool", ("ChatGPT",)),
+    ("Perplexity", "Tool", ("Perplexity",)),
+    ("Jetson Orin Nano", "Tool", ("Jetson Orin Nano",)),
+
+    # Client Pain Points
+    ("High Cloud Costs", "ClientPainPoint", ("high cloud infrastructure costs", "cloud costs")),
+    ("Talent Shortage", "ClientPainPoint", ("difficulty attracting skilled IT staff", "talent shortage")),
+    ("Data Fragmentation", "ClientPainPoint", ("data fragmentation", "data silos")),
+    ("Process Inefficiencies", "ClientPainPoint", ("process inefficiencies",)),
+    ("General Security Concerns", "ClientPainPoint", ("security concerns", "vulnerabilities")),
+    ("Client Pain Point", "ClientPainPoint", ("client pain point",)),
+
+    # Security Concerns
+    ("Ransomware Attack Risk", "SecurityConcern", ("Ransomware Attack", "ransomware risk")),
+    ("Data Breach Vulnerability", "SecurityConcern", ("Data Breach Vulnerability", "data breach")),
+    ("Unauthorized Access Threat", "SecurityConcern", ("Unauthorized Access Threat", "unauthorized access")),
+    ("Zero-Day Vulnerability", "SecurityConcern", ("zero-day vulnerability",)),
+    ("Security Threat", "SecurityConcern", ("security threat",)),
+
+    # Solutions
+    ("Cloud Cost Optimization", "Solution", ("Cloud Cost Optimization",)),
+    ("Digital Transformation", "Solution", ("Digital Transformation",)),
+    ("Multi-Factor Authentication", "Solution", ("Multi-Factor Authentication", "MFA")),
+    ("Knowledge Graph Consulting", "Solution", ("Knowledge Graph Consulting",)),
+    ("Automated Content Generation", "Solution", ("Automated Content Generation",)),
+    ("Conversation Intelligence", "Solution", ("Conversation Intelligence",)),
+    ("System Monitoring", "Solution", ("System Monitoring", "monitoring scripts")),
+    ("Project Structure Methodology", "Solution", ("Project Structure Methodology", "project structure")),
+    ("Data Retention Strategy", "Solution", ("Data Retention Strategy", "long-term retention")),
+    ("Conversation Analysis", "Solution", ("Conversation Analysis", "conversation processing")),
+    ("Troubleshooting Guide", "Solution", ("Troubleshooting Guide",)),
+
+    # Business Situations/Challenges
+    ("Northwest Tech Boom", "BusinessSituation", ("Northwest Tech Boom",)),
+    ("Market Trends", "BusinessSituation", ("market trends", "market analysis")),
+    ("Supply Chain Optimization", "BusinessChallenge", ("supply chain", "supply chain management")),
+    ("Regional Economic Factors", "BusinessSituation", ("regional economic report", "regional factors")),
+    ("Industry Trends", "BusinessSituation", ("industry trends",)),
+    ("General Business Challenges", "BusinessChallenge", ("business challenges",)),
+    ("Strategic Imperative", "BusinessSituation", ("strategic imperative",)),
+]
+
+# (source entity, target entity, relationship type)
+# A relationship fires when both of its endpoint entities were extracted.
+RELATIONSHIP_RULES = [
+    ("Large Language Models", "Artificial Intelligence", "IS_A"),
+    ("BMAD Method", "Agile Development", "IMPLEMENTS"),
+    ("KATA Methodology", "Project Management", "APPLIES_TO"),
+    ("Docker", "Containerization", "FACILITATES"),
+    ("N8N", "Business Process Automation", "FACILITATES"),
+    ("High Cloud Costs", "Cloud Cost Optimization", "ADDRESSED_BY"),
+    ("Talent Shortage", "Digital Transformation", "ADDRESSED_BY"),
+    ("Multi-Factor Authentication", "Unauthorized Access Threat", "MITIGATES"),
+
+    # If a Solution utilizes a Tool
+    ("Cloud Cost Optimization", "Microsoft Azure", "UTILIZES"),
+    ("Automated Content Generation", "Google Gemini", "UTILIZES"),
+    ("Automated Content Generation", "Perplexity", "UTILIZES"),
+    ("Conversation Intelligence", "Claude", "UTILIZES"),
+    ("Conversation Analysis", "Google Gemini", "UTILIZES"),
+    ("Conversation Analysis", "Claude", "UTILIZES"),
+
+    # If a Solution addresses a SecurityConcern
+    ("Troubleshooting Guide", "General Security Concerns", "ADDRESSES"),
+
+    # If a BusinessSituation leads to a BusinessChallenge
+    ("Northwest Tech Boom", "Talent Shortage", "LEADS_TO"),
+    ("Industry Trends", "General Business Challenges", "LEADS_TO"),
+]
+
+def compile_entity_rules(entity_rules):
+    """
+    Compiles an entity rule table into a keyword automaton.
+
+    Args:
+        entity_rules (list): (name, type, keywords) tuples.
+
+    Returns:
+        tuple: (KeywordAutomaton, dict mapping each keyword to the indices of the
+               rules it triggers).
+    """
+    rules_by_keyword = {}
+    for index, (_, _, keywords) in enumerate(entity_rules):
+        for keyword in keywords:
+            rules_by_keyword.setdefault(keyword, []).append(index)
+    return KeywordAutomaton(rules_by_keyword), rules_by_keyword
+
+_AUTOMATON, _RULES_BY_KEYWORD = compile_entity_rules(ENTITY_RULES)
+
+def extract_schema_from_content_with_llm(content):
+    """
+    **Simulated LLM for schema extraction based on refined v1 Schema.**
+
+    This function simulates a Gemini 1.5 Flash call, extracting entities and relationships
+    from the content based on keywords that align with our v1 schema. The content is
+    scanned once by the compiled rule automaton.
+
+    Args:
+        content (str): The text content of a document.
+
+    Returns:
+        dict: A dictionary with extracted 'entities' and 'relationships'.
+    """
+    matched_rules = set()
+    for keyword in _AUTOMATON.find_all(content):
+        matched_rules.update(_RULES_BY_KEYWORD[keyword])
+
+    entities = []
+    entity_names = set()
+    for index in sorted(matched_rules):
+        name, entity_type, _ = ENTITY_RULES[index]
+        if name not in entity_names:
+            entity_names.add(name)
+            entities.append({"name": name, "type": entity_type})
+
+    relationships = []
+    seen_relationships = set()
+    for source, target, rel_type in RELATIONSHIP_RULES:
+        key = (source, target, rel_type)
+        if source in entity_names and target in entity_names and key not in seen_relationships:
+            seen_relationships.add(key)
+            relationships.append({"source": source, "target": target, "type": rel_type})
+
+    return {"entities": entities, "relationships": relationships}
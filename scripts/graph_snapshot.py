@@ -0,0 +1,295 @@
+import os
+import json
+import argparse
+from collections import defaultdict
+
+# This module requires numpy. You can install it with: pip install numpy
+import numpy as np
+
+# --- Configuration ---
+GRAPH_SNAPSHOT_DIR = "/home/rosie/projects/fae-intelligence/scripts/graph_snapshot"
+SNAPSHOT_VERSION = 1
+
+class GraphSnapshotBuilder:
+    """
+    Accumulates the graph written by the ingestors and saves it as a compact snapshot.
+
+    Every label, name and file path is interned once in a string table; nodes are
+    integer ids; edges are deduplicated per relationship type. Documents are added
+    with the same semantics as Neo4jIngestor (a Source per file, CONTAINS edges to
+    its entities, relationships between entities of the same document).
+    """
+
+    def __init__(self):
+        self.strings = []
+        self._string_ids = {}
+        self.node_labels = []
+        self.node_names = []
+        self.node_paths = []
+        self._node_ids = {}
+        self.edges = defaultdict(set)   # rel type -> {(source id, target id)}
+
+    def _intern(self, value):
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def add_node(self, label, name, file_path=None):
+        key = (label, name)
+        node = self._node_ids.get(key)
+        if node is None:
+            node = self._node_ids[key] = len(self.node_labels)
+            self.node_labels.append(self._intern(label))
+            self.node_names.append(self._intern(name))
+            self.node_paths.append(-1)
+        if file_path and self.node_paths[node] == -1:
+            self.node_paths[node] = self._intern(file_path)
+        return node
+
+    def add_edge(self, rel_type, source, target):
+        self.edges[rel_type].add((source, target))
+
+    def add_document(self, item):
+        """
+        Adds one extraction result ({'file_path', 'entities', 'relationships'}).
+        """
+        file_path = item["file_path"]
+        source = self.add_node('Source', os.path.basename(file_path), file_path)
+        entity_types = {}
+        for entity in item.get("entities", []):
+            entity_types[entity['name']] = entity['type']
+            self.add_edge('CONTAINS', source, self.add_node(entity['type'], entity['name']))
+        for rel in item.get("relationships", []):
+            source_type = entity_types.get(rel['source'])
+            target_type = entity_types.get(rel['target'])
+            if source_type and target_type:
+                self.add_edge(rel['type'], self.add_node(source_type, rel['source']),
+                              self.add_node(target_type, rel['target']))
+
+    def save(self, directory=GRAPH_SNAPSHOT_DIR):
+        """
+        Writes the snapshot to `directory`:
+
+        - strings.bin / string_offsets.npy: the UTF-8 string table
+        - node_label.npy, node_name.npy, node_path.npy: string ids per node (-1: none)
+        - <REL_TYPE>.indptr.npy / <REL_TYPE>.indices.npy: outgoing edges in CSR form
+        - snapshot.json: node count, relationship types and edge counts
+        """
+        os.makedirs(directory, exist_ok=True)
+        encoded = [s.encode('utf-8') for s in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        with open(os.path.join(directory, "strings.bin"), 'wb') as f:
+            f.write(b"".join(encoded))
+        np.save(os.path.join(directory, "string_offsets.npy"), offsets)
+        np.save(os.path.join(directory, "node_label.npy"), np.array(self.node_labels, dtype=np.int32))
+        np.save(os.path.join(directory, "node_name.npy"), np.array(self.node_names, dtype=np.int32))
+        np.save(os.path.join(directory, "node_path.npy"), np.array(self.node_paths, dtype=np.int32))
+
+        node_count = len(self.node_labels)
+        edge_counts = {}
+        for rel_type, pairs in sorted(self.edges.items()):
+            pairs = np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+            indptr = np.zeros(node_count + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum(np.bincount(pairs[:, 0], minlength=node_count))
+            np.save(os.path.join(directory, f"{rel_type}.indptr.npy"), indptr)
+            np.save(os.path.join(directory, f"{rel_type}.indices.npy"), pairs[:, 1].astype(np.int32))
+            edge_counts[rel_type] = len(pairs)
+
+        with open(os.path.join(directory, "snapshot.json"), 'w', encoding='utf-8') as f:
+            json.dump({"version": SNAPSHOT_VERSION, "node_count": node_count,
+                       "rel_types": sorted(edge_counts), "edge_counts": edge_counts}, f, indent=2)
+        return directory
+
+class GraphSnapshot:
+    """
+    Read-only view of a saved snapshot. The arrays are memory-mapped, so loading
+    is near-instant regardless of graph size and pages are read on demand.
+    """
+
+    def __init__(self, directory=GRAPH_SNAPSHOT_DIR, mmap=True):
+        mode = 'r' if mmap else None
+        with open(os.path.join(directory, "snapshot.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported graph snapshot version: {meta.get('version')}")
+        self.directory = directory
+        self.node_count = meta["node_count"]
+        self.rel_types = meta["rel_types"]
+        self.edge_counts = meta["edge_counts"]
+
+        load = lambda name: np.load(os.path.join(directory, name), mmap_mode=mode)
+        with open(os.path.join(directory, "strings.bin"), 'rb') as f:
+            self._string_bytes = f.read()
+        self._string_offsets = load("string_offsets.npy")
+        self.node_label = load("node_label.npy")
+        self.node_name = load("node_name.npy")
+        self.node_path = load("node_path.npy")
+        self.indptr = {rel_type: load(f"{rel_type}.indptr.npy") for rel_type in self.rel_types}
+        self.indices = {rel_type: load(f"{rel_type}.indices.npy") for rel_type in self.rel_types}
+        self._node_ids = None
+
+    def string(self, string_id):
+        start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+        return self._string_bytes[start:end].decode('utf-8')
+
+    def node(self, node):
+        """
+        Returns (label, name) of a node id.
+        """
+        return self.string(self.node_label[node]), self.string(self.node_name[node])
+
+    def file_path(self, node):
+        path_id = self.node_path[node]
+        return None if path_id < 0 else self.string(path_id)
+
+    def node_id(self, label, name):
+        """
+        Returns the id of (label, name), or None. The lookup table is built on first use.
+        """
+        if self._node_ids is None:
+            self._node_ids = {self.node(node): node for node in range(self.node_count)}
+        return self._node_ids.get((label, name))
+
+    def labels(self):
+        """
+        Returns {label: node count}.
+        """
+        string_ids, counts = np.unique(self.node_label, return_counts=True)
+        return {self.string(string_id): int(count) for string_id, count in zip(string_ids, counts)}
+
+    def edge_arrays(self, rel_type):
+        """
+        Returns (sources, targets) arrays of the edges of one relationship type.
+        """
+        indptr = self.indptr[rel_type]
+        sources = np.repeat(np.arange(self.node_count, dtype=np.int32), np.diff(indptr))
+        return sources, np.asarray(self.indices[rel_type])
+
+    def successors(self, node, rel_type):
+        indptr = self.indptr[rel_type]
+        return self.indices[rel_type][indptr[node]:indptr[node + 1]]
+
+    def out_degree(self, rel_types=None):
+        degree = np.zeros(self.node_count, dtype=np.int64)
+        for rel_type in rel_types or self.rel_types:
+            degree += np.diff(self.indptr[rel_type])
+        return degree
+
+    def in_degree(self, rel_types=None):
+        degree = np.zeros(self.node_count, dtype=np.int64)
+        for rel_type in rel_types or self.rel_types:
+            degree += np.bincount(self.indices[rel_type], minlength=self.node_count)
+        return degree
+
+    def degree(self, rel_types=None):
+        return self.out_degree(rel_types) + self.in_degree(rel_types)
+
+    def connected_components(self, rel_types=None):
+        """
+        Labels the weakly connected components over the given relationship types.
+
+        Vectorized min-label propagation with pointer jumping: every node ends up
+        labelled with the smallest node id of its component.
+
+        Returns:
+            numpy.ndarray: Component label per node id.
+        """
+        sources, targets = [], []
+        for rel_type in rel_types or self.rel_types:
+            s, t = self.edge_arrays(rel_type)
+            sources.append(s)
+            targets.append(t)
+        labels = np.arange(self.node_count, dtype=np.int64)
+        if not sources:
+            return labels
+        sources = np.concatenate(sources)
+        targets = np.concatenate(targets)
+        while True:
+            previous = labels.copy()
+            edge_min = np.minimum(labels[sources], labels[targets])
+            np.minimum.at(labels, sources, edge_min)
+            np.minimum.at(labels, targets, edge_min)
+            while True:
+                jumped = labels[labels]
+                if np.array_equal(jumped, labels):
+                    break
+                labels = jumped
+            if np.array_equal(labels, previous):
+                return labels
+
+    def co_occurrence(self, rel_type='CONTAINS', top_n=20):
+        """
+        Counts how often two targets of `rel_type` share a source (for CONTAINS: how
+        many documents mention both entities).
+
+        Returns:
+            list: ((label, name), (label, name), count) tuples, most frequent first.
+        """
+        indptr = self.indptr.get(rel_type)
+        if indptr is None:
+            return []
+        indices = np.asarray(self.indices[rel_type]).astype(np.int64)
+        out_degree = np.diff(indptr)
+        pair_keys = []
+        # Sources with the same out-degree k form an (m, k) block of target rows, so
+        # the pairs of a whole block are generated with one fancy-indexing step.
+        for k in np.unique(out_degree[out_degree > 1]):
+            starts = indptr[:-1][out_degree == k]
+            block = np.sort(indices[starts[:, None] + np.arange(k)], axis=1)
+            first, second = np.triu_indices(k, k=1)
+            pair_keys.append((block[:, first] * self.node_count + block[:, second]).ravel())
+        if not pair_keys:
+            return []
+        keys, counts = np.unique(np.concatenate(pair_keys), return_counts=True)
+        order = np.argsort(-counts, kind='stable')[:top_n]
+        return [(self.node(int(keys[i] // self.node_count)), self.node(int(keys[i] % self.node_count)),
+                 int(counts[i])) for i in order]
+
+def build_from_documents(documents, directory=GRAPH_SNAPSHOT_DIR):
+    builder = GraphSnapshotBuilder()
+    for item in documents:
+        builder.add_document(item)
+    return builder.save(directory)
+
+def summarize(snapshot, top_n=10):
+    """
+    Prints node, edge, degree, component and co-occurrence statistics.
+    """
+    print(f"Graph snapshot: {snapshot.node_count} nodes, {sum(snapshot.edge_counts.values())} edges")
+    print("\n## Nodes per label:")
+    for label, count in sorted(snapshot.labels().items()):
+        print(f"- {label}: {count}")
+    print("\n## Edges per relationship type:")
+    for rel_type in snapshot.rel_types:
+        print(f"- {rel_type}: {snapshot.edge_counts[rel_type]}")
+
+    if snapshot.node_count:
+        degree = snapshot.degree()
+        print("\n## Highest-degree nodes:")
+        for node in np.argsort(-degree, kind='stable')[:top_n]:
+            label, name = snapshot.node(int(node))
+            print(f"- {name} ({label}): {int(degree[node])}")
+
+        components = snapshot.connected_components()
+        sizes = np.bincount(components)
+        sizes = np.sort(sizes[sizes > 0])[::-1]
+        print(f"\n## Connected components: {len(sizes)} (largest: {', '.join(str(s) for s in sizes[:5])})")
+
+    pairs = snapshot.co_occurrence(top_n=top_n)
+    if pairs:
+        print("\n## Most frequent entity co-occurrences:")
+        for (_, first), (_, second), count in pairs:
+            print(f"- {first} + {second}: {count} documents")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a graph snapshot written by ingest_to_neo4j.py.")
+    parser.add_argument("directory", nargs="?", default=GRAPH_SNAPSHOT_DIR, help="The snapshot directory.")
+    parser.add_argument("--top", type=int, default=10, help="Entries listed per statistic (default: 10).")
+    args = parser.parse_args(argv)
+    summarize(GraphSnapshot(args.directory), args.top)
+
+if __name__ == "__main__":
+    main()
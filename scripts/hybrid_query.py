@@ -0,0 +1,298 @@
+import os
+import time
+import argparse
+from collections import OrderedDict, defaultdict
+
+from entity_extraction import ENTITY_RULES
+from keyword_automaton import KeywordAutomaton
+from ingestion_manifest import IngestionManifest, MANIFEST_PATH
+
+# --- Configuration ---
+# TODO: Replace with your actual Neo4j connection details
+NEO4J_URI = "bolt://localhost:7687"
+NEO4J_USER = "neo4j"
+NEO4J_PASSWORD = "password" # Replace with your password
+
+# Relationship types followed when expanding from the seed entities
+EXPANSION_REL_TYPES = ("CONTAINS", "ADDRESSED_BY", "UTILIZES")
+DEFAULT_HOPS = 2
+HOP_DECAY = 0.5            # Score multiplier per hop away from a seed
+NEIGHBOURHOOD_CACHE_SIZE = 4096
+
+class AdjacencySnapshot:
+    """
+    In-memory copy of the knowledge graph for fast traversal.
+
+    Nodes are (label, name) pairs mapped to integer ids; for each relationship type
+    the snapshot keeps an undirected adjacency list, so expansion can walk from a
+    Source to its entities and back. It can be built from extraction results (the
+    same documents ingest_to_neo4j.py writes), from the ingestion manifest, or from
+    a live Neo4j database.
+    """
+
+    def __init__(self):
+        self.nodes = []          # id -> (label, name)
+        self.node_ids = {}       # (label, name) -> id
+        self.file_paths = {}     # Source id -> filePath
+        self.adjacency = defaultdict(lambda: defaultdict(set))  # rel type -> id -> {neighbour ids}
+
+    def node_id(self, label, name):
+        key = (label, name)
+        node = self.node_ids.get(key)
+        if node is None:
+            node = self.node_ids[key] = len(self.nodes)
+            self.nodes.append(key)
+        return node
+
+    def add_edge(self, source, rel_type, target):
+        self.adjacency[rel_type][source].add(target)
+        self.adjacency[rel_type][target].add(source)
+
+    def add_document(self, item):
+        """
+        Adds one extraction result ({'file_path', 'entities', 'relationships'}).
+        """
+        source = self.node_id('Source', os.path.basename(item["file_path"]))
+        self.file_paths.setdefault(source, item["file_path"])
+        entity_types = {}
+        for entity in item.get("entities", []):
+            entity_types[entity['name']] = entity['type']
+            self.add_edge(source, 'CONTAINS', self.node_id(entity['type'], entity['name']))
+        for rel in item.get("relationships", []):
+            source_type = entity_types.get(rel['source'])
+            target_type = entity_types.get(rel['target'])
+            if source_type and target_type:
+                self.add_edge(self.node_id(source_type, rel['source']), rel['type'],
+                              self.node_id(target_type, rel['target']))
+
+    @classmethod
+    def from_documents(cls, documents):
+        snapshot = cls()
+        for item in documents:
+            snapshot.add_document(item)
+        return snapshot
+
+    @classmethod
+    def from_manifest(cls, manifest_path=MANIFEST_PATH):
+        with IngestionManifest(manifest_path) as manifest:
+            return cls.from_documents(manifest.iter_extractions())
+
+    @classmethod
+    def from_graph_snapshot(cls, directory):
+        """
+        Builds the adjacency from a snapshot written by ingest_to_neo4j.py --snapshot.
+        """
+        from graph_snapshot import GraphSnapshot
+        graph = GraphSnapshot(directory)
+        snapshot = cls()
+        for node in range(graph.node_count):
+            snapshot.node_id(*graph.node(node))
+            file_path = graph.file_path(node)
+            if file_path:
+                snapshot.file_paths[node] = file_path
+        for rel_type in graph.rel_types:
+            sources, targets = graph.edge_arrays(rel_type)
+            for source, target in zip(sources.tolist(), targets.tolist()):
+                snapshot.add_edge(source, rel_type, target)
+        return snapshot
+
+    @classmethod
+    def from_neo4j(cls, uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD):
+        from neo4j import GraphDatabase
+        snapshot = cls()
+        query = (
+            "MATCH (a)-[r]->(b) "
+            "RETURN labels(a)[0] AS a_label, a.name AS a_name, a.filePath AS a_path, "
+            "type(r) AS rel_type, labels(b)[0] AS b_label, b.name AS b_name"
+        )
+        with GraphDatabase.driver(uri, auth=(user, password)) as driver:
+            with driver.session() as session:
+                for record in session.run(query):
+                    source = snapshot.node_id(record["a_label"], record["a_name"])
+                    if record["a_path"]:
+                        snapshot.file_paths.setdefault(source, record["a_path"])
+                    target = snapshot.node_id(record["b_label"], record["b_name"])
+                    snapshot.add_edge(source, record["rel_type"], target)
+        return snapshot
+
+    def neighbours(self, node, rel_types):
+        result = set()
+        for rel_type in rel_types:
+            result.update(self.adjacency.get(rel_type, {}).get(node, ()))
+        return result
+
+class HybridQueryEngine:
+    """
+    Answers text queries with ranked source documents.
+
+    Seeds come from two places: entities named in the query, found by a
+    case-insensitive whole-word match on the entity names in the snapshot and
+    the keywords of the extraction rules, and, if a vector index and embedder
+    are given, the sources of the nearest chunks. From every seed the engine expands up to `hops`
+    hops over EXPANSION_REL_TYPES; a source reached at distance d from a seed of
+    weight w scores w * HOP_DECAY ** d.
+
+    Neighbourhoods (node, hops) -> {node: distance} are kept in an LRU cache, so
+    repeated queries over hot entities do not traverse the graph again.
+    """
+
+    def __init__(self, snapshot, vector_index=None, embedder=None, rel_types=EXPANSION_REL_TYPES,
+                 cache_size=NEIGHBOURHOOD_CACHE_SIZE):
+        self.snapshot = snapshot
+        self.vector_index = vector_index
+        self.embedder = embedder
+        self.rel_types = tuple(rel_types)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        names = {}
+        for node, (label, name) in enumerate(snapshot.nodes):
+            if label != 'Source':
+                names.setdefault(name.lower(), []).append(node)
+        for name, entity_type, keywords in ENTITY_RULES:
+            node = snapshot.node_ids.get((entity_type, name))
+            if node is not None:
+                for keyword in keywords:
+                    nodes = names.setdefault(keyword.lower(), [])
+                    if node not in nodes:
+                        nodes.append(node)
+        self._names_by_lower = names
+        self._name_automaton = KeywordAutomaton(names)
+
+    def neighbourhood(self, node, hops):
+        """
+        Returns {node id: hop distance} for every node within `hops` hops of `node`.
+        """
+        key = (node, hops)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+        self.cache_misses += 1
+
+        distances = {node: 0}
+        frontier = [node]
+        for distance in range(1, hops + 1):
+            next_frontier = []
+            for current in frontier:
+                for neighbour in self.snapshot.neighbours(current, self.rel_types):
+                    if neighbour not in distances:
+                        distances[neighbour] = distance
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+
+        self._cache[key] = distances
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return distances
+
+    def keyword_seeds(self, text):
+        """
+        Returns {node id: weight} for the entities named in `text`.
+        """
+        seeds = {}
+        for name in self._name_automaton.find_all_words(text.lower()):
+            for node in self._names_by_lower[name]:
+                seeds[node] = 1.0
+        return seeds
+
+    def vector_seeds(self, text, top_k=10):
+        """
+        Returns {Source node id: best chunk similarity} for the chunks nearest to `text`.
+        """
+        if self.vector_index is None or self.embedder is None:
+            return {}
+        vector = self.embedder.embed([text])[0]
+        seeds = {}
+        for match in self.vector_index.query(vector, top_k=top_k, include_metadata=True)["matches"]:
+            file_path = (match.get("metadata") or {}).get("file_path")
+            if not file_path:
+                continue
+            node = self.snapshot.node_ids.get(('Source', os.path.basename(file_path)))
+            if node is not None and match["score"] > seeds.get(node, 0.0):
+                seeds[node] = match["score"]
+        return seeds
+
+    def query(self, text, hops=DEFAULT_HOPS, top_n=10, vector_top_k=10):
+        """
+        Returns up to `top_n` sources ranked by score, best first.
+
+        Returns:
+            list: {'name', 'file_path', 'score', 'entities'} dicts, where 'entities'
+                  lists the seed entities that led to the source.
+        """
+        seeds = self.keyword_seeds(text)
+        for node, weight in self.vector_seeds(text, vector_top_k).items():
+            seeds[node] = max(weight, seeds.get(node, 0.0))
+
+        scores = defaultdict(float)
+        reasons = defaultdict(set)
+        for seed, weight in seeds.items():
+            seed_label, seed_name = self.snapshot.nodes[seed]
+            for node, distance in self.neighbourhood(seed, hops).items():
+                label, name = self.snapshot.nodes[node]
+                if label != 'Source':
+                    continue
+                scores[node] += weight * HOP_DECAY ** distance
+                if seed_label != 'Source':
+                    reasons[node].add(seed_name)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.snapshot.nodes[item[0]][1]))
+        return [{
+            "name": self.snapshot.nodes[node][1],
+            "file_path": self.snapshot.file_paths.get(node),
+            "score": round(score, 6),
+            "entities": sorted(reasons[node]),
+        } for node, score in ranked[:top_n]]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Find source documents for a text query via the knowledge graph and the vector index.")
+    parser.add_argument("query", help="The text query.")
+    parser.add_argument("--graph", choices=["manifest", "snapshot", "neo4j"], default="manifest",
+                        help="Where to load the adjacency snapshot from (default: the ingestion manifest).")
+    parser.add_argument("--graph-snapshot", metavar="DIR",
+                        help="Snapshot directory for --graph snapshot (default: the ingest --snapshot directory).")
+    parser.add_argument("--hops", type=int, default=DEFAULT_HOPS, help=f"Expansion depth (default: {DEFAULT_HOPS}).")
+    parser.add_argument("--top", type=int, default=10, help="Number of sources to return (default: 10).")
+    parser.add_argument("--vector-index", metavar="DIR",
+                        help="Also seed from the local vector index in DIR (see embedding_pipeline.py).")
+    parser.add_argument("--embedder", default="hashing",
+                        help="Embedder matching the one the index was built with (default: hashing).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    start = time.perf_counter()
+    if args.graph == "snapshot":
+        from graph_snapshot import GRAPH_SNAPSHOT_DIR
+        snapshot = AdjacencySnapshot.from_graph_snapshot(args.graph_snapshot or GRAPH_SNAPSHOT_DIR)
+    elif args.graph == "neo4j":
+        snapshot = AdjacencySnapshot.from_neo4j()
+    else:
+        snapshot = AdjacencySnapshot.from_manifest()
+    vector_index = embedder = None
+    if args.vector_index:
+        from embedding_pipeline import EMBEDDERS
+        from local_vector_index import LocalVectorIndex
+        embedder = EMBEDDERS[args.embedder]()
+        vector_index = LocalVectorIndex(args.vector_index, dimension=embedder.dimension)
+    engine = HybridQueryEngine(snapshot, vector_index, embedder)
+    print(f"Loaded graph snapshot with {len(snapshot.nodes)} nodes in {time.perf_counter() - start:.2f}s.")
+
+    start = time.perf_counter()
+    results = engine.query(args.query, hops=args.hops, top_n=args.top)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if not results:
+        print("No matching sources found.")
+    for rank, result in enumerate(results, 1):
+        entities = ", ".join(result["entities"]) or "vector match"
+        print(f"{rank:2d}. {result['name']}  (score {result['score']:.3f}; via {entities})")
+    print(f"Query answered in {elapsed_ms:.1f} ms.")
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,161 @@
-import json
 import os
+import argparse
+import asyncio
+from collections import defaultdict
 
 # This script requires the neo4j library.
 # You can install it with: pip install neo4j
 from neo4j import GraphDatabase
 
+from entity_extraction import extract_schema_from_content_with_llm, ENTITY_RULES
+from ingestion_manifest import IngestionManifest, MANIFEST_PATH, hash_text
+from record_stream import iter_records
+from pipeline_metrics import NULL_METRICS, add_metrics_arguments, metrics_from_args
+
 # --- Configuration ---
 # TODO: Replace with your actual Neo4j connection details
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
 NEO4J_PASSWORD = "password" # Replace with your password
 
-INPUT_FILE = "/home/rosie/projects/fae-intelligence/scripts/triage_output.json"
+# Triage records as JSON Lines (legacy triage_output.json arrays are also accepted)
+INPUT_FILE = "/home/rosie/projects/fae-intelligence/scripts/triage_output.jsonl"
+
+# Bulk ingestion groups nodes by label and edges by relationship type and writes
+# them with parameterized UNWIND queries, one transaction per batch.
+USE_BULK_INGESTION = True
+BATCH_SIZE = 1000 # Rows per UNWIND transaction
+
+# Optional compact on-disk copy of the ingested graph (--snapshot), for analytics
+# without a database
+GRAPH_SNAPSHOT_DIR = "/home/rosie/projects/fae-intelligence/scripts/graph_snapshot"
+
+# Every node label of the v1 schema gets a uniqueness constraint on `name` (which
+# is backed by an index), so MERGE and MATCH on name are index seeks.
+SCHEMA_LABELS = ['Source'] + sorted({entity_type for _, entity_type, _ in ENTITY_RULES})
+
+def group_document(item, nodes, edges, sources=None):
+    """
+    Adds one extraction result to the bulk write buffers shared by the sync and
+    async ingestors: its Source and entity nodes to `nodes` (label -> {name:
+    properties}) and its edges to `edges` (rel type -> {((source label, name),
+    (target label, name))}). The Source name is added to `sources`, if given,
+    for every document (with or without entities), as the CONTAINS edges of
+    these Sources are replaced by the ones buffered.
+
+    Returns:
+        int: The number of rows buffered, 0 for documents without entities or
+             relationships (which are skipped).
+    """
+    file_path = item.get("file_path")
+    source_name = os.path.basename(file_path)
+    if sources is not None:
+        sources.add(source_name)
+    entities = item.get("entities", [])
+    relationships = item.get("relationships", [])
+    if not entities and not relationships:
+        return 0
+
+    nodes['Source'].setdefault(source_name, {"filePath": file_path})
+    buffered = 1
+
+    entity_types = {}
+    for entity in entities:
+        entity_types[entity['name']] = entity['type']
+        nodes[entity['type']].setdefault(entity['name'], {})
+        edges['CONTAINS'].add((('Source', source_name), (entity['type'], entity['name'])))
+        buffered += 2
+
+    for rel in relationships:
+        source_type = entity_types.get(rel['source'])
+        target_type = entity_types.get(rel['target'])
+        if source_type and target_type:
+            edges[rel['type']].add(((source_type, rel['source']), (target_type, rel['target'])))
+            buffered += 1
+    return buffered
+
+def node_rows(rows_by_name):
+    return [{"name": name, **props} for name, props in rows_by_name.items()]
+
+def edge_rows(pairs, node_index):
+    return [{"source_id": node_index[source], "target_id": node_index[target]} for source, target in pairs]
+
+def merge_nodes_query(label):
+    """
+    UNWIND query merging `label` nodes by name and returning their element ids.
+    """
+    if label == 'Source':
+        return (
+            "UNWIND $rows AS row "
+            "MERGE (s:Source {name: row.name}) "
+            "ON CREATE SET s.filePath = row.filePath "
+            "RETURN row.name AS name, elementId(s) AS id"
+        )
+    return (
+        f"UNWIND $rows AS row MERGE (n:{label} {{name: row.name}}) "
+        "RETURN row.name AS name, elementId(n) AS id"
+    )
+
+def delete_outgoing_query(rel_type):
+    """
+    UNWIND query deleting the outgoing `rel_type` edges of Source nodes by name.
+    """
+    return (
+        "UNWIND $names AS name "
+        f"MATCH (:Source {{name: name}})-[r:{rel_type}]->() "
+        "DELETE r"
+    )
+
+def merge_relationships_query(rel_type):
+    """
+    UNWIND query merging `rel_type` edges between nodes looked up by element id.
+    """
+    return (
+        "UNWIND $rows AS row "
+        "MATCH (a) WHERE elementId(a) = row.source_id "
+        "MATCH (b) WHERE elementId(b) = row.target_id "
+        f"MERGE (a)-[r:{rel_type}]->(b)"
+    )
 
 class Neo4jIngestor:
-    def __init__(self, uri, user, password):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    def __init__(self, uri, user, password, driver=None, metrics=NULL_METRICS, snapshot=None):
+        # An already constructed driver (or an in-process stand-in) may be passed in
+        self.driver = driver or GraphDatabase.driver(uri, auth=(user, password))
+        self.metrics = metrics
+        # Optional GraphSnapshotBuilder that records every document written
+        self.snapshot = snapshot
+        # Per-run index of written nodes: (label, name) -> Neo4j element id
+        self.node_index = {}
+        self._indexed_labels = set()
 
     def close(self):
         self.driver.close()
 
+    def ensure_schema(self, labels=SCHEMA_LABELS):
+        """
+        Creates a uniqueness constraint (and with it an index) on `name` for each label.
+
+        Args:
+            labels (iterable): Node labels to index. Labels already handled in this
+                               run are skipped.
+        """
+        with self.driver.session() as session:
+            self._ensure_label_indexes(session, labels)
+
+    def _ensure_label_indexes(self, session, labels):
+        for label in labels:
+            if label in self._indexed_labels:
+                continue
+            query = (
+                f"CREATE CONSTRAINT {label}_name_unique IF NOT EXISTS "
+                f"FOR (n:{label}) REQUIRE n.name IS UNIQUE"
+            )
+            try:
+                session.run(query).consume()
+            except Exception as e:
+                print(f"Warning: could not create name constraint for label {label}: {e}")
+            self._indexed_labels.add(label)
+
     def ingest_data(self, data):
         with self.driver.session() as session:
             for item in data:
@@ -31,6 +167,8 @@ class Neo4jIngestor:
                     continue
 
                 print(f"Ingesting data from: {file_path}")
+                if self.snapshot is not None:
+                    self.snapshot.add_document(item)
 
                 # Ingest a source node for the document itself
                 session.write_transaction(self._create_source_node, file_path)
@@ -44,16 +182,162 @@ class Neo4jIngestor:
                                               target_node=(entity['type'], entity['name']),
                                               rel_type='CONTAINS')
 
-                # Ingest relationships
+                # Ingest relationships, resolving endpoints through a name -> type index
+                entity_types = {e['name']: e['type'] for e in entities}
                 for rel in relationships:
-                    source_entity = next((e for e in entities if e['name'] == rel['source']), None)
-                    target_entity = next((e for e in entities if e['name'] == rel['target']), None)
-                    if source_entity and target_entity:
+                    source_type = entity_types.get(rel['source'])
+                    target_type = entity_types.get(rel['target'])
+                    if source_type and target_type:
                         session.write_transaction(self._create_relationship, 
-                                                  source_node=(source_entity['type'], source_entity['name']),
-                                                  target_node=(target_entity['type'], target_entity['name']),
+                                                  source_node=(source_type, rel['source']),
+                                                  target_node=(target_type, rel['target']),
                                                   rel_type=rel['type'])
 
+    def ingest_data_bulk(self, data, batch_size=BATCH_SIZE):
+        """
+        Ingests extracted data with batched, parameterized UNWIND queries.
+
+        Nodes are grouped by label and edges by relationship type. Buffered rows
+        are flushed whenever `batch_size` rows have accumulated, nodes before
+        edges, with one transaction per batch. Node merges return element ids,
+        which are kept in `node_index` so that edges are written by id lookup
+        instead of re-matching both endpoints by label and name.
+
+        A re-ingested document replaces its previous version: the existing
+        CONTAINS edges of its Source are deleted before the new ones are written,
+        so entities no longer in the document are no longer linked to it.
+
+        Args:
+            data (iterable): Items with 'file_path', 'entities' and 'relationships'.
+            batch_size (int): Maximum number of rows written per transaction.
+
+        Returns:
+            int: The number of write transactions committed.
+        """
+        nodes = defaultdict(dict)   # label -> {name: properties}
+        edges = defaultdict(set)    # rel type -> {((source label, name), (target label, name))}
+        sources = set()             # Source names whose CONTAINS edges are replaced
+        buffered = 0
+        transactions = 0
+
+        with self.driver.session() as session:
+            for item in data:
+                rows = group_document(item, nodes, edges, sources)
+                if not rows:
+                    continue
+                buffered += rows
+                if self.snapshot is not None:
+                    self.snapshot.add_document(item)
+
+                if buffered >= batch_size:
+                    transactions += self._flush_bulk(session, nodes, edges, batch_size, sources)
+                    buffered = 0
+
+            transactions += self._flush_bulk(session, nodes, edges, batch_size, sources)
+
+        return transactions
+
+    def ingest_links_bulk(self, links, batch_size=BATCH_SIZE, rel_type='LINKS_TO', replace_sources=()):
+        """
+        Writes resolved document-to-document links with batched UNWIND queries.
+
+        Both endpoints are merged as Source nodes, since a linked note need not
+        have yielded any entities (and so need not have a Source node yet).
+
+        Args:
+            links (iterable): (source file path, target file path) pairs.
+            batch_size (int): Maximum number of links written per transaction.
+            replace_sources (iterable): File paths whose complete set of outgoing
+                                        links is in `links`; their existing
+                                        `rel_type` edges are deleted first, so
+                                        links removed from a note disappear.
+
+        Returns:
+            int: The number of write transactions committed.
+        """
+        rows = []
+        for source_path, target_path in links:
+            rows.append({"source": os.path.basename(source_path), "source_path": source_path,
+                         "target": os.path.basename(target_path), "target_path": target_path})
+            if self.snapshot is not None:
+                self.snapshot.add_edge(rel_type,
+                                       self.snapshot.add_node('Source', rows[-1]["source"], source_path),
+                                       self.snapshot.add_node('Source', rows[-1]["target"], target_path))
+        names = sorted({os.path.basename(file_path) for file_path in replace_sources})
+        transactions = 0
+        with self.driver.session() as session:
+            self._ensure_label_indexes(session, ['Source'])
+            for start in range(0, len(names), batch_size):
+                with self.metrics.stage("db_write", f"delete:{rel_type}"):
+                    session.write_transaction(self._delete_outgoing_batch, rel_type, names[start:start + batch_size])
+                transactions += 1
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                with self.metrics.stage("db_write", f"edges:{rel_type}"):
+                    session.write_transaction(self._merge_links_batch, rel_type, batch)
+                transactions += 1
+                self.metrics.incr("edges_written", len(batch))
+        self.metrics.incr("transactions", transactions)
+        return transactions
+
+    @staticmethod
+    def _delete_outgoing_batch(tx, rel_type, names):
+        tx.run(delete_outgoing_query(rel_type), names=names)
+
+    @staticmethod
+    def _merge_links_batch(tx, rel_type, rows):
+        query = (
+            "UNWIND $rows AS row "
+            "MERGE (a:Source {name: row.source}) ON CREATE SET a.filePath = row.source_path "
+            "MERGE (b:Source {name: row.target}) ON CREATE SET b.filePath = row.target_path "
+            f"MERGE (a)-[r:{rel_type}]->(b)"
+        )
+        tx.run(query, rows=rows)
+
+    def _flush_bulk(self, session, nodes, edges, batch_size, sources=None):
+        # Stale CONTAINS edges go first, then nodes, so the edge batches can
+        # MATCH their endpoints.
+        transactions = 0
+        self._ensure_label_indexes(session, nodes.keys())
+        names = sorted(sources or ())
+        for start in range(0, len(names), batch_size):
+            with self.metrics.stage("db_write", "delete:CONTAINS"):
+                session.write_transaction(self._delete_outgoing_batch, 'CONTAINS', names[start:start + batch_size])
+            transactions += 1
+        for label, rows_by_name in nodes.items():
+            rows = node_rows(rows_by_name)
+            for start in range(0, len(rows), batch_size):
+                with self.metrics.stage("db_write", f"nodes:{label}"):
+                    node_ids = session.write_transaction(self._merge_nodes_batch, label,
+                                                         rows[start:start + batch_size])
+                for name, node_id in node_ids:
+                    self.node_index[(label, name)] = node_id
+                transactions += 1
+                self.metrics.incr("nodes_written", len(node_ids))
+        for rel_type, pairs in edges.items():
+            rows = edge_rows(pairs, self.node_index)
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                with self.metrics.stage("db_write", f"edges:{rel_type}"):
+                    session.write_transaction(self._merge_relationships_batch, rel_type, batch)
+                transactions += 1
+                self.metrics.incr("edges_written", len(batch))
+        self.metrics.incr("transactions", transactions)
+        nodes.clear()
+        edges.clear()
+        if sources:
+            sources.clear()
+        return transactions
+
+    @staticmethod
+    def _merge_nodes_batch(tx, label, rows):
+        result = tx.run(merge_nodes_query(label), rows=rows)
+        return [(record["name"], record["id"]) for record in result]
+
+    @staticmethod
+    def _merge_relationships_batch(tx, rel_type, rows):
+        tx.run(merge_relationships_query(rel_type), rows=rows)
+
     @staticmethod
     def _create_source_node(tx, file_path):
         # Using MERGE to avoid creating duplicate nodes
@@ -81,247 +365,262 @@ class Neo4jIngestor:
         )
         tx.run(query, source_name=source_name, target_name=target_name)
 
-def extract_schema_from_content_with_llm(content):
+def extract_structured_data(records, manifest, full=False, processed_hashes=None, stats=None,
+                            metrics=NULL_METRICS, keep_duplicates=False):
     """
-    **Simulated LLM for schema extraction based on refined v1 Schema.**
+    Lazily extracts entities and relationships from triage records.
 
-    This function simulates a Gemini 1.5 Flash call, extracting entities and relationships
-    from the content based on keywords that align with our v1 schema.
+    Documents already ingested with the same content hash are skipped, and cached
+    extraction results are reused, so only the delta is pushed to Neo4j. Records
+    triage flagged as near-duplicates ('duplicate_of' in their metadata) are
+    skipped as well, so each document becomes a single Source node.
 
     Args:
-        content (str): The text content of a document.
-
-    Returns:
-        dict: A dictionary with extracted 'entities' and 'relationships'.
-    """
-    entities = []
-    relationships = []
-
-    # --- Entity and Relationship Extraction Rules (Simulated LLM Logic) ---
-    # This is a significantly expanded set of rules to better simulate a real LLM
-    # and cover more of the expected entities and relationships from your documents.
-
-    # General Concepts
-    if "AI" in content or "artificial intelligence" in content:
-        entities.append({"name": "Artificial Intelligence", "type": "Concept"})
-    if "LLM" in content or "Large Language Model" in content or "Gemini" in content or "Claude" in content or "ChatGPT" in content or "Perplexity" in content:
-        entities.append({"name": "Large Language Models", "type": "Concept"})
-        if {"name": "Artificial Intelligence", "type": "Concept"} in entities:
-            relationships.append({"source": "Large Language Models", "target": "Artificial Intelligence", "type": "IS_A"})
-    if "automation" in content:
-        entities.append({"name": "Automation", "type": "Concept"})
-    if "project management" in content:
-        entities.append({"name": "Project Management", "type": "Concept"})
-    if "data quality" in content:
-        entities.append({"name": "Data Quality", "type": "Concept"})
-    if "data governance" in content:
-        entities.append({"name": "Data Governance", "type": "Concept"})
-    if "semantic" in content:
-        entities.append({"name": "Semantic Understanding", "type": "Concept"})
-    if "containerization" in content or "containers" in content:
-        entities.append({"name": "Containerization", "type": "Concept"})
-    if "business process automation" in content:
-        entities.append({"name": "Business Process Automation", "type": "Concept"})
-
-    # Methodologies
-    if "BMAD Method" in content or "Breakthrough Method for Agile AI Driven Development" in content:
-        entities.append({"name": "BMAD Method", "type": "Methodology"})
-    if "Agile" in content or "Agile Development" in content:
-        entities.append({"name": "Agile Development", "type": "Methodology"})
-        if {"name": "BMAD Method", "type": "Methodology"} in entities:
-            relationships.append({"source": "BMAD Method", "target": "Agile Development", "type": "IMPLEMENTS"})
-    if "KATA Methodology" in content or "KATA cycle" in content:
-        entities.append({"name": "KATA Methodology", "type": "Methodology"})
-        if {"name": "Project Management", "type": "Concept"} in entities:
-            relationships.append({"source": "KATA Methodology", "target": "Project Management", "type": "APPLIES_TO"})
-
-    # Tools
-    if "Neo4j" in content:
-        entities.append({"name": "Neo4j", "type": "Tool"})
-    if "Obsidian" in content:
-        entities.append({"name": "Obsidian", "type": "Tool"})
-    if "Docker" in content:
-        entities.append({"name": "Docker", "type": "Tool"})
-        if {"name": "Containerization", "type": "Concept"} in entities:
-            relationships.append({"source": "Docker", "target": "Containerization", "type": "FACILITATES"})
-    if "N8N" in content:
-        entities.append({"name": "N8N", "type": "Tool"})
-        if {"name": "Business Process Automation", "type": "Concept"} in entities:
-            relationships.append({"source": "N8N", "target": "Business Process Automation", "type": "FACILITATES"})
-    if "PyTorch" in content:
-        entities.append({"name": "PyTorch", "type": "Tool"})
-    if "Git" in content or "GitHub" in content:
-        entities.append({"name": "Git", "type": "Tool"})
-    if "VS Code" in content:
-        entities.append({"name": "VS Code", "type": "Tool"})
-    if "Firecrawl" in content:
-        entities.append({"name": "Firecrawl", "type": "Tool"})
-    if "ElevenLabs" in content:
-        entities.append({"name": "ElevenLabs", "type": "Tool"})
-    if "Pip" in content:
-        entities.append({"name": "Pip", "type": "Tool"})
-    if "Gemini" in content:
-        entities.append({"name": "Google Gemini", "type": "Tool"})
-    if "Claude" in content:
-        entities.append({"name": "Claude", "type": "Tool"})
-    if "ChatGPT" in content:
-        entities.append({"name": "ChatGPT", "type": "Tool"})
-    if "Perplexity" in content:
-        entities.append({"name": "Perplexity", "type": "Tool"})
-    if "Jetson Orin Nano" in content:
-        entities.append({"name": "Jetson Orin Nano", "type": "Tool"})
-
-    # Client Pain Points
-    if "high cloud infrastructure costs" in content or "cloud costs" in content:
-        entities.append({"name": "High Cloud Costs", "type": "ClientPainPoint"})
-    if "difficulty attracting skilled IT staff" in content or "talent shortage" in content:
-        entities.append({"name": "Talent Shortage", "type": "ClientPainPoint"})
-    if "data fragmentation" in content or "data silos" in content:
-        entities.append({"name": "Data Fragmentation", "type": "ClientPainPoint"})
-    if "process inefficiencies" in content:
-        entities.append({"name": "Process Inefficiencies", "type": "ClientPainPoint"})
-    if "security concerns" in content or "vulnerabilities" in content:
-        entities.append({"name": "General Security Concerns", "type": "ClientPainPoint"})
-    if "client pain point" in content:
-        entities.append({"name": "Client Pain Point", "type": "ClientPainPoint"})
-
-    # Security Concerns
-    if "Ransomware Attack" in content or "ransomware risk" in content:
-        entities.append({"name": "Ransomware Attack Risk", "type": "SecurityConcern"})
-    if "Data Breach Vulnerability" in content or "data breach" in content:
-        entities.append({"name": "Data Breach Vulnerability", "type": "SecurityConcern"})
-    if "Unauthorized Access Threat" in content or "unauthorized access" in content:
-        entities.append({"name": "Unauthorized Access Threat", "type": "SecurityConcern"})
-    if "zero-day vulnerability" in content:
-        entities.append({"name": "Zero-Day Vulnerability", "type": "SecurityConcern"})
-    if "security threat" in content:
-        entities.append({"name": "Security Threat", "type": "SecurityConcern"})
-
-    # Solutions
-    if "Cloud Cost Optimization" in content:
-        entities.append({"name": "Cloud Cost Optimization", "type": "Solution"})
-        if any(e['name'] == "High Cloud Costs" for e in entities):
-            relationships.append({"source": "High Cloud Costs", "target": "Cloud Cost Optimization", "type": "ADDRESSED_BY"})
-    if "Digital Transformation" in content:
-        entities.append({"name": "Digital Transformation", "type": "Solution"})
-        if any(e['name'] == "Talent Shortage" for e in entities):
-            relationships.append({"source": "Talent Shortage", "target": "Digital Transformation", "type": "ADDRESSED_BY"})
-    if "Multi-Factor Authentication" in content or "MFA" in content:
-        entities.append({"name": "Multi-Factor Authentication", "type": "Solution"})
-        if any(e['name'] == "Unauthorized Access Threat" for e in entities):
-            relationships.append({"source": "Multi-Factor Authentication", "target": "Unauthorized Access Threat", "type": "MITIGATES"})
-    if "Knowledge Graph Consulting" in content:
-        entities.append({"name": "Knowledge Graph Consulting", "type": "Solution"})
-    if "Automated Content Generation" in content:
-        entities.append({"name": "Automated Content Generation", "type": "Solution"})
-    if "Conversation Intelligence" in content:
-        entities.append({"name": "Conversation Intelligence", "type": "Solution"})
-    if "System Monitoring" in content or "monitoring scripts" in content:
-        entities.append({"name": "System Monitoring", "type": "Solution"})
-    if "Project Structure Methodology" in content or "project structure" in content:
-        entities.append({"name": "Project Structure Methodology", "type": "Solution"})
-    if "Data Retention Strategy" in content or "long-term retention" in content:
-        entities.append({"name": "Data Retention Strategy", "type": "Solution"})
-    if "Conversation Analysis" in content or "conversation processing" in content:
-        entities.append({"name": "Conversation Analysis", "type": "Solution"})
-    if "Troubleshooting Guide" in content:
-        entities.append({"name": "Troubleshooting Guide", "type": "Solution"})
-
-    # Business Situations/Challenges
-    if "Northwest Tech Boom" in content:
-        entities.append({"name": "Northwest Tech Boom", "type": "BusinessSituation"})
-    if "market trends" in content or "market analysis" in content:
-        entities.append({"name": "Market Trends", "type": "BusinessSituation"})
-    if "supply chain" in content or "supply chain management" in content:
-        entities.append({"name": "Supply Chain Optimization", "type": "BusinessChallenge"})
-    if "regional economic report" in content or "regional factors" in content:
-        entities.append({"name": "Regional Economic Factors", "type": "BusinessSituation"})
-    if "industry trends" in content:
-        entities.append({"name": "Industry Trends", "type": "BusinessSituation"})
-    if "business challenges" in content:
-        entities.append({"name": "General Business Challenges", "type": "BusinessChallenge"})
-    if "strategic imperative" in content:
-        entities.append({"name": "Strategic Imperative", "type": "BusinessSituation"})
-
-    # Relationships between extracted entities (more complex inference)
-    # Example: If a Solution utilizes a Tool
-    if any(e['name'] == "Cloud Cost Optimization" for e in entities) and any(e['name'] == "Microsoft Azure" for e in entities):
-        relationships.append({"source": "Cloud Cost Optimization", "target": "Microsoft Azure", "type": "UTILIZES"})
-    if any(e['name'] == "Automated Content Generation" for e in entities) and any(e['name'] == "Google Gemini" for e in entities):
-        relationships.append({"source": "Automated Content Generation", "target": "Google Gemini", "type": "UTILIZES"})
-    if any(e['name'] == "Automated Content Generation" for e in entities) and any(e['name'] == "Perplexity" for e in entities):
-        relationships.append({"source": "Automated Content Generation", "target": "Perplexity", "type": "UTILIZES"})
-    if any(e['name'] == "Conversation Intelligence" for e in entities) and any(e['name'] == "Claude" for e in entities):
-        relationships.append({"source": "Conversation Intelligence", "target": "Claude", "type": "UTILIZES"})
-    if any(e['name'] == "Conversation Analysis" for e in entities) and any(e['name'] == "Google Gemini" for e in entities):
-        relationships.append({"source": "Conversation Analysis", "target": "Google Gemini", "type": "UTILIZES"})
-    if any(e['name'] == "Conversation Analysis" for e in entities) and any(e['name'] == "Claude" for e in entities):
-        relationships.append({"source": "Conversation Analysis", "target": "Claude", "type": "UTILIZES"})
-
-    # Example: If a Tool mitigates a SecurityConcern
-    if any(e['name'] == "Multi-Factor Authentication" for e in entities) and any(e['name'] == "Unauthorized Access Threat" for e in entities):
-        relationships.append({"source": "Multi-Factor Authentication", "target": "Unauthorized Access Threat", "type": "MITIGATES"})
-    if any(e['name'] == "Troubleshooting Guide" for e in entities) and any(e['name'] == "General Security Concerns" for e in entities):
-        relationships.append({"source": "Troubleshooting Guide", "target": "General Security Concerns", "type": "ADDRESSES"})
-
-    # Example: If a BusinessSituation leads to a BusinessChallenge
-    if any(e['name'] == "Northwest Tech Boom" for e in entities) and any(e['name'] == "Talent Shortage" for e in entities):
-        relationships.append({"source": "Northwest Tech Boom", "target": "Talent Shortage", "type": "LEADS_TO"})
-    if any(e['name'] == "Industry Trends" for e in entities) and any(e['name'] == "General Business Challenges" for e in entities):
-        relationships.append({"source": "Industry Trends", "target": "General Business Challenges", "type": "LEADS_TO"})
-
-    # Deduplicate entities and relationships before returning
-    unique_entities = list({frozenset(item.items()): item for item in entities}.values())
-    unique_relationships = list({frozenset(item.items()): item for item in relationships}.values())
-
-    return {"entities": unique_entities, "relationships": unique_relationships}
-
-def main():
-    """
-    Main function to drive the knowledge ingestion process.
+        records (iterable): Triage records with 'file_path', 'content' and
+                            optionally 'content_hash'.
+        manifest (IngestionManifest): The manifest used to look up and store results.
+        full (bool): Ignore the manifest and re-extract every document.
+        processed_hashes (list): If given, receives the content hash of every
+                                 document that was extracted (or reused).
+        stats (dict): If given, 'skipped', 'duplicates' and 'documents' counters are updated.
+        metrics (PipelineMetrics): Receives 'extract' timings and entity counters.
+        keep_duplicates (bool): Extract near-duplicates too.
+
+    Yields:
+        dict: Items with 'file_path', 'entities' and 'relationships'.
     """
-    print("Starting knowledge ingestion process...")
-    
-    # 1. Load the processed data from triage_output.json
-    with open(INPUT_FILE, 'r') as f:
-        processed_data = json.load(f)
-    
-    # 2. Extract structured data using the (simulated) LLM
-    print("Extracting entities and relationships using LLM...")
-    structured_data = []
-    for item in processed_data:
+    if stats is None:
+        stats = {}
+    stats.setdefault("skipped", 0)
+    stats.setdefault("documents", 0)
+    stats.setdefault("duplicates", 0)
+
+    for item in records:
+        if not keep_duplicates and (item.get('metadata') or {}).get('duplicate_of'):
+            stats["duplicates"] += 1
+            continue
         content = item.get('content', '')
         if not content:
             print(f"Warning: No content found for {item.get('file_path', 'unknown file')}. Skipping.")
             continue
-        extracted_schema = extract_schema_from_content_with_llm(content)
+        content_hash = item.get('content_hash') or hash_text(content)
+        if not full and manifest.is_ingested(content_hash):
+            stats["skipped"] += 1
+            continue
+        extracted_schema = None if full else manifest.get_extraction(content_hash)
+        if extracted_schema is None:
+            with metrics.stage("extract", item["file_path"]):
+                extracted_schema = extract_schema_from_content_with_llm(content)
+            manifest.record_extraction(content_hash, item["file_path"], extracted_schema)
+        else:
+            metrics.incr("extractions_cached")
+        metrics.incr("documents")
+        metrics.incr("content_chars", len(content))
+        metrics.incr("entities", len(extracted_schema['entities']))
+        metrics.incr("relationships", len(extracted_schema['relationships']))
+        if processed_hashes is not None:
+            processed_hashes.append(content_hash)
         if extracted_schema['entities'] or extracted_schema['relationships']:
-            structured_data.append({
+            stats["documents"] += 1
+            yield {
                 "file_path": item["file_path"],
                 "entities": extracted_schema["entities"],
                 "relationships": extracted_schema["relationships"]
-            })
+            }
+
+def export_csv(structured_data, directory, snapshot=None, metrics=NULL_METRICS, resolve_links=None):
+    """
+    Exports the structured data as CSV files for neo4j-admin and prints the import command.
+
+    `resolve_links`, if given, is called once the structured data is exhausted and
+    returns the (source path, target path) links to export as well.
+    """
+    from neo4j_csv_export import Neo4jCsvExporter
+    print(f"Exporting nodes and relationships as neo4j-admin import CSVs to {directory}...")
+    with Neo4jCsvExporter(directory, snapshot=snapshot) as exporter:
+        with metrics.stage("csv_export"):
+            counts = exporter.export(structured_data)
+            if resolve_links is not None:
+                counts = exporter.export_links(resolve_links())
+    metrics.incr("nodes_written", counts["nodes"])
+    metrics.incr("edges_written", counts["relationships"])
+    print(f"Exported {counts['nodes']} nodes and {counts['relationships']} relationships "
+          f"from {counts['documents']} documents.")
+    print("Stop the database and load the files into an empty database with:\n")
+    print(exporter.import_command())
+    print("\nThe name constraints are created by the next incremental run of this script.")
+    return counts
+
+def resolve_links(link_collector, manifest, processed_hashes, report_path=None):
+    """
+    Resolves the wiki links of this run's documents (and links of earlier
+    documents pointing to them), prints the resolution summary and returns
+    the (source path, target path) pairs.
+    """
+    from link_resolution import LinkReport
+    report = LinkReport()
+    links = link_collector.resolve_edges(manifest, processed_hashes, report)
+    report.print_summary()
+    if report_path:
+        report.write(report_path)
+        print(f"Unresolved links written to: {report_path}")
+    return sorted(links)
+
+def ingest_links(ingestor, link_collector, manifest, processed_hashes, batch_size=BATCH_SIZE, report_path=None):
+    """
+    Resolves the wiki links (see resolve_links) and writes them as LINKS_TO
+    edges, replacing the previously written links of this run's documents.
+
+    Returns:
+        list: The (source path, target path) links written.
+    """
+    links = resolve_links(link_collector, manifest, processed_hashes, report_path)
+    sources = link_collector.resolved_sources
+    if links or sources:
+        transactions = ingestor.ingest_links_bulk(links, batch_size=batch_size, replace_sources=sources)
+        print(f"Wrote {len(links)} LINKS_TO edges for {len(sources)} documents in {transactions} transactions.")
+    return links
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract entities from triaged documents and ingest them into Neo4j.")
+    parser.add_argument("--input", default=INPUT_FILE,
+                        help="Triage records to ingest (JSON Lines, or a legacy JSON array).")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"Rows per UNWIND transaction in bulk mode (default: {BATCH_SIZE}).")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-extract and re-ingest every document, ignoring the ingestion manifest.")
+    parser.add_argument("--async-writers", type=int, default=0,
+                        help="Ingest with the asyncio driver and this many concurrent writer tasks "
+                             "(default: 0, synchronous ingestion).")
+    parser.add_argument("--snapshot", metavar="DIR", nargs="?", const=GRAPH_SNAPSHOT_DIR,
+                        help="Also write a memory-mappable graph snapshot (see graph_snapshot.py) "
+                             f"to DIR (default: {GRAPH_SNAPSHOT_DIR}).")
+    parser.add_argument("--export-csv", metavar="DIR",
+                        help="Instead of writing to Neo4j, export every document as node and relationship "
+                             "CSVs for an offline `neo4j-admin database import` into an empty database. "
+                             "Exported documents are flagged as ingested in the manifest.")
+    parser.add_argument("--keep-duplicates", action="store_true",
+                        help="Also ingest documents triage flagged as near-duplicates of another file.")
+    parser.add_argument("--no-links", action="store_true",
+                        help="Do not resolve wiki links into LINKS_TO edges between Source nodes "
+                             "(see link_resolution.py).")
+    parser.add_argument("--unresolved-links", metavar="FILE",
+                        help="Write the wiki links that could not be resolved to FILE as JSON Lines.")
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """
+    Main function to drive the knowledge ingestion process.
+    """
+    args = parse_args(argv)
+    metrics = metrics_from_args(args, run_name="ingest")
+
+    print("Starting knowledge ingestion process...")
 
-    if not structured_data:
-        print("No structured data was extracted. Halting ingestion.")
+    # 1. Stream the processed data from the triage output, one record at a time
+    records = iter_records(args.input)
+    link_collector = None
+    if not args.no_links:
+        # Registers every note title and keeps the wiki links as records stream past
+        from link_resolution import LinkCollector
+        link_collector = LinkCollector()
+        records = link_collector.tap(records)
+
+    # 2. Extract structured data using the (simulated) LLM, lazily, so extraction
+    # and ingestion run in a single pass with flat memory use
+    manifest = IngestionManifest(MANIFEST_PATH)
+    processed_hashes = []
+    stats = {}
+    snapshot = None
+    if args.snapshot:
+        # Documents ingested by earlier runs are skipped below, so seed the snapshot
+        # with their stored extraction results to cover the whole graph.
+        from graph_snapshot import GraphSnapshotBuilder
+        snapshot = GraphSnapshotBuilder()
+        for item in manifest.iter_extractions(ingested_only=True):
+            snapshot.add_document(item)
+    # The offline importer loads an empty database, so an export always covers
+    # every document, not just the delta since the last run.
+    structured_data = extract_structured_data(records, manifest, full=args.full or bool(args.export_csv),
+                                              processed_hashes=processed_hashes, stats=stats,
+                                              metrics=metrics, keep_duplicates=args.keep_duplicates)
+
+    if args.export_csv:
+        try:
+            link_resolver = None
+            if link_collector is not None:
+                link_resolver = lambda: resolve_links(link_collector, manifest, None, args.unresolved_links)
+            export_csv(structured_data, args.export_csv, snapshot=snapshot, metrics=metrics,
+                       resolve_links=link_resolver)
+            manifest.mark_ingested(processed_hashes)
+            if snapshot is not None:
+                snapshot.save(args.snapshot)
+                print(f"Graph snapshot written to: {args.snapshot}")
+        finally:
+            manifest.close()
+            metrics.write_outputs(args.metrics_report, args.metrics_prometheus)
         return
 
     # 3. Ingest the structured data into Neo4j
-    print("Connecting to Neo4j and ingesting data...")
+    print("Extracting entities and relationships using LLM and ingesting them into Neo4j...")
     try:
-        ingestor = Neo4jIngestor(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
-        ingestor.ingest_data(structured_data)
-        ingestor.close()
+        if args.async_writers > 0:
+            from async_ingest import run_async_ingestion
+            pipeline_stats = asyncio.run(run_async_ingestion(
+                NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, structured_data,
+                writers=args.async_writers, batch_size=args.batch_size, snapshot=snapshot))
+            metrics.incr("transactions", pipeline_stats['batches'])
+            metrics.incr("retries", pipeline_stats['retries'])
+            print(f"Async ingestion committed {pipeline_stats['batches']} transactions with "
+                  f"{args.async_writers} writers ({pipeline_stats['retries']} retries).")
+        else:
+            ingestor = Neo4jIngestor(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, metrics=metrics, snapshot=snapshot)
+            ingestor.ensure_schema()
+            if USE_BULK_INGESTION:
+                transactions = ingestor.ingest_data_bulk(structured_data, batch_size=args.batch_size)
+                print(f"Bulk ingestion committed {transactions} transactions (batch size {args.batch_size}).")
+            else:
+                ingestor.ingest_data(structured_data)
+            ingestor.close()
+        links = ()
+        if link_collector is not None:
+            # 4. Write the resolved wiki links as LINKS_TO edges between documents
+            ingestor = Neo4jIngestor(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, metrics=metrics, snapshot=snapshot)
+            try:
+                links = ingest_links(ingestor, link_collector, manifest, processed_hashes,
+                                     batch_size=args.batch_size, report_path=args.unresolved_links)
+            finally:
+                ingestor.close()
+        manifest.mark_ingested(processed_hashes)
+        if snapshot is not None:
+            with metrics.stage("snapshot"):
+                snapshot.save(args.snapshot)
+            print(f"Graph snapshot written to: {args.snapshot}")
+
+        if stats["skipped"]:
+            print(f"Skipped {stats['skipped']} documents already ingested with unchanged content.")
+        if stats["duplicates"]:
+            print(f"Skipped {stats['duplicates']} near-duplicate documents.")
+        if not stats["documents"]:
+            if links:
+                print(f"No new structured data was extracted; only the {len(links)} LINKS_TO edges were ingested.")
+            else:
+                print("No new structured data was extracted. Nothing was ingested.")
+            return
         print("--- Ingestion Complete ---")
-        print(f"Successfully processed {len(structured_data)} documents into Neo4j.")
+        print(f"Successfully processed {stats['documents']} documents into Neo4j.")
         print(f"You can now explore the graph in the Neo4j Browser at {NEO4J_URI.replace('bolt', 'http').replace('7687', '7474')}")
     except Exception as e:
-        print(f"\nAn error occurred during Neo4j ingestion.")
+        print("\nAn error occurred during Neo4j ingestion.")
         print("Please check the following:")
         print("1. Is the Neo4j database running?")
         print("2. Are the connection details (URI, user, password) in the script correct?")
         print("3. Have you installed the neo4j library? (pip install neo4j)")
         print(f"\nError details: {e}")
+    finally:
+        manifest.close()
+        metrics.write_outputs(args.metrics_report, args.metrics_prometheus)
 
 if __name__ == "__main__":
     main()
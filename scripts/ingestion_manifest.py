@@ -0,0 +1,200 @@
+import hashlib
+import json
+import sqlite3
+import datetime
+
+# --- Configuration ---
+MANIFEST_PATH = "/home/rosie/projects/fae-intelligence/scripts/ingestion_manifest.sqlite"
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """
+    Computes the SHA-256 hash of a file's contents.
+
+    Args:
+        file_path (str): The path to the file.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_text(text):
+    """
+    Computes the SHA-256 hash of a string (used for records without a file hash).
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class IngestionManifest:
+    """
+    Persistent manifest mapping document content hashes to pipeline results.
+
+    Each entry holds the parsed content and triage metadata produced by
+    triage_and_tag.py and the extraction result produced by ingest_to_neo4j.py,
+    plus whether that extraction has been written to Neo4j. Re-runs look files up
+    by content hash so unchanged documents are not parsed, triaged, extracted or
+    ingested again.
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        # Access is sequential, but may come from a worker thread (async ingestion
+        # advances the extraction generator off the event loop).
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " content_hash TEXT PRIMARY KEY,"
+            " file_path TEXT,"
+            " content TEXT,"
+            " metadata TEXT,"
+            " extraction TEXT,"
+            " ingested INTEGER NOT NULL DEFAULT 0,"
+            " updated_at TEXT)"
+        )
+        # MinHash signatures of triaged documents, for near-duplicate detection
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS signatures ("
+            " content_hash TEXT PRIMARY KEY,"
+            " file_path TEXT,"
+            " signature BLOB NOT NULL)"
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    def get_triage(self, content_hash):
+        """
+        Returns (metadata, content) recorded for `content_hash`, or None.
+        """
+        row = self.conn.execute(
+            "SELECT metadata, content FROM documents WHERE content_hash = ? AND metadata IS NOT NULL",
+            (content_hash,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def record_triage(self, content_hash, file_path, metadata, content):
+        """
+        Stores the parsed content and triage metadata of a document.
+        """
+        self.conn.execute(
+            "INSERT INTO documents (content_hash, file_path, content, metadata, updated_at) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(content_hash) DO UPDATE SET file_path = excluded.file_path, "
+            "content = excluded.content, metadata = excluded.metadata, updated_at = excluded.updated_at",
+            (content_hash, file_path, content, json.dumps(metadata), self.now()))
+
+    def iter_triage(self, with_content=True, updated_after=None):
+        """
+        Yields (content_hash, file_path, metadata, content) for the latest triaged
+        version of every path, newest first (content is None unless
+        `with_content` is set). Superseded versions of a path are skipped.
+        With `updated_after` (a timestamp as stored by the manifest), only rows
+        updated later are considered.
+        """
+        columns = "content_hash, file_path, metadata, " + ("content" if with_content else "NULL")
+        condition, params = "metadata IS NOT NULL", ()
+        if updated_after is not None:
+            condition, params = condition + " AND updated_at > ?", (updated_after,)
+        query = f"SELECT {columns} FROM documents WHERE {condition} ORDER BY updated_at DESC, rowid DESC"
+        seen = set()
+        for content_hash, file_path, metadata, content in self.conn.execute(query, params):
+            if file_path in seen:
+                continue
+            seen.add(file_path)
+            yield content_hash, file_path, json.loads(metadata), content
+
+    def get_extraction(self, content_hash):
+        """
+        Returns the extraction result ({'entities', 'relationships'}) for `content_hash`, or None.
+        """
+        row = self.conn.execute(
+            "SELECT extraction FROM documents WHERE content_hash = ? AND extraction IS NOT NULL",
+            (content_hash,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record_extraction(self, content_hash, file_path, extraction):
+        """
+        Stores the extraction result of a document. A new extraction always needs
+        to be ingested again, so the ingested flag is reset.
+        """
+        self.conn.execute(
+            "INSERT INTO documents (content_hash, file_path, extraction, ingested, updated_at) "
+            "VALUES (?, ?, ?, 0, ?) "
+            "ON CONFLICT(content_hash) DO UPDATE SET extraction = excluded.extraction, "
+            "ingested = 0, updated_at = excluded.updated_at",
+            (content_hash, file_path, json.dumps(extraction), self.now()))
+
+    def iter_extractions(self, ingested_only=False):
+        """
+        Yields {'file_path', 'entities', 'relationships'} for the latest version of
+        every path with an extraction result (the latest one written to Neo4j if
+        `ingested_only` is set), ordered by path. Superseded versions are skipped.
+        """
+        query = "SELECT file_path, extraction FROM documents WHERE extraction IS NOT NULL"
+        if ingested_only:
+            query += " AND ingested = 1"
+        previous = None
+        for file_path, extraction in self.conn.execute(query + " ORDER BY file_path, updated_at DESC, rowid DESC"):
+            if file_path == previous:
+                continue
+            previous = file_path
+            yield {"file_path": file_path, **json.loads(extraction)}
+
+    def is_ingested(self, content_hash):
+        row = self.conn.execute(
+            "SELECT ingested FROM documents WHERE content_hash = ?", (content_hash,)).fetchone()
+        return bool(row and row[0])
+
+    def mark_ingested(self, content_hashes):
+        """
+        Flags the given documents as written to Neo4j.
+        """
+        self.conn.executemany(
+            "UPDATE documents SET ingested = 1, updated_at = ? WHERE content_hash = ?",
+            [(self.now(), content_hash) for content_hash in content_hashes])
+        self.conn.commit()
+
+    def record_signature(self, content_hash, file_path, signature):
+        """
+        Stores the MinHash signature (bytes) of a document.
+        """
+        self.conn.execute(
+            "INSERT INTO signatures (content_hash, file_path, signature) VALUES (?, ?, ?) "
+            "ON CONFLICT(content_hash) DO UPDATE SET file_path = excluded.file_path, "
+            "signature = excluded.signature",
+            (content_hash, file_path, signature))
+
+    def delete_signature(self, content_hash):
+        """
+        Removes the signature of a superseded document version.
+        """
+        self.conn.execute("DELETE FROM signatures WHERE content_hash = ?", (content_hash,))
+
+    def iter_signatures(self):
+        """
+        Yields (content_hash, file_path, signature) for every stored signature.
+        """
+        yield from self.conn.execute("SELECT content_hash, file_path, signature FROM signatures ORDER BY rowid")
+
+    @staticmethod
+    def now():
+        """
+        Returns the current time in the format of the updated_at timestamps.
+        """
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
@@ -0,0 +1,140 @@
+from collections import deque
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick multi-pattern matcher.
+
+    The patterns are compiled once into a deterministic automaton (every state has
+    its full transition table, so scanning never follows failure links). A text is
+    then scanned in a single pass whose cost depends on the text length only, not
+    on the number of patterns.
+
+    Matching is case-sensitive and follows plain substring semantics: a pattern is
+    found if `pattern in text` would be True.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = [p for p in dict.fromkeys(patterns) if p]
+        self._delta, self._outputs = self._compile(self.patterns)
+
+    @staticmethod
+    def _compile(patterns):
+        goto = [{}]
+        outputs = [[]]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    goto.append({})
+                    outputs.append([])
+                    next_state = len(goto) - 1
+                    goto[state][char] = next_state
+                state = next_state
+            outputs[state].append(index)
+
+        # Breadth-first construction of the failure function, folded directly into
+        # a complete transition table per state.
+        fail = [0] * len(goto)
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions = dict(delta[fail[state]])
+            transitions.update(goto[state])
+            delta[state] = transitions
+            for char, next_state in goto[state].items():
+                fail[next_state] = delta[fail[state]].get(char, 0) if state else 0
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+                queue.append(next_state)
+
+        return delta, [tuple(o) for o in outputs]
+
+    def find_all(self, text):
+        """
+        Scans `text` once and returns the set of patterns that occur in it.
+
+        Args:
+            text (str): The text to scan.
+
+        Returns:
+            set: The patterns found in the text.
+        """
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        terminal_states = set()
+        for char in text:
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                terminal_states.add(state)
+        return {self.patterns[i] for s in terminal_states for i in outputs[s]}
+
+    def find_all_words(self, text):
+        """
+        Like find_all(), but only reports patterns that occur as whole words: the
+        characters on either side of a match must not be alphanumeric where the
+        pattern itself begins or ends with an alphanumeric character.
+
+        Args:
+            text (str): The text to scan.
+
+        Returns:
+            set: The patterns found in the text as whole words.
+        """
+        delta = self._delta
+        outputs = self._outputs
+        patterns = self.patterns
+        length = len(text)
+        found = set()
+        state = 0
+        for end, char in enumerate(text, 1):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                after = text[end] if end < length else ""
+                for i in outputs[state]:
+                    pattern = patterns[i]
+                    start = end - len(pattern)
+                    if after.isalnum() and pattern[-1].isalnum():
+                        continue
+                    if start and text[start - 1].isalnum() and pattern[0].isalnum():
+                        continue
+                    found.add(pattern)
+        return found
+
+    def find_all_batch(self, texts):
+        """
+        Scans several texts in a single pass over their concatenation and returns
+        the set of patterns found in each.
+
+        The texts are joined with NUL separators, which no pattern is expected to
+        contain, so a separator resets the automaton and matches never span two
+        texts.
+
+        Args:
+            texts (list): The texts to scan.
+
+        Returns:
+            list: One set of patterns per text, in input order.
+        """
+        delta = self._delta
+        outputs = self._outputs
+        boundaries = []
+        end = 0
+        for text in texts:
+            end += len(text)
+            boundaries.append(end)
+            end += 1
+        found = [set() for _ in texts]
+        state = 0
+        index = 0
+        for position, char in enumerate("\0".join(texts)):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                while position >= boundaries[index]:
+                    index += 1
+                found[index].update(outputs[state])
+        return [{self.patterns[i] for i in pattern_ids} for pattern_ids in found]
+
@@ -0,0 +1,275 @@
+import os
+import re
+import json
+import time
+import argparse
+from collections import Counter
+
+from parse_documents import parse_wiki_link
+from ingestion_manifest import hash_text
+from record_stream import iter_records
+
+# --- Configuration ---
+PARSED_DATA_FILE = "/home/rosie/projects/fae-intelligence/scripts/parsed_markdown_data.json"
+LINK_REL_TYPE = "LINKS_TO"
+
+# "[<type>][Relevance-<n>][<tags>]-" as prepended by triage_and_tag.organize_file
+_ORGANIZED_PREFIX = re.compile(r'^(?:\[[^\]]*\]){3}-')
+_SEPARATORS = str.maketrans('_-', '  ')
+_HEADING_PATTERN = re.compile(r'^#{1,6}[ \t]+(.+?)[ \t#]*$', re.MULTILINE)
+
+def normalize_title(name):
+    """
+    Normalizes a note name or link target for lookup: folders, the organized
+    file name prefix and a '.md' extension are dropped, case is folded and runs
+    of spaces, underscores and hyphens become one space.
+    """
+    if '/' in name or '\\' in name:
+        name = name.replace('\\', '/').rsplit('/', 1)[-1]
+    if name.startswith('['):
+        name = _ORGANIZED_PREFIX.sub('', name)
+    if name[-3:].lower() == '.md':
+        name = name[:-3]
+    return ' '.join(name.casefold().translate(_SEPARATORS).split())
+
+def normalize_heading(heading):
+    return ' '.join(heading.casefold().translate(_SEPARATORS).split())
+
+def _aliases(metadata):
+    aliases = []
+    for field in ('title', 'aliases', 'alias'):
+        value = metadata.get(field)
+        if isinstance(value, str):
+            aliases.append(value)
+        elif isinstance(value, (list, tuple)):
+            aliases.extend(str(alias) for alias in value if alias)
+    return aliases
+
+class LinkIndex:
+    """
+    Title index resolving Obsidian wiki links to note paths.
+
+    Every note is registered under its normalized file name (with and without
+    extension), its frontmatter title and aliases. A link resolves with one dict
+    lookup; results are memoized per link text, since vaults repeat the same
+    links many times. Heading anchors ("note#heading") are checked against the
+    note's Markdown headings. When two notes share a key, the first one
+    registered keeps it.
+    """
+
+    def __init__(self):
+        self._path_by_key = {}
+        self._headings = {}   # path -> {normalized headings}
+        self._memo = {}
+        self.ambiguous = 0
+
+    def __len__(self):
+        return len(self._headings)
+
+    def __contains__(self, file_path):
+        return file_path in self._headings
+
+    def add_note(self, file_path, metadata=None, content=None, canonical=None):
+        """
+        Registers a note.
+
+        Args:
+            file_path (str): The note's path.
+            metadata (dict): Frontmatter; 'title', 'aliases' and 'alias' are indexed.
+            content (str): The note's text, scanned for heading anchors.
+            canonical (str): For a near-duplicate, the path of the note it
+                             duplicates; its names then resolve to that note.
+        """
+        target = canonical or file_path
+        name = os.path.basename(file_path)
+        keys = {normalize_title(name), normalize_title(os.path.splitext(name)[0])}
+        keys.update(normalize_title(alias) for alias in _aliases(metadata or {}))
+        for key in keys:
+            if not key:
+                continue
+            existing = self._path_by_key.setdefault(key, target)
+            if existing != target:
+                self.ambiguous += 1
+        headings = self._headings.setdefault(target, set())
+        self._headings.setdefault(file_path, headings)
+        if content and '#' in content:
+            headings.update(normalize_heading(heading) for heading in _HEADING_PATTERN.findall(content))
+        if self._memo:
+            self._memo.clear()
+
+    def resolve(self, link, source=None):
+        """
+        Resolves the inside of a wiki link.
+
+        Args:
+            link (str): E.g. "Note", "Note#Heading|alias" or "#Heading".
+            source (str): Path of the linking note, the target of "#Heading" links.
+
+        Returns:
+            tuple: (target path or None, heading_found). heading_found is None
+                   when the link has no heading anchor.
+        """
+        resolved = self._memo.get(link)
+        if resolved is not None:
+            return resolved
+        target, heading, _ = parse_wiki_link(link)
+        path = self._path_by_key.get(normalize_title(target)) if target else source
+        heading_found = None
+        if path is not None and heading is not None:
+            heading_found = normalize_heading(heading) in self._headings.get(path, ())
+        resolved = (path, heading_found)
+        if target:
+            # Links to a heading of the linking note itself depend on the source
+            self._memo[link] = resolved
+        return resolved
+
+class LinkReport:
+    """
+    Resolution counters and the unresolved links, as (source path, link) pairs.
+    """
+
+    def __init__(self):
+        self.resolved = 0
+        self.unresolved = []
+        self.missing_headings = []
+
+    def unresolved_targets(self):
+        return Counter(normalize_title(parse_wiki_link(link)[0]) for _, link in self.unresolved)
+
+    def print_summary(self, top_n=10):
+        total = self.resolved + len(self.unresolved)
+        print(f"Resolved {self.resolved} of {total} wiki links; {len(self.unresolved)} unresolved, "
+              f"{len(self.missing_headings)} pointing to a missing heading.")
+        for target, count in self.unresolved_targets().most_common(top_n):
+            print(f"  - unresolved: [[{target}]] ({count} links)")
+
+    def write(self, file_path):
+        """
+        Writes the unresolved links as JSON Lines ({'source', 'link', 'reason'}).
+        """
+        with open(file_path, 'w', encoding='utf-8') as f:
+            for reason, pairs in (("unresolved", self.unresolved), ("missing_heading", self.missing_headings)):
+                for source, link in pairs:
+                    f.write(json.dumps({"source": source, "link": link, "reason": reason}, ensure_ascii=False))
+                    f.write("\n")
+
+class LinkCollector:
+    """
+    Resolves the wiki links of the documents of an ingestion run into
+    document-to-document edges.
+
+    tap() passes the triage records through unchanged while registering every
+    note and keeping the links of each (only paths and link texts are held).
+    resolve_edges() then completes the index with the notes of earlier runs from
+    the ingestion manifest (the latest version of each path), resolves the links
+    of this run's documents, and picks up links from earlier notes that point to
+    this run's documents, so edges are written as soon as both ends have been
+    triaged.
+
+    A collector can be kept across runs (as the staging watcher does): each
+    resolve_edges() call consumes the documents collected since the previous one
+    and only reads the manifest rows updated since then.
+    """
+
+    def __init__(self, index=None):
+        self.index = index if index is not None else LinkIndex()
+        self._documents = []   # (content hash, file path, links)
+        self._scanned_at = None
+        # Documents whose complete set of outgoing links the last resolve_edges()
+        # call returned; their previously written links can be replaced
+        self.resolved_sources = set()
+
+    def add_record(self, item):
+        metadata = item.get('metadata') or {}
+        content = item.get('content') or ''
+        duplicate_of = metadata.get('duplicate_of')
+        self.index.add_note(item['file_path'], metadata, content, canonical=duplicate_of)
+        if not duplicate_of:
+            content_hash = item.get('content_hash') or hash_text(content)
+            self._documents.append((content_hash, item['file_path'], metadata.get('links') or []))
+
+    def tap(self, records):
+        for item in records:
+            self.add_record(item)
+            yield item
+
+    def resolve_edges(self, manifest=None, delta_hashes=None, report=None):
+        """
+        Returns the set of (source path, target path) edges to write.
+
+        Args:
+            manifest (IngestionManifest): Supplies the notes of earlier runs.
+            delta_hashes (iterable): Content hashes of the documents written in
+                                     this run; None treats every collected
+                                     document as new.
+            report (LinkReport): Receives counters and unresolved links of this
+                                 run's documents.
+        """
+        report = report if report is not None else LinkReport()
+        if manifest is not None:
+            scanned_at, updated_after = manifest.now(), self._scanned_at
+            for _, file_path, metadata, content in manifest.iter_triage(updated_after=updated_after):
+                # On the first scan, collected documents are newer than any row
+                if updated_after is not None or file_path not in self.index:
+                    self.index.add_note(file_path, metadata, content, canonical=metadata.get('duplicate_of'))
+            self._scanned_at = scanned_at
+
+        delta = None if delta_hashes is None else set(delta_hashes)
+        delta_paths = set()
+        edges = set()
+        for content_hash, file_path, links in self._documents:
+            if delta is not None and content_hash not in delta:
+                continue
+            delta_paths.add(file_path)
+            for link in links:
+                target, heading_found = self.index.resolve(link, file_path)
+                if target is None:
+                    report.unresolved.append((file_path, link))
+                    continue
+                report.resolved += 1
+                if heading_found is False:
+                    report.missing_headings.append((file_path, link))
+                if target != file_path:
+                    edges.add((file_path, target))
+
+        if manifest is not None and delta_paths:
+            for _, file_path, metadata, _ in manifest.iter_triage(with_content=False):
+                if file_path in delta_paths or metadata.get('duplicate_of'):
+                    continue
+                for link in metadata.get('links') or ():
+                    target, _ = self.index.resolve(link, file_path)
+                    if target in delta_paths and target != file_path:
+                        edges.add((file_path, target))
+        self._documents = []
+        self.resolved_sources = delta_paths
+        return edges
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve the wiki links of parsed notes and report unresolved ones.")
+    parser.add_argument("input", nargs="?", default=PARSED_DATA_FILE,
+                        help="Parsed markdown data or triage records (JSON Lines, or a legacy JSON array).")
+    parser.add_argument("--report", metavar="FILE", help="Write the unresolved links to FILE as JSON Lines.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    collector = LinkCollector()
+    for item in iter_records(args.input):
+        # Parsed markdown data nests the parse result under 'data'
+        data = item.get('data')
+        if data is not None:
+            metadata = dict(data.get('metadata') or {}, links=data.get('links') or [])
+            item = {"file_path": item['file_path'], "metadata": metadata, "content": data.get('content')}
+        collector.add_record(item)
+    report = LinkReport()
+    edges = collector.resolve_edges(report=report)
+    print(f"Indexed {len(collector.index)} notes and found {len(edges)} {LINK_REL_TYPE} edges "
+          f"in {time.perf_counter() - start:.2f}s ({collector.index.ambiguous} ambiguous names).")
+    report.print_summary()
+    if args.report:
+        report.write(args.report)
+        print(f"Unresolved links written to: {args.report}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
-import json
-from collections import defaultdict
+import argparse
+
+from schema_analyzer import collect_schema_stats, PARSED_DATA_FILE
 
 def extract_schema_from_content_with_llm(content):
     """
@@ -48,48 +49,36 @@ def extract_schema_from_content_with_llm(content):
         "relationships": relationships
     }
 
-def main():
+def main(argv=None):
     """
     Main function to drive the LLM-based schema extraction process.
     """
-    input_file = "/home/rosie/projects/fae-intelligence/scripts/parsed_markdown_data.json"
-    with open(input_file, 'r') as f:
-        data = json.load(f)
-
-    # Using sets to store unique entity and relationship types
-    entity_types = set()
-    relationship_types = set()
+    parser = argparse.ArgumentParser(description="Propose a knowledge graph schema with the simulated LLM extraction.")
+    parser.add_argument("--input", default=PARSED_DATA_FILE,
+                        help="Parsed markdown data (JSON Lines, or a legacy JSON array).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes used for the extraction (default: 1, serial).")
+    args = parser.parse_args(argv)
 
     print("Analyzing document content with simulated LLM to propose schema...")
 
-    for item in data:
-        content = item.get('data', {}).get('content', '')
-        
-        # Skip if content is empty
-        if not content:
-            continue
-
-        # Call our placeholder LLM extraction function
-        extracted_schema = extract_schema_from_content_with_llm(content)
-
-        for entity in extracted_schema.get("entities", []):
-            entity_types.add(entity['type'])
-        
-        for relationship in extracted_schema.get("relationships", []):
-            relationship_types.add(relationship['type'])
+    # The schema statistics engine streams the records and runs the extraction
+    # in the same pass that collects the other schema statistics
+    stats = collect_schema_stats(args.input, workers=args.workers,
+                                 extractor=extract_schema_from_content_with_llm)
 
     print("\n--- LLM-Powered Proposed Knowledge Graph Schema ---")
     print("\n## Entity Types (Nodes):")
-    if entity_types:
-        for entity_type in sorted(list(entity_types)):
-            print(f"- {entity_type}")
+    if stats.entity_types:
+        for entity_type, count in sorted(stats.entity_types.items()):
+            print(f"- {entity_type} (extracted {count} times)")
     else:
         print("No entity types extracted.")
 
     print("\n## Relationship Types (Edges):")
-    if relationship_types:
-        for rel_type in sorted(list(relationship_types)):
-            print(f"- {rel_type}")
+    if stats.relationship_types:
+        for rel_type, count in sorted(stats.relationship_types.items()):
+            print(f"- {rel_type} (found {count} times)")
     else:
         print("No relationship types extracted.")
 
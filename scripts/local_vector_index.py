@@ -0,0 +1,429 @@
+import json
+import os
+import tempfile
+
+# This module requires numpy. You can install it with: pip install numpy
+import numpy as np
+
+# --- Configuration ---
+# Same name, dimension and metric as the Pinecone index provisioned by
+# create_pinecone_index.py, so the two stores are interchangeable.
+INDEX_NAME = "seo-writer"
+DIMENSION = 3072  # From Gemini embedding model
+METRIC = "cosine"
+LOCAL_INDEX_DIR = "/home/rosie/projects/fae-intelligence/.vector-index"
+QUERY_BLOCK_ROWS = 16384  # Vectors scored per block by an exact search
+
+SUPPORTED_METRICS = ("cosine", "dotproduct")
+
+class LocalVectorIndex:
+    """
+    Embedded, offline drop-in for the Pinecone "seo-writer" index.
+
+    Vectors are kept in a memory-mapped float32 matrix on disk (grown by doubling),
+    with ids and metadata in a JSON sidecar. For the cosine metric vectors are
+    normalized on upsert, so every search is a plain matrix product.
+
+    Exact top-k search scores the vectors block by block (`QUERY_BLOCK_ROWS` at a
+    time, keeping the best `top_k` of each block), so neither the matrix nor a
+    full score row per query is materialized. After build_ivf() has been called,
+    queries can instead probe only the `nprobe` closest of `n_lists` k-means
+    clusters (an IVF approximate index); vectors upserted after the build are
+    always scanned exactly.
+
+    Every upsert and delete is appended to a journal next to the sidecar, and the
+    journal is replayed on open, so ids and metadata survive a process that never
+    calls flush(). flush() (or leaving the index's context) rewrites the sidecar,
+    empties the journal and persists the IVF structure.
+    """
+
+    def __init__(self, directory=LOCAL_INDEX_DIR, name=INDEX_NAME, dimension=DIMENSION, metric=METRIC,
+                 initial_capacity=1024):
+        if metric not in SUPPORTED_METRICS:
+            raise ValueError(f"Unsupported metric '{metric}'. Supported metrics: {', '.join(SUPPORTED_METRICS)}")
+        self.name = name
+        self.path = os.path.join(directory, name)
+        self.dimension = dimension
+        self.metric = metric
+        os.makedirs(self.path, exist_ok=True)
+
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._meta_path = os.path.join(self.path, "index.json")
+        self._journal_path = os.path.join(self.path, "index.journal.jsonl")
+        self._ivf_path = os.path.join(self.path, "ivf.npz")
+
+        self._ids = []
+        self._metadata = []
+        self._count = 0
+        self._ivf = None
+        self._row_by_id = {}
+        self._ids_by_file = None   # metadata file_path -> {ids}, built on first use
+        if os.path.exists(self._meta_path):
+            self._load()
+        else:
+            self._capacity = max(1, initial_capacity)
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='w+',
+                                      shape=(self._capacity, dimension))
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, vector_id):
+        return vector_id in self._row_by_id
+
+    def _load(self):
+        with open(self._meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta["dimension"] != self.dimension or meta["metric"] != self.metric:
+            raise ValueError(
+                f"Index '{self.name}' was created with dimension {meta['dimension']} and metric "
+                f"'{meta['metric']}', not {self.dimension} / '{self.metric}'.")
+        self._ids = meta["ids"]
+        self._metadata = meta["metadata"]
+        self._count = len(self._ids)
+        self._row_by_id = {vector_id: row for row, vector_id in enumerate(self._ids)}
+        # The matrix may have grown after the sidecar was last written
+        row_bytes = self.dimension * 4
+        self._capacity = max(meta["capacity"], os.path.getsize(self._vectors_path) // row_bytes)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+',
+                                  shape=(self._capacity, self.dimension))
+        if meta.get("ivf") and os.path.exists(self._ivf_path):
+            with np.load(self._ivf_path) as ivf:
+                self._ivf = {key: ivf[key] for key in ivf.files}
+        if os.path.exists(self._journal_path):
+            self._replay_journal()
+
+    def _replay_journal(self):
+        # Replaying is idempotent, so a journal left behind by a flush that was
+        # interrupted after writing the sidecar is harmless.
+        with open(self._journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break   # A partially written last line
+                if entry[0] == "u":
+                    self._set_ids([entry[1]], [entry[2]])
+                else:
+                    self._delete_rows([entry[1]])
+
+    def _append_journal(self, entries):
+        with open(self._journal_path, 'a', encoding='utf-8') as f:
+            f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+
+    def flush(self):
+        """
+        Persists the vector matrix, ids, metadata and IVF structure.
+        """
+        self._vectors.flush()
+        meta = {
+            "name": self.name,
+            "dimension": self.dimension,
+            "metric": self.metric,
+            "capacity": self._capacity,
+            "ids": self._ids,
+            "metadata": self._metadata,
+            "ivf": self._ivf is not None,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+        if os.path.exists(self._journal_path):
+            os.remove(self._journal_path)
+        if self._ivf is not None:
+            np.savez(self._ivf_path, **self._ivf)
+
+    def _ensure_capacity(self, needed):
+        if needed <= self._capacity:
+            return
+        new_capacity = max(needed, self._capacity * 2)
+        self._vectors.flush()
+        del self._vectors
+        with open(self._vectors_path, 'r+b') as f:
+            f.truncate(new_capacity * self.dimension * 4)
+        self._capacity = new_capacity
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+',
+                                  shape=(self._capacity, self.dimension))
+
+    def _prepare(self, matrix):
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"Vector dimension {matrix.shape[1]} does not match index dimension {self.dimension}")
+        if self.metric == "cosine":
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.where(norms == 0, 1, norms)
+        return matrix
+
+    def upsert(self, vectors, batch_size=1000):
+        """
+        Inserts or overwrites vectors, `batch_size` at a time.
+
+        Args:
+            vectors (iterable): (id, values) or (id, values, metadata) tuples, or
+                                Pinecone-style dicts with 'id', 'values' and
+                                optionally 'metadata'.
+            batch_size (int): Number of vectors converted and written per batch.
+
+        Returns:
+            dict: {'upserted_count': n}, like the Pinecone client.
+        """
+        upserted = 0
+        batch = []
+        for vector in vectors:
+            batch.append(vector)
+            if len(batch) >= batch_size:
+                upserted += self._upsert_batch(batch)
+                batch = []
+        if batch:
+            upserted += self._upsert_batch(batch)
+        return {"upserted_count": upserted}
+
+    def _upsert_batch(self, batch):
+        ids, values, metadata = [], [], []
+        for vector in batch:
+            if isinstance(vector, dict):
+                ids.append(vector["id"])
+                values.append(vector["values"])
+                metadata.append(vector.get("metadata") or {})
+            else:
+                ids.append(vector[0])
+                values.append(vector[1])
+                metadata.append(vector[2] if len(vector) > 2 else {})
+        matrix = self._prepare(values)
+
+        rows = np.empty(len(ids), dtype=np.int64)
+        new_rows = {}
+        for i, vector_id in enumerate(ids):
+            row = self._row_by_id.get(vector_id)
+            if row is None:
+                row = new_rows.setdefault(vector_id, self._count + len(new_rows))
+            rows[i] = row
+        self._ensure_capacity(self._count + len(new_rows))
+        # Vectors are written before the journal names them
+        self._vectors[rows] = matrix
+        self._append_journal(["u", vector_id, meta] for vector_id, meta in zip(ids, metadata))
+        self._set_ids(ids, metadata)
+        return len(ids)
+
+    def _set_ids(self, ids, metadata):
+        # Appends new ids in order (matching the rows assigned by _upsert_batch)
+        for vector_id, meta in zip(ids, metadata):
+            row = self._row_by_id.get(vector_id)
+            if row is None:
+                self._row_by_id[vector_id] = self._count
+                self._ids.append(vector_id)
+                self._metadata.append(meta)
+                self._count += 1
+            else:
+                self._unindex_file(vector_id, self._metadata[row])
+                self._metadata[row] = meta
+            if self._ids_by_file is not None:
+                self._ids_by_file.setdefault(meta.get("file_path"), set()).add(vector_id)
+
+    def delete(self, ids):
+        """
+        Deletes vectors by id. Rows are compacted by moving the last row into the
+        freed slot, which invalidates the IVF index (rebuild it with build_ivf()).
+        """
+        ids = [vector_id for vector_id in ids if vector_id in self._row_by_id]
+        if ids:
+            self._delete_rows(ids, move_vectors=True)
+            self._append_journal(["d", vector_id] for vector_id in ids)
+
+    def _delete_rows(self, ids, move_vectors=False):
+        for vector_id in ids:
+            row = self._row_by_id.pop(vector_id, None)
+            if row is None:
+                continue
+            self._unindex_file(vector_id, self._metadata[row])
+            last = self._count - 1
+            if row != last:
+                if move_vectors:
+                    self._vectors[row] = self._vectors[last]
+                self._ids[row] = self._ids[last]
+                self._metadata[row] = self._metadata[last]
+                self._row_by_id[self._ids[row]] = row
+            self._ids.pop()
+            self._metadata.pop()
+            self._count -= 1
+            self._ivf = None
+
+    def ids_for_file(self, file_path):
+        """
+        Returns the set of ids whose metadata 'file_path' is `file_path`.
+        """
+        if self._ids_by_file is None:
+            self._ids_by_file = {}
+            for vector_id, metadata in zip(self._ids, self._metadata):
+                self._ids_by_file.setdefault(metadata.get("file_path"), set()).add(vector_id)
+        return set(self._ids_by_file.get(file_path, ()))
+
+    def _unindex_file(self, vector_id, metadata):
+        if self._ids_by_file is not None:
+            self._ids_by_file.get(metadata.get("file_path"), set()).discard(vector_id)
+
+    def fetch(self, ids):
+        """
+        Returns {id: {'id', 'values', 'metadata'}} for the ids present in the index.
+        """
+        vectors = {}
+        for vector_id in ids:
+            row = self._row_by_id.get(vector_id)
+            if row is not None:
+                vectors[vector_id] = {"id": vector_id, "values": np.array(self._vectors[row]),
+                                      "metadata": self._metadata[row]}
+        return vectors
+
+    def build_ivf(self, n_lists=None, iterations=10, sample_size=50000, seed=0):
+        """
+        Builds an IVF approximate index with spherical k-means.
+
+        Args:
+            n_lists (int): Number of clusters (default: about sqrt(vector count)).
+            iterations (int): k-means iterations.
+            sample_size (int): Maximum number of vectors used to train the centroids.
+            seed (int): Random seed for the centroid initialization.
+        """
+        if self._count == 0:
+            return
+        n_lists = n_lists or max(1, int(np.sqrt(self._count)))
+        n_lists = min(n_lists, self._count)
+        vectors = self._vectors[:self._count]
+        rng = np.random.default_rng(seed)
+
+        sample_rows = np.sort(rng.choice(self._count, size=min(sample_size, self._count), replace=False))
+        sample = np.asarray(vectors[sample_rows])
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(n_lists):
+                members = sample[assignments == cluster]
+                if len(members):
+                    centroids[cluster] = members.mean(axis=0)
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids /= np.where(norms == 0, 1, norms)
+
+        assignments = np.concatenate([
+            np.argmax(np.asarray(vectors[start:start + 8192]) @ centroids.T, axis=1)
+            for start in range(0, self._count, 8192)
+        ])
+        order = np.argsort(assignments, kind='stable')
+        offsets = np.searchsorted(assignments[order], np.arange(n_lists + 1))
+        self._ivf = {
+            "centroids": centroids.astype(np.float32),
+            "rows": order.astype(np.int64),
+            "offsets": offsets.astype(np.int64),
+            "built_count": np.array(self._count, dtype=np.int64),
+        }
+
+    def query(self, vector, top_k=10, include_metadata=False, include_values=False, nprobe=None):
+        """
+        Returns the `top_k` most similar vectors.
+
+        Args:
+            vector (sequence): The query vector.
+            top_k (int): Number of matches to return.
+            include_metadata (bool): Include each match's metadata.
+            include_values (bool): Include each match's vector.
+            nprobe (int): Probe this many IVF clusters instead of scanning every
+                          vector. Requires build_ivf(); ignored otherwise.
+
+        Returns:
+            dict: {'matches': [{'id', 'score'[, 'metadata'][, 'values']}]}, best first.
+        """
+        return self.query_batch([vector], top_k=top_k, include_metadata=include_metadata,
+                                include_values=include_values, nprobe=nprobe)[0]
+
+    def query_batch(self, vectors, top_k=10, include_metadata=False, include_values=False, nprobe=None):
+        """
+        Vectorized query() for many query vectors at once.
+
+        Returns:
+            list: One {'matches': [...]} dict per query vector.
+        """
+        queries = self._prepare(vectors)
+        if self._count == 0:
+            return [{"matches": []} for _ in range(len(queries))]
+        results = []
+        if nprobe and self._ivf is not None:
+            for query in queries:
+                candidates = self._ivf_candidates(query, nprobe)
+                scores = np.asarray(self._vectors[candidates]) @ query
+                results.append(self._matches(candidates, scores, top_k, include_metadata, include_values))
+        else:
+            best_rows = [[] for _ in range(len(queries))]
+            best_scores = [[] for _ in range(len(queries))]
+            for start in range(0, self._count, QUERY_BLOCK_ROWS):
+                block_scores = queries @ self._vectors[start:min(start + QUERY_BLOCK_ROWS, self._count)].T
+                k = min(top_k, block_scores.shape[1])
+                if k == 0:
+                    break
+                top = np.argpartition(-block_scores, k - 1, axis=1)[:, :k]
+                for i, (rows, scores) in enumerate(zip(top, block_scores)):
+                    best_rows[i].append(rows + start)
+                    best_scores[i].append(scores[rows])
+            for rows, scores in zip(best_rows, best_scores):
+                results.append(self._matches(np.concatenate(rows), np.concatenate(scores), top_k,
+                                             include_metadata, include_values))
+        return results
+
+    def _ivf_candidates(self, query, nprobe):
+        centroids = self._ivf["centroids"]
+        offsets = self._ivf["offsets"]
+        nprobe = min(nprobe, len(centroids))
+        closest = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+        candidates = [self._ivf["rows"][offsets[c]:offsets[c + 1]] for c in closest]
+        built_count = int(self._ivf["built_count"])
+        if built_count < self._count:
+            candidates.append(np.arange(built_count, self._count))
+        return np.sort(np.concatenate(candidates))
+
+    def _matches(self, rows, scores, top_k, include_metadata, include_values):
+        k = min(top_k, len(scores))
+        if k == 0:
+            return {"matches": []}
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        matches = []
+        for i in best:
+            row = int(rows[i])
+            match = {"id": self._ids[row], "score": float(scores[i])}
+            if include_metadata:
+                match["metadata"] = self._metadata[row]
+            if include_values:
+                match["values"] = np.array(self._vectors[row])
+            matches.append(match)
+        return {"matches": matches}
+
+    def describe_index_stats(self):
+        return {
+            "name": self.name,
+            "dimension": self.dimension,
+            "metric": self.metric,
+            "total_vector_count": self._count,
+            "capacity": self._capacity,
+            "ivf_lists": 0 if self._ivf is None else len(self._ivf["centroids"]),
+        }
+
+def create_local_index(directory=LOCAL_INDEX_DIR):
+    """
+    Creates (or opens) the local "seo-writer" index, mirroring create_pinecone_index().
+    """
+    index = LocalVectorIndex(directory)
+    index.flush()
+    print(f"Local index '{INDEX_NAME}' ready at {index.path} "
+          f"(dimension {DIMENSION}, metric '{METRIC}', {len(index)} vectors).")
+    return index
+
+if __name__ == "__main__":
+    create_local_index()
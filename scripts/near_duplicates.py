@@ -0,0 +1,255 @@
+import os
+import re
+import time
+import argparse
+from collections import defaultdict
+
+# This module requires numpy. You can install it with: pip install numpy
+import numpy as np
+
+from record_stream import iter_records
+from ingestion_manifest import hash_text
+
+# --- Configuration ---
+NUM_PERM = 128            # MinHash permutations (signature length)
+LSH_BANDS = 16            # 16 bands of 8 rows: pairs from ~0.7 Jaccard upwards become candidates
+SHINGLE_SIZE = 5          # Words per shingle
+DUPLICATE_THRESHOLD = 0.8 # Estimated Jaccard similarity from which a document counts as a duplicate
+MINHASH_SEED = 1          # Fixed, so signatures stored in the manifest stay comparable across runs
+TRIAGE_OUTPUT = "/home/rosie/projects/fae-intelligence/scripts/triage_output.jsonl"
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")   # ASCII only, see _word_hashes
+_SHINGLE_CHUNK = 4096     # Shingles hashed against all permutations at a time
+_MASK32 = np.uint64(0xFFFFFFFF)
+_WORD_PRIME = np.uint64(1099511628211)         # FNV-1 64-bit prime
+_WORD_MIX = np.uint64(0x9E3779B97F4A7C15)
+_SHINGLE_PRIME = np.uint64(1000003)
+
+def _word_hashes(tokens):
+    """
+    Hashes ASCII words to 64-bit values, vectorized: a polynomial hash over the
+    characters of each word, followed by a multiplicative mix.
+    """
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    chars = np.frombuffer("".join(tokens).encode('ascii'), dtype=np.uint8).astype(np.uint64)
+    starts = np.zeros(len(tokens), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    positions = np.arange(len(chars)) - np.repeat(starts, lengths)
+    with np.errstate(over='ignore'):
+        powers = np.cumprod(np.full(int(lengths.max()), _WORD_PRIME, dtype=np.uint64))
+        words = np.add.reduceat(chars * powers[positions], starts)
+        words ^= words >> np.uint64(29)
+        words *= _WORD_MIX
+        words ^= words >> np.uint64(32)
+    return words
+
+def shingle_hashes(text, shingle_size=SHINGLE_SIZE):
+    """
+    Hashes the overlapping word `shingle_size`-grams of `text` to 32-bit values.
+
+    Words are lowercased alphanumeric runs, so the same text extracted from a PDF,
+    a DOCX and a Markdown export yields (nearly) the same shingles regardless of
+    punctuation, line breaks and markup.
+    """
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64)
+    words = _word_hashes(tokens)
+    size = min(shingle_size, len(words))
+    count = len(words) - size + 1
+    # Polynomial combination of the word hashes, wrapping modulo 2**64
+    hashes = np.zeros(count, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for offset in range(size):
+            hashes = hashes * _SHINGLE_PRIME + words[offset:offset + count]
+    return np.unique((hashes ^ (hashes >> np.uint64(32))) & _MASK32)
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures with a banded LSH index for near-duplicate detection.
+
+    Each document is reduced to NUM_PERM minimum hash values over its word
+    shingles; the share of equal positions in two signatures estimates the Jaccard
+    similarity of their shingle sets. The signature is cut into `bands` bands and
+    each band is a key into a hash table, so finding candidates costs one lookup
+    per band instead of a comparison with every stored document. Candidates are
+    confirmed by their estimated similarity.
+
+    Documents are identified by their content hash; an index built with
+    from_manifest() loads the signatures of earlier runs and stores new ones.
+    Only the latest version of each path is kept: a new version replaces the
+    previous one's signature instead of being reported as its duplicate.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, bands=LSH_BANDS, threshold=DUPLICATE_THRESHOLD,
+                 shingle_size=SHINGLE_SIZE, seed=MINHASH_SEED, manifest=None):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.manifest = manifest
+        # Multiply-shift hash functions: the high 32 bits of a * x + b (mod 2**64)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+        self._hashes = []         # entry -> content hash
+        self._paths = []          # entry -> file path
+        self._signatures = []     # entry -> signature
+        self._entry_by_hash = {}
+        self._entry_by_path = {}
+        self._buckets = [defaultdict(list) for _ in range(bands)]
+
+    @classmethod
+    def from_manifest(cls, manifest, **kwargs):
+        """
+        Builds the index from the signatures stored in `manifest` and keeps
+        storing new signatures there.
+        """
+        index = cls(manifest=manifest, **kwargs)
+        for content_hash, file_path, signature in manifest.iter_signatures():
+            signature = np.frombuffer(signature, dtype=np.uint32)
+            if len(signature) == index.num_perm:
+                index._insert(content_hash, file_path, signature)
+        return index
+
+    def __len__(self):
+        return len(self._entry_by_hash)
+
+    def signature(self, content):
+        """
+        Returns the MinHash signature (uint32 array) of `content`, or None if it
+        has no words.
+        """
+        shingles = shingle_hashes(content, self.shingle_size)
+        if not len(shingles):
+            return None
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for start in range(0, len(shingles), _SHINGLE_CHUNK):
+                values = np.multiply(shingles[start:start + _SHINGLE_CHUNK, None], self._a)
+                values += self._b
+                values >>= np.uint64(32)
+                np.minimum(signature, values.min(axis=0), out=signature)
+        return signature.astype(np.uint32)
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _insert(self, content_hash, file_path, signature):
+        entry = len(self._hashes)
+        self._hashes.append(content_hash)
+        self._paths.append(file_path)
+        self._signatures.append(signature)
+        previous = self._entry_by_path.get(file_path)
+        if previous is not None:
+            self._remove(previous)
+        self._entry_by_hash[content_hash] = entry
+        self._entry_by_path[file_path] = entry
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets[key].append(entry)
+
+    def _remove(self, entry):
+        for buckets, key in zip(self._buckets, self._band_keys(self._signatures[entry])):
+            bucket = buckets[key]
+            bucket.remove(entry)
+            if not bucket:
+                del buckets[key]
+        del self._entry_by_hash[self._hashes[entry]]
+        if self._entry_by_path.get(self._paths[entry]) == entry:
+            del self._entry_by_path[self._paths[entry]]
+        self._signatures[entry] = None
+
+    def query(self, signature):
+        """
+        Returns [(content_hash, file_path, similarity), ...] of the stored documents
+        whose estimated similarity reaches the threshold, most similar first.
+        """
+        candidates = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(key, ()))
+        matches = []
+        for entry in candidates:
+            similarity = float(np.count_nonzero(self._signatures[entry] == signature)) / self.num_perm
+            if similarity >= self.threshold:
+                matches.append((self._hashes[entry], self._paths[entry], similarity))
+        matches.sort(key=lambda match: (-match[2], match[1]))
+        return matches
+
+    def check(self, file_path, content, content_hash=None):
+        """
+        Looks a document up and, unless it duplicates a stored one, adds it.
+        Stored versions of the same path are never reported; they are replaced
+        by the new version.
+
+        Args:
+            file_path (str): The document's path, reported as `duplicate_of`.
+            content (str): The parsed text.
+            content_hash (str): The document's content hash (hashed from
+                                `content` if omitted).
+
+        Returns:
+            str or None: The path of the document this one duplicates, or None.
+        """
+        content_hash = content_hash or hash_text(content)
+        entry = self._entry_by_hash.get(content_hash)
+        if entry is not None:
+            # Exact copy; the same file seen again is not its own duplicate
+            return None if self._paths[entry] == file_path else self._paths[entry]
+        signature = self.signature(content)
+        if signature is None:
+            return None
+        matches = [match for match in self.query(signature) if match[1] != file_path]
+        previous = self._entry_by_path.get(file_path)
+        if previous is not None:
+            # An edited file: its previous version is superseded either way
+            previous_hash = self._hashes[previous]
+            self._remove(previous)
+            if self.manifest is not None:
+                self.manifest.delete_signature(previous_hash)
+        if matches:
+            return matches[0][1]
+        self._insert(content_hash, file_path, signature)
+        if self.manifest is not None:
+            self.manifest.record_signature(content_hash, file_path, signature.tobytes())
+        return None
+
+def find_duplicates(records, index=None):
+    """
+    Runs the records through a NearDuplicateIndex (a fresh one by default).
+
+    Yields:
+        tuple: (file_path, duplicate_of) for every record that duplicates an earlier one.
+    """
+    if index is None:
+        index = NearDuplicateIndex()
+    for record in records:
+        content = record.get("content") or ""
+        duplicate_of = index.check(record["file_path"], content, record.get("content_hash"))
+        if duplicate_of:
+            yield record["file_path"], duplicate_of
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Report near-duplicate documents in a triage output file.")
+    parser.add_argument("input", nargs="?", default=TRIAGE_OUTPUT,
+                        help=f"Triage records (JSON Lines or a legacy JSON array; default: {TRIAGE_OUTPUT}).")
+    parser.add_argument("--threshold", type=float, default=DUPLICATE_THRESHOLD,
+                        help=f"Estimated Jaccard similarity that counts as a duplicate (default: {DUPLICATE_THRESHOLD}).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    index = NearDuplicateIndex(threshold=args.threshold)
+    start = time.perf_counter()
+    duplicates = list(find_duplicates(iter_records(args.input), index))
+    elapsed = time.perf_counter() - start
+    for file_path, duplicate_of in duplicates:
+        print(f"{os.path.basename(file_path)}  duplicates  {os.path.basename(duplicate_of)}")
+    print(f"{len(duplicates)} near-duplicates among {len(index) + len(duplicates)} documents "
+          f"found in {elapsed:.2f}s.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import os
+import csv
+
+class Neo4jCsvExporter:
+    """
+    Streams extraction results into CSV files for `neo4j-admin database import`.
+
+    The offline importer is much faster than any Cypher path for a first-time load
+    of a large corpus, but it requires an empty database, so this is for cold loads
+    only; incremental updates keep using the MERGE-based ingestor.
+
+    Each node label gets a header file and a data file (`<Label>_header.csv`,
+    `<Label>.csv`) with `name` as the ID in an ID space per label. Relationships are
+    written per (type, start label, end label), since the header names the ID
+    spaces of both endpoints. Rows are written as documents stream in and are
+    deduplicated on the way, so no post-processing is needed.
+    """
+
+    def __init__(self, directory, snapshot=None):
+        self.directory = directory
+        # Optional GraphSnapshotBuilder that records every exported document
+        self.snapshot = snapshot
+        self._files = {}
+        self._writers = {}
+        self._seen_nodes = {}        # label -> {name}
+        self._seen_relationships = {}  # (type, start label, end label) -> {(start, end)}
+        self.node_files = {}         # label -> (header path, data path)
+        self.relationship_files = {} # (type, start label, end label) -> (header path, data path)
+        self.counts = {"documents": 0, "nodes": 0, "relationships": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+        self._writers.clear()
+
+    def _open(self, key, base_name, header):
+        header_path = os.path.join(self.directory, f"{base_name}_header.csv")
+        data_path = os.path.join(self.directory, f"{base_name}.csv")
+        with open(header_path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(header)
+        self._files[key] = open(data_path, 'w', newline='', encoding='utf-8', buffering=1024 * 1024)
+        self._writers[key] = csv.writer(self._files[key])
+        return header_path, data_path
+
+    def add_node(self, label, name, properties=()):
+        seen = self._seen_nodes.get(label)
+        if seen is None:
+            seen = self._seen_nodes[label] = set()
+            header = [f"name:ID({label})"] + (["filePath"] if label == 'Source' else []) + [":LABEL"]
+            self.node_files[label] = self._open(('node', label), label, header)
+        if name in seen:
+            return
+        seen.add(name)
+        self._writers[('node', label)].writerow([name, *properties, label])
+        self.counts["nodes"] += 1
+
+    def add_relationship(self, rel_type, start, end):
+        (start_label, start_name), (end_label, end_name) = start, end
+        key = (rel_type, start_label, end_label)
+        seen = self._seen_relationships.get(key)
+        if seen is None:
+            seen = self._seen_relationships[key] = set()
+            header = [f":START_ID({start_label})", f":END_ID({end_label})", ":TYPE"]
+            self.relationship_files[key] = self._open(('rel',) + key, f"{rel_type}_{start_label}_{end_label}", header)
+        if (start_name, end_name) in seen:
+            return
+        seen.add((start_name, end_name))
+        self._writers[('rel',) + key].writerow([start_name, end_name, rel_type])
+        self.counts["relationships"] += 1
+
+    def export(self, data):
+        """
+        Writes the nodes and relationships of every document in `data`.
+
+        Args:
+            data (iterable): Items with 'file_path', 'entities' and 'relationships'.
+
+        Returns:
+            dict: Counters for documents, nodes and relationships written.
+        """
+        for item in data:
+            file_path = item.get("file_path")
+            entities = item.get("entities", [])
+            relationships = item.get("relationships", [])
+            if not entities and not relationships:
+                continue
+            if self.snapshot is not None:
+                self.snapshot.add_document(item)
+            self.counts["documents"] += 1
+
+            source = ('Source', os.path.basename(file_path))
+            self.add_node(*source, properties=(file_path,))
+            entity_types = {}
+            for entity in entities:
+                entity_types[entity['name']] = entity['type']
+                self.add_node(entity['type'], entity['name'])
+                self.add_relationship('CONTAINS', source, (entity['type'], entity['name']))
+            for rel in relationships:
+                source_type = entity_types.get(rel['source'])
+                target_type = entity_types.get(rel['target'])
+                if source_type and target_type:
+                    self.add_relationship(rel['type'], (source_type, rel['source']), (target_type, rel['target']))
+        return self.counts
+
+    def export_links(self, links, rel_type='LINKS_TO'):
+        """
+        Writes resolved document-to-document links as `rel_type` relationships
+        between Source nodes.
+
+        Args:
+            links (iterable): (source file path, target file path) pairs.
+
+        Returns:
+            dict: Counters for documents, nodes and relationships written.
+        """
+        for source_path, target_path in links:
+            source = ('Source', os.path.basename(source_path))
+            target = ('Source', os.path.basename(target_path))
+            self.add_node(*source, properties=(source_path,))
+            self.add_node(*target, properties=(target_path,))
+            self.add_relationship(rel_type, source, target)
+            if self.snapshot is not None:
+                self.snapshot.add_edge(rel_type, self.snapshot.add_node(*source, source_path),
+                                       self.snapshot.add_node(*target, target_path))
+        return self.counts
+
+    def import_command(self, database="neo4j"):
+        """
+        Returns the neo4j-admin command that loads the exported files.
+        """
+        parts = ["neo4j-admin database import full"]
+        for header_path, data_path in self.node_files.values():
+            parts.append(f"--nodes={header_path},{data_path}")
+        for header_path, data_path in self.relationship_files.values():
+            parts.append(f"--relationships={header_path},{data_path}")
+        parts.append(database)
+        return " \\\n    ".join(parts)
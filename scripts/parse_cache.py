@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+import zlib
+
+from ingestion_manifest import hash_file
+
+# --- Configuration ---
+PARSE_CACHE_DIR = os.environ.get(
+    "FAE_PARSE_CACHE_DIR", "/home/rosie/projects/fae-intelligence/.cache/parsed_documents")
+PARSE_CACHE_MAX_BYTES = int(os.environ.get("FAE_PARSE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+class ParseCache:
+    """
+    Disk-backed cache of parse_document results.
+
+    Entries are keyed by the SHA-256 of the file's contents and its extension
+    (which selects the parser), so an edited file is simply a miss while a file
+    moved or renamed (as triage does when organizing) is still a hit. Each entry
+    is stored as zlib-compressed JSON.
+    Entry modification times double as last-access times: hits touch the entry,
+    and when the cache grows beyond `max_bytes` the least recently used entries
+    are evicted first.
+    """
+
+    ENTRY_SUFFIX = ".json.z"
+
+    def __init__(self, cache_dir=PARSE_CACHE_DIR, max_bytes=PARSE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, _, size in self._scan_entries())
+
+    def _entry_path(self, file_path, content_hash=None):
+        digest = content_hash or hash_file(file_path)
+        extension = os.path.splitext(file_path)[1].lower()
+        return os.path.join(self.cache_dir, digest[:2], digest + extension + self.ENTRY_SUFFIX)
+
+    def get(self, file_path, content_hash=None):
+        """
+        Returns the cached parse result for `file_path`, or None on a miss.
+        `content_hash` (see ingestion_manifest.hash_file) saves hashing the file again.
+        """
+        try:
+            entry_path = self._entry_path(file_path, content_hash)
+            with open(entry_path, 'rb') as f:
+                parsed_data = json.loads(zlib.decompress(f.read()))
+            os.utime(entry_path)
+        except (OSError, ValueError, zlib.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return parsed_data
+
+    def put(self, file_path, parsed_data, content_hash=None):
+        """
+        Stores the parse result for `file_path`. Results that cannot be serialized
+        are silently not cached.
+        """
+        try:
+            entry_path = self._entry_path(file_path, content_hash)
+            payload = zlib.compress(json.dumps(parsed_data, separators=(',', ':')).encode('utf-8'))
+        except (OSError, TypeError, ValueError):
+            return
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        try:
+            # An overwritten entry no longer counts towards the cache size
+            self._total_bytes -= os.stat(entry_path).st_size
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, entry_path)
+        self._total_bytes += len(payload)
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _scan_entries(self):
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(self.ENTRY_SUFFIX):
+                    stat = entry.stat()
+                    yield entry.path, stat.st_mtime, stat.st_size
+
+    def _evict(self):
+        # Evict down to 90% of the limit so that eviction does not run on every put.
+        entries = sorted(self._scan_entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * 0.9
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._total_bytes = total
+
+    def stats(self):
+        """
+        Returns the hit/miss/eviction counters and current cache size.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size_bytes": self._total_bytes,
+        }
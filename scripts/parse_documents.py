@@ -7,6 +7,36 @@ from PyPDF2 import PdfReader
 import frontmatter
 import re
 import datetime
+from collections.abc import Mapping
+from parse_cache import ParseCache
+from ingestion_manifest import hash_file
+
+# Set FAE_PARSE_CACHE=0 to disable the on-disk parse cache
+PARSE_CACHE_ENABLED = os.environ.get("FAE_PARSE_CACHE", "1") != "0"
+_parse_cache = None
+
+def get_parse_cache():
+    """
+    Returns the process-wide parse cache, creating it on first use.
+
+    Returns:
+        ParseCache or None: None if caching is disabled or the cache directory
+        cannot be created.
+    """
+    global _parse_cache, PARSE_CACHE_ENABLED
+    if _parse_cache is None and PARSE_CACHE_ENABLED:
+        try:
+            _parse_cache = ParseCache()
+        except OSError as e:
+            print(f"Parse cache disabled: {e}")
+            PARSE_CACHE_ENABLED = False
+    return _parse_cache
+
+_WIKI_LINK_PATTERN = re.compile(r'\[\[(.*?)\]\]')
+
+# python-frontmatter's YAML delimiter, reused so the fast path splits identically
+_YAML_BOUNDARY = frontmatter.YAMLHandler.FM_BOUNDARY
+_YAML_HANDLER = frontmatter.YAMLHandler()
 
 def extract_wiki_links(content):
     """
@@ -16,17 +46,142 @@ def extract_wiki_links(content):
         content (str): The string to search for links.
 
     Returns:
-        list: A list of found wiki links.
+        list: A list of found wiki links, as written between the brackets
+              (see parse_wiki_link for their parts).
+    """
+    if '[[' not in content:
+        return []
+    return _WIKI_LINK_PATTERN.findall(content)
+
+def parse_wiki_link(link):
+    """
+    Splits the inside of an Obsidian wiki link into its parts.
+
+    "target#heading|alias" -> ("target", "heading", "alias"). Missing parts are
+    None; an escaped pipe ("\\|", used inside tables) also separates the alias.
+
+    Args:
+        link (str): A link as returned by extract_wiki_links.
+
+    Returns:
+        tuple: (target, heading, alias).
+    """
+    alias = None
+    target = link
+    for separator in ('\\|', '|'):
+        if separator in target:
+            target, alias = target.split(separator, 1)
+            break
+    heading = None
+    if '#' in target:
+        target, heading = target.split('#', 1)
+        heading = heading.strip() or None
+    return target.strip(), heading, alias
+
+def _normalize_dates(metadata):
+    # Convert any datetime objects in metadata to strings for JSON serialization
+    return {key: value.isoformat() if isinstance(value, (datetime.datetime, datetime.date)) else value
+            for key, value in metadata.items()}
+
+class LazyFrontmatter(Mapping):
     """
-    return re.findall(r'\[\[(.*?)\]\]', content)
+    Read-only mapping over a YAML frontmatter block that is only parsed when a
+    field is first accessed. Dates are normalized to ISO strings on parse.
+    """
+
+    __slots__ = ("_text", "_data")
+
+    def __init__(self, text):
+        self._text = text
+        self._data = None
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def _load(self):
+        if self._data is None:
+            data = _YAML_HANDLER.load(self._text)
+            self._data = _normalize_dates(data) if isinstance(data, dict) else {}
+            self._text = None
+        return self._data
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def to_dict(self):
+        return dict(self._load())
+
+def split_frontmatter(text, lazy=False):
+    """
+    Separates frontmatter from content with the same result as
+    frontmatter.loads(text) (metadata dates normalized to ISO strings).
+
+    Text that cannot start with a frontmatter delimiter skips handler detection
+    entirely. YAML is split with the library's own boundary pattern; the rare JSON
+    and TOML frontmatter formats are delegated to the library.
+
+    Args:
+        text (str): The full Markdown text.
+        lazy (bool): Return YAML metadata as a LazyFrontmatter mapping.
+
+    Returns:
+        tuple: (metadata, content).
+    """
+    text = text.replace("\r\n", "\n").strip()
+    if not text or text[0] not in '-{}+':
+        return {}, text
+    if text[0] != '-':
+        metadata, content = frontmatter.parse(text)
+        return _normalize_dates(metadata), content
+    if not _YAML_BOUNDARY.match(text):
+        return {}, text
+    try:
+        _, fm, content = _YAML_BOUNDARY.split(text, 2)
+    except ValueError:
+        return {}, text
+    metadata = LazyFrontmatter(fm)
+    return (metadata if lazy else metadata.to_dict()), content.strip()
+
+def iter_pdf_pages(file_path):
+    """
+    Yields the text of a PDF one page at a time.
+
+    Args:
+        file_path (str): The path to the PDF file.
+
+    Yields:
+        str: The extracted text of each page, followed by a newline.
+    """
+    with open(file_path, 'rb') as f:
+        reader = PdfReader(f)
+        for page in reader.pages:
+            yield (page.extract_text() or "") + "\n"
+
+def iter_docx_paragraphs(file_path):
+    """
+    Yields the text of a DOCX document one paragraph at a time.
+
+    Args:
+        file_path (str): The path to the DOCX file.
+
+    Yields:
+        str: The text of each paragraph, followed by a newline.
+    """
+    document = Document(file_path)
+    for paragraph in document.paragraphs:
+        yield paragraph.text + "\n"
 
 def parse_pdf(file_path):
-    text = ""
     try:
-        with open(file_path, 'rb') as f:
-            reader = PdfReader(f)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
+        # Pages are accumulated and joined once, instead of growing one string per page
+        text = "".join(iter_pdf_pages(file_path))
     except Exception as e:
         print(f"Error parsing PDF {file_path}: {e}")
         return None
@@ -42,39 +197,62 @@ def parse_json(file_path):
         return None
 
 def parse_docx(file_path):
-    text = ""
     try:
-        document = Document(file_path)
-        for paragraph in document.paragraphs:
-            text += paragraph.text + "\n"
+        text = "".join(iter_docx_paragraphs(file_path))
     except Exception as e:
         print(f"Error parsing DOCX {file_path}: {e}")
         return None
     return {"content": text, "metadata": {}, "links": []}
 
-def parse_markdown(file_path):
+def parse_markdown(file_path, lazy_metadata=False):
+    """
+    Parses a Markdown note into its frontmatter metadata, content and wiki links.
+
+    Args:
+        file_path (str): The path to the Markdown file.
+        lazy_metadata (bool): Return the metadata as a LazyFrontmatter mapping, so
+                              the YAML is only parsed if a field is accessed. The
+                              default returns a plain (JSON-serializable) dict.
+    """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            post = frontmatter.load(f)
-        
-        links = extract_wiki_links(post.content)
-        
-        # Convert any datetime objects in metadata to strings for JSON serialization
-        metadata = post.metadata
-        for key, value in metadata.items():
-            if isinstance(value, (datetime.datetime, datetime.date)):
-                metadata[key] = value.isoformat()
+            metadata, content = split_frontmatter(f.read(), lazy=lazy_metadata)
 
         return {
             "metadata": metadata,
-            "content": post.content,
-            "links": links
+            "content": content,
+            "links": extract_wiki_links(content)
         }
     except Exception as e:
         print(f"Error parsing Markdown {file_path}: {e}")
         return None
 
-def parse_document(file_path):
+def parse_document(file_path, use_cache=True):
+    """
+    Parses a document into a dict with 'content', 'metadata' and 'links'.
+
+    Results are served from the on-disk parse cache when a file with the same
+    contents and extension has been parsed before, wherever it was.
+
+    Args:
+        file_path (str): The path to the document.
+        use_cache (bool): Whether to consult and populate the parse cache.
+
+    Returns:
+        dict or None: The parsed document, or None if it could not be parsed.
+    """
+    cache = get_parse_cache() if use_cache else None
+    content_hash = None
+    if cache is not None:
+        try:
+            content_hash = hash_file(file_path)
+        except OSError:
+            cache = None
+    if cache is not None:
+        cached = cache.get(file_path, content_hash)
+        if cached is not None:
+            return cached
+
     file_extension = os.path.splitext(file_path)[1].lower()
     parsed_data = None
     if file_extension == '.pdf':
@@ -87,8 +265,36 @@ def parse_document(file_path):
         parsed_data = parse_markdown(file_path)
     else:
         print(f"Unsupported file type: {file_extension} for {file_path}")
+
+    if cache is not None and parsed_data is not None:
+        cache.put(file_path, parsed_data, content_hash)
     return parsed_data
 
+def iter_document_chunks(file_path):
+    """
+    Yields the content of a document incrementally, so downstream extraction can
+    start before the whole file has been decoded.
+
+    PDFs are yielded page by page and DOCX files paragraph by paragraph. Markdown
+    and JSON files are yielded as a single chunk holding the parsed content. The
+    concatenation of all chunks equals parse_document(file_path)['content'].
+
+    Args:
+        file_path (str): The path to the document.
+
+    Yields:
+        str: Successive chunks of the document's text content.
+    """
+    file_extension = os.path.splitext(file_path)[1].lower()
+    if file_extension == '.pdf':
+        yield from iter_pdf_pages(file_path)
+    elif file_extension == '.docx':
+        yield from iter_docx_paragraphs(file_path)
+    else:
+        parsed_data = parse_document(file_path)
+        if parsed_data and parsed_data['content']:
+            yield parsed_data['content']
+
 if __name__ == "__main__":
     # Example Usage:
     # Create dummy files for testing
@@ -0,0 +1,175 @@
+import cProfile
+import heapq
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+class PipelineMetrics:
+    """
+    Opt-in instrumentation for the pipeline scripts.
+
+    Records per-stage timings (calls, total, max, slowest-N items), free-form
+    counters (files, bytes, entities, transactions, ...) and, optionally, a cProfile
+    dump of the whole run. The result is written as a JSON run report and/or a
+    Prometheus textfile-collector export.
+
+    A disabled instance (the default, see NULL_METRICS) accepts every call and
+    records nothing, so call sites do not need to check whether metrics are on.
+    """
+
+    def __init__(self, enabled=True, slowest_n=10, profile_path=None, run_name="pipeline"):
+        self.enabled = enabled
+        self.slowest_n = slowest_n
+        self.profile_path = profile_path
+        self.run_name = run_name
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self._profiler = None
+        if enabled and profile_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def record(self, stage, seconds, item=None):
+        """
+        Records one timed call of `stage`, attributed to `item` (e.g. a file name).
+        """
+        if not self.enabled:
+            return
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "slowest": []}
+        stats["calls"] += 1
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        if item is not None:
+            entry = (seconds, str(item))
+            if len(stats["slowest"]) < self.slowest_n:
+                heapq.heappush(stats["slowest"], entry)
+            elif entry > stats["slowest"][0]:
+                heapq.heapreplace(stats["slowest"], entry)
+
+    @contextmanager
+    def stage(self, stage, item=None):
+        """
+        Context manager timing the enclosed block as one call of `stage`.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, item)
+
+    def incr(self, counter, value=1):
+        if self.enabled:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def report(self):
+        """
+        Returns the run report as a JSON-serializable dict.
+        """
+        stages = {}
+        for name, stats in self.stages.items():
+            stages[name] = {
+                "calls": stats["calls"],
+                "total_seconds": round(stats["total_seconds"], 6),
+                "mean_seconds": round(stats["total_seconds"] / stats["calls"], 6) if stats["calls"] else 0.0,
+                "max_seconds": round(stats["max_seconds"], 6),
+                "slowest": [{"item": item, "seconds": round(seconds, 6)}
+                            for seconds, item in sorted(stats["slowest"], reverse=True)],
+            }
+        return {
+            "run": self.run_name,
+            "started_at": self.started_at,
+            "duration_seconds": round(time.perf_counter() - self._start, 6),
+            "stages": stages,
+            "counters": dict(self.counters),
+            "profile": self.profile_path,
+        }
+
+    def to_prometheus(self):
+        """
+        Renders the metrics in the Prometheus text exposition format.
+        """
+        report = self.report()
+        run = _escape_label(self.run_name)
+        lines = [
+            "# HELP fae_pipeline_run_duration_seconds Wall-clock duration of the last pipeline run.",
+            "# TYPE fae_pipeline_run_duration_seconds gauge",
+            f'fae_pipeline_run_duration_seconds{{run="{run}"}} {report["duration_seconds"]}',
+            "# HELP fae_pipeline_last_run_timestamp_seconds Unix time the last pipeline run started.",
+            "# TYPE fae_pipeline_last_run_timestamp_seconds gauge",
+            f'fae_pipeline_last_run_timestamp_seconds{{run="{run}"}} {self.started_at}',
+        ]
+        for metric, key, help_text in (
+                ("fae_pipeline_stage_calls", "calls", "Number of timed calls per stage."),
+                ("fae_pipeline_stage_seconds", "total_seconds", "Total time spent per stage."),
+                ("fae_pipeline_stage_max_seconds", "max_seconds", "Slowest single call per stage.")):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for name, stats in report["stages"].items():
+                lines.append(f'{metric}{{run="{run}",stage="{_escape_label(name)}"}} {stats[key]}')
+        lines.append("# HELP fae_pipeline_count Pipeline counters (files, bytes, entities, ...).")
+        lines.append("# TYPE fae_pipeline_count gauge")
+        for name, value in sorted(report["counters"].items()):
+            lines.append(f'fae_pipeline_count{{run="{run}",counter="{_escape_label(name)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_outputs(self, report_path=None, prometheus_path=None):
+        """
+        Stops the profiler (if any) and writes the requested outputs.
+        """
+        if not self.enabled:
+            return
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.profile_path)
+            self._profiler = None
+            print(f"cProfile stats written to: {self.profile_path}")
+        if report_path:
+            _write_atomically(report_path, json.dumps(self.report(), indent=2) + "\n")
+            print(f"Run report written to: {report_path}")
+        if prometheus_path:
+            _write_atomically(prometheus_path, self.to_prometheus())
+            print(f"Prometheus metrics written to: {prometheus_path}")
+
+NULL_METRICS = PipelineMetrics(enabled=False)
+
+def add_metrics_arguments(parser):
+    """
+    Adds the shared --metrics-report / --metrics-prometheus / --profile options.
+    """
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument("--metrics-report", metavar="PATH",
+                       help="Write a JSON run report with per-stage timings and counters.")
+    group.add_argument("--metrics-prometheus", metavar="PATH",
+                       help="Write the run metrics in Prometheus textfile-collector format.")
+    group.add_argument("--profile", metavar="PATH", help="Write cProfile stats for the whole run.")
+    group.add_argument("--slowest", type=int, default=10, help="Slowest items kept per stage (default: 10).")
+
+def metrics_from_args(args, run_name):
+    """
+    Returns an enabled PipelineMetrics if any instrumentation option was given,
+    otherwise NULL_METRICS.
+    """
+    if not (args.metrics_report or args.metrics_prometheus or args.profile):
+        return NULL_METRICS
+    return PipelineMetrics(slowest_n=args.slowest, profile_path=args.profile, run_name=run_name)
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _write_atomically(path, text):
+    # Prometheus' textfile collector may read the file at any time, so never
+    # expose a partially written file.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,221 @@
+import os
+import json
+
+def iter_records(file_path, chunk_size=64 * 1024):
+    """
+    Streams records from a JSON Lines file or a legacy JSON array file.
+
+    JSON Lines files (one record per line, as written by triage_and_tag.py) are
+    read line by line. Legacy files holding one JSON array are decoded
+    incrementally, element by element, so the whole array is never held in memory.
+
+    Args:
+        file_path (str): The path to the .jsonl or .json file.
+        chunk_size (int): Number of characters read at a time for JSON arrays.
+
+    Yields:
+        The decoded records, in file order.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        first_char = _peek_first_char(f)
+        if first_char == '[':
+            yield from _iter_json_array(f, chunk_size)
+        elif first_char:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"{file_path}:{line_number}: invalid JSON record: {e}") from e
+
+def is_json_array(file_path):
+    """
+    Returns True for a legacy file holding one JSON array, False for JSON Lines.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return _peek_first_char(f) == '['
+
+def split_json_lines(file_path, chunk_bytes):
+    """
+    Cuts a JSON Lines file into byte ranges of about `chunk_bytes`, so that
+    separate processes can read them with iter_json_lines_range().
+
+    Returns:
+        list: (start, end) byte offsets covering the whole file.
+    """
+    size = os.path.getsize(file_path)
+    chunk_bytes = max(1, chunk_bytes)
+    return [(start, min(start + chunk_bytes, size)) for start in range(0, size, chunk_bytes)]
+
+def iter_json_lines_range(file_path, start, end):
+    """
+    Yields the records of the lines that start within [start, end) of a JSON
+    Lines file. A line crossing `end` belongs to this range, a line crossing
+    `start` to the previous one, so adjacent ranges yield every record once.
+    """
+    with open(file_path, 'rb') as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()  # finish the line the previous range owns
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def _peek_first_char(f):
+    while True:
+        position = f.tell()
+        char = f.read(1)
+        if not char or not char.isspace():
+            f.seek(position)
+            return char
+
+_WHITESPACE = ' \t\r\n'
+_NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+def _number_may_continue(buffer, end):
+    # Until the next non-whitespace character is visible, more digits, a
+    # fraction or an exponent may still follow a number in the next chunk
+    rest = buffer[end:]
+    return not rest.strip(_WHITESPACE) or set(rest) <= _NUMBER_CHARS
+
+class _JsonStream:
+    """
+    Incremental reader over a text file holding one large JSON value: values
+    inside it are decoded one at a time, reading `chunk_size` characters at a
+    time, and consumed input is dropped from the buffer.
+    """
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def _read_more(self):
+        # Read at least as much as is already buffered, so a value spanning many
+        # chunks is only re-scanned a logarithmic number of times
+        more = self.f.read(max(self.chunk_size, len(self.buffer) - self.position))
+        self.eof = not more
+        self.buffer, self.position = self.buffer[self.position:] + more, 0
+
+    def peek(self, skip=_WHITESPACE):
+        """
+        Skips the characters in `skip` and returns the next character, or '' at
+        the end of the file.
+        """
+        while True:
+            buffer, position = self.buffer, self.position
+            while position < len(buffer) and buffer[position] in skip:
+                position += 1
+            self.position = position
+            if position < len(buffer):
+                return buffer[position]
+            if self.eof:
+                return ""
+            self._read_more()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in JSON input")
+        self.position += 1
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                end = None
+
+            # A number is only complete once the character after it has been read;
+            # strings, literals and containers end with an unambiguous character.
+            if end is not None and (self.eof or isinstance(value, bool) or not isinstance(value, (int, float))
+                                    or not _number_may_continue(self.buffer, end)):
+                self.position = end
+                if end > self.chunk_size:
+                    self.buffer, self.position = self.buffer[end:], 0
+                return value
+            self._read_more()
+
+def _iter_json_array(f, chunk_size):
+    stream = _JsonStream(f, chunk_size)
+    stream.expect('[')
+    while True:
+        # Whitespace and separators between elements are skipped
+        char = stream.peek(_WHITESPACE + ',')
+        if char == ']':
+            return
+        if not char:
+            raise ValueError("Unexpected end of file inside JSON array")
+        yield stream.decode()
+
+def is_json_object(file_path):
+    """
+    Returns True for a file holding one JSON object.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return _peek_first_char(f) == '{'
+
+def iter_json_object(file_path, chunk_size=64 * 1024):
+    """
+    Streams the top-level (key, value) pairs of a file holding one JSON object.
+
+    Values are decoded one at a time, so a caller that drops the values it does
+    not need never holds more than the largest single value in memory.
+
+    Args:
+        file_path (str): The path to the .json file.
+        chunk_size (int): Number of characters read at a time.
+
+    Yields:
+        tuple: (key, value), in file order.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        stream = _JsonStream(f, chunk_size)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            key = stream.decode()
+            if not isinstance(key, str):
+                raise ValueError("Expected a string key in JSON object")
+            stream.expect(':')
+            yield key, stream.decode()
+            if stream.peek() != ',':
+                stream.expect('}')
+                return
+            stream.position += 1
+
+class JsonlWriter:
+    """
+    Writes records to a JSON Lines file, one line per record, as they are produced.
+    """
+
+    def __init__(self, file_path, append=False):
+        self.file_path = file_path
+        self.count = 0
+        self._file = open(file_path, 'a' if append else 'w', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        self._file.close()
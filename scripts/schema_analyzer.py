@@ -1,48 +1,258 @@
+import os
+import time
+import heapq
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 
+from record_stream import iter_records, is_json_array, split_json_lines, iter_json_lines_range
+from parse_documents import parse_wiki_link
 
-import json
-from collections import defaultdict
+# --- Configuration ---
+PARSED_DATA_FILE = "/home/rosie/projects/fae-intelligence/scripts/parsed_markdown_data.json"
+CHUNK_BYTES = 32 * 1024 * 1024   # JSON Lines byte range analyzed per task
+CHUNK_RECORDS = 1000             # JSON array records shipped to a worker per task
+TOP_N = 10                       # Rows shown in the fan-in/fan-out rankings
 
-def analyze_parsed_data(input_file):
+class SchemaStats:
     """
-    Analyzes the parsed markdown data to propose a knowledge graph schema.
+    Schema statistics of a stream of documents, accumulated in a single pass.
 
-    Args:
-        input_file (str): The path to the parsed markdown data JSON file.
+    Accepts parsed-data records ({'file_path', 'data': {'metadata', 'content',
+    'links'}}) and triage records ({'file_path', 'metadata', 'content'}, links
+    under metadata). Partial statistics computed by separate processes are
+    combined with merge().
+
+    Memory depends on the number of distinct types, frontmatter fields and link
+    targets, not on the number of documents: per-document fan-out is kept as a
+    histogram plus the TOP_N largest documents.
     """
-    with open(input_file, 'r') as f:
-        data = json.load(f)
 
-    entity_types = set()
-    relationship_types = defaultdict(int)
+    def __init__(self, extractor=None):
+        self.extractor = extractor
+        self.records = 0
+        self.document_types = Counter()      # frontmatter 'type'
+        self.entity_types = Counter()        # extracted entities, by type
+        self.relationship_types = Counter()  # extracted relationships, by type
+        self.field_coverage = Counter()      # frontmatter field -> documents having it
+        self.links = 0
+        self.fan_in = Counter()              # link target -> linking documents
+        self.fan_out = Counter()             # distinct targets per document -> documents
+        self.top_fan_out = []                # min-heap of (distinct targets, file path)
 
-    for item in data:
-        metadata = item.get('data', {}).get('metadata', {})
+    def add(self, item):
+        doc = item.get('data', item)
+        metadata = doc.get('metadata') or {}
+        self.records += 1
+        self.field_coverage.update(metadata.keys())
         if 'type' in metadata:
-            entity_types.add(metadata['type'])
+            self.document_types[str(metadata['type'])] += 1
 
-        links = item.get('data', {}).get('links', [])
+        links = doc.get('links') or metadata.get('links') or []
+        targets = set()
         for link in links:
-            # This is a simplistic way to infer relationship types.
-            # In a real scenario, we would use more sophisticated methods.
-            relationship_types[f"related_to"] += 1
+            target = parse_wiki_link(link)[0]
+            if target:
+                targets.add(target.casefold())
+        self.links += len(links)
+        self.fan_in.update(targets)
+        self.fan_out[len(targets)] += 1
+        if targets:
+            entry = (len(targets), item.get('file_path', ''))
+            if len(self.top_fan_out) < TOP_N:
+                heapq.heappush(self.top_fan_out, entry)
+            else:
+                heapq.heappushpop(self.top_fan_out, entry)
+
+        if self.extractor is not None:
+            content = doc.get('content')
+            if content:
+                extracted = self.extractor(content)
+                self.entity_types.update(entity['type'] for entity in extracted.get('entities', []))
+                self.relationship_types.update(rel['type'] for rel in extracted.get('relationships', []))
+
+    def merge(self, other):
+        self.records += other.records
+        self.document_types.update(other.document_types)
+        self.entity_types.update(other.entity_types)
+        self.relationship_types.update(other.relationship_types)
+        self.field_coverage.update(other.field_coverage)
+        self.links += other.links
+        self.fan_in.update(other.fan_in)
+        self.fan_out.update(other.fan_out)
+        self.top_fan_out = heapq.nlargest(TOP_N, self.top_fan_out + other.top_fan_out)
+        heapq.heapify(self.top_fan_out)
+        return self
+
+    def __getstate__(self):
+        # The extractor stays in the worker; only the counts travel back
+        state = self.__dict__.copy()
+        state['extractor'] = None
+        return state
+
+def _slim(item, keep_content):
+    # Only what SchemaStats.add() reads is sent to the workers
+    doc = item.get('data', item)
+    slim = {'metadata': doc.get('metadata'), 'links': doc.get('links')}
+    if keep_content:
+        slim['content'] = doc.get('content')
+    return {'file_path': item.get('file_path'), 'data': slim}
+
+def _analyze_records(records, extractor):
+    stats = SchemaStats(extractor)
+    for item in records:
+        stats.add(item)
+    return stats
+
+def _analyze_range(input_file, start, end, extractor):
+    return _analyze_records(iter_json_lines_range(input_file, start, end), extractor)
+
+def _iter_batches(records, size, keep_content):
+    batch = []
+    for item in records:
+        batch.append(_slim(item, keep_content))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def collect_schema_stats(input_file, workers=1, extractor=None, chunk_bytes=CHUNK_BYTES,
+                         chunk_records=CHUNK_RECORDS):
+    """
+    Computes SchemaStats for a parsed-data or triage export in one streaming pass.
+
+    With `workers` > 1, JSON Lines files are cut into byte ranges that the worker
+    processes read and parse themselves; legacy JSON arrays are decoded
+    incrementally here and handed out in batches of `chunk_records`. At most two
+    tasks per worker are in flight, so memory stays flat for any file size.
+
+    Args:
+        input_file (str): JSON Lines or legacy JSON array file.
+        workers (int): Number of processes. 1 analyzes serially in-process.
+        extractor (callable): Optional content -> {'entities', 'relationships'}
+                              function (module-level, so workers can import it);
+                              enables the entity and relationship histograms.
+        chunk_bytes (int): Bytes of JSON Lines per task.
+        chunk_records (int): JSON array records per task.
+
+    Returns:
+        SchemaStats: The combined statistics.
+    """
+    if workers <= 1:
+        return _analyze_records(iter_records(input_file), extractor)
+
+    if is_json_array(input_file):
+        tasks = ((_analyze_records, batch, extractor)
+                 for batch in _iter_batches(iter_records(input_file), chunk_records, extractor is not None))
+    else:
+        chunk_bytes = min(chunk_bytes, max(1, os.path.getsize(input_file) // (workers * 4)))
+        tasks = ((_analyze_range, input_file, start, end, extractor)
+                 for start, end in split_json_lines(input_file, chunk_bytes))
+
+    stats = SchemaStats(extractor)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        for function, *args in tasks:
+            in_flight.add(executor.submit(function, *args))
+            if len(in_flight) >= workers * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats.merge(future.result())
+        for future in in_flight:
+            stats.merge(future.result())
+    return stats
 
+def _ranked(counter, n=None):
+    # Most common first, ties by key, so the report does not depend on the order
+    # in which worker results were merged
+    key = lambda item: (-item[1], item[0])
+    return heapq.nsmallest(n, counter.items(), key=key) if n is not None else sorted(counter.items(), key=key)
+
+def print_schema_report(stats):
     print("--- Proposed Knowledge Graph Schema ---")
+    print(f"Analyzed {stats.records} documents.")
+
     print("\n## Entity Types (Nodes):")
-    for entity_type in sorted(list(entity_types)):
-        print(f"- {entity_type}")
+    for entity_type, count in sorted(stats.document_types.items()):
+        print(f"- {entity_type} ({count} documents)")
+    for entity_type, count in sorted(stats.entity_types.items()):
+        print(f"- {entity_type} (extracted {count} times)")
+    if not stats.document_types and not stats.entity_types:
+        print("No entity types found.")
 
     print("\n## Relationship Types (Edges):")
-    for rel_type, count in relationship_types.items():
+    for rel_type, count in _ranked(stats.relationship_types):
         print(f"- {rel_type} (found {count} times)")
+    print(f"- LINKS_TO (wiki links, found {stats.links} times to {len(stats.fan_in)} distinct targets)")
+
+    print("\n## Frontmatter Field Coverage:")
+    if not stats.field_coverage:
+        print("No frontmatter fields found.")
+    for field, count in _ranked(stats.field_coverage):
+        print(f"- {field}: {count}/{stats.records} documents ({count / stats.records:.0%})")
+
+    print("\n## Link Fan-out (distinct targets per document):")
+    linking = stats.records - stats.fan_out.get(0, 0)
+    print(f"{linking} of {stats.records} documents contain wiki links.")
+    for fan_out, file_path in sorted(stats.top_fan_out, reverse=True):
+        print(f"- {os.path.basename(file_path)}: {fan_out}")
+
+    print("\n## Link Fan-in (linking documents per target):")
+    for target, count in _ranked(stats.fan_in, TOP_N):
+        print(f"- {target}: {count}")
+
+def analyze_parsed_data(input_file, workers=1, extractor=None):
+    """
+    Analyzes the parsed markdown data to propose a knowledge graph schema.
+
+    Args:
+        input_file (str): The path to the parsed markdown data file.
+        workers (int): Number of processes used for the analysis.
+        extractor (callable): Optional entity/relationship extractor run on the content.
+
+    Returns:
+        SchemaStats: The statistics the report was printed from.
+    """
+    start = time.perf_counter()
+    stats = collect_schema_stats(input_file, workers=workers, extractor=extractor)
+    print_schema_report(stats)
+    print(f"\nAnalysis took {time.perf_counter() - start:.2f}s.")
+    return stats
 
-def main():
+def analyze_graph_snapshot(directory):
+    """
+    Reports statistics of the ingested graph from a snapshot written by
+    ingest_to_neo4j.py --snapshot, without a database connection.
+
+    Args:
+        directory (str): The snapshot directory.
+    """
+    from graph_snapshot import GraphSnapshot, summarize
+    summarize(GraphSnapshot(directory))
+
+def main(argv=None):
     """
     Main function to run the schema analysis.
     """
-    input_file = "/home/rosie/projects/fae-intelligence/scripts/parsed_markdown_data.json"
-    analyze_parsed_data(input_file)
+    parser = argparse.ArgumentParser(description="Propose a knowledge graph schema from parsed data.")
+    parser.add_argument("--input", default=PARSED_DATA_FILE,
+                        help="Parsed markdown data or triage records (JSON Lines, or a legacy JSON array).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes used for the analysis (default: 1, serial).")
+    parser.add_argument("--extract", action="store_true",
+                        help="Also run the entity extraction used by ingest_to_neo4j.py and report "
+                             "the extracted entity and relationship types.")
+    parser.add_argument("--graph-snapshot", metavar="DIR",
+                        help="Also report statistics of the ingested graph from this snapshot directory.")
+    args = parser.parse_args(argv)
+    extractor = None
+    if args.extract:
+        from entity_extraction import extract_schema_from_content_with_llm as extractor
+    analyze_parsed_data(args.input, workers=args.workers, extractor=extractor)
+    if args.graph_snapshot:
+        print()
+        analyze_graph_snapshot(args.graph_snapshot)
 
 if __name__ == "__main__":
     main()
-
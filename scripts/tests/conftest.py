@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The scripts import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the process-wide parse cache out of the configured cache directory
+os.environ["FAE_PARSE_CACHE"] = "0"
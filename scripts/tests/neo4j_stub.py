@@ -0,0 +1,117 @@
+"""
+In-process stand-in for the neo4j driver: records every query run and the
+parameters passed, so tests can check what would have been written. Node
+merges returning element ids get "<label>:<name>" ids back.
+"""
+
+class StubTransaction:
+
+    def __init__(self, queries):
+        self.queries = queries
+
+    def run(self, query, **params):
+        self.queries.append((query, params))
+        records = []
+        if "AS id" in query:
+            label = query.split("MERGE (", 1)[1].split(":", 1)[1].split(" ", 1)[0]
+            records = [{"name": row["name"], "id": f"{label}:{row['name']}"} for row in params["rows"]]
+        return StubResult(records)
+
+class StubResult(list):
+
+    def consume(self):
+        return None
+
+class StubSession:
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def run(self, query, **params):
+        return StubTransaction(self.driver.queries).run(query, **params)
+
+    def write_transaction(self, work, *args, **kwargs):
+        return work(StubTransaction(self.driver.queries), *args, **kwargs)
+
+    execute_write = write_transaction
+
+class StubDriver:
+
+    def __init__(self):
+        self.queries = []
+
+    def session(self, **kwargs):
+        return StubSession(self)
+
+    def close(self):
+        pass
+
+    def written(self, fragment):
+        """
+        Returns the parameters of the queries containing `fragment`, in order.
+        """
+        return [params for query, params in self.queries if fragment in query]
+
+class AsyncStubResult(StubResult):
+
+    def __aiter__(self):
+        return self._records()
+
+    async def _records(self):
+        for record in self:
+            yield record
+
+    async def consume(self):
+        return None
+
+class AsyncStubTransaction(StubTransaction):
+
+    async def run(self, query, **params):
+        return AsyncStubResult(super().run(query, **params))
+
+class AsyncStubSession:
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def run(self, query, **params):
+        return await AsyncStubTransaction(self.driver.queries).run(query, **params)
+
+    async def execute_write(self, work, *args):
+        # Like the driver's managed transactions: a transaction failing with a
+        # transient error is rolled back and the work function run again
+        while True:
+            queries = []
+            result = await work(AsyncStubTransaction(queries), *args)
+            if self.driver.failures:
+                self.driver.failures -= 1
+                continue
+            self.driver.queries.extend(queries)
+            return result
+
+class AsyncStubDriver(StubDriver):
+    """
+    Async variant; the first `failures` transactions fail with a transient error.
+    """
+
+    def __init__(self, failures=0):
+        super().__init__()
+        self.failures = failures
+
+    def session(self, **kwargs):
+        return AsyncStubSession(self)
+
+    async def close(self):
+        pass
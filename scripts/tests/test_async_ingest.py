@@ -0,0 +1,21 @@
+import asyncio
+
+from async_ingest import AsyncNeo4jIngestor
+
+from neo4j_stub import AsyncStubDriver
+
+DOCUMENTS = [
+    {"file_path": "/notes/a.md", "entities": [{"name": "Python", "type": "Tool"}], "relationships": []},
+    {"file_path": "/notes/b.md", "entities": [{"name": "Docker", "type": "Tool"}], "relationships": []},
+]
+
+def test_batches_are_written_once_after_driver_retries():
+    driver = AsyncStubDriver(failures=2)
+    ingestor = AsyncNeo4jIngestor(driver, writers=2, batch_size=3)
+    stats = asyncio.run(ingestor.ingest(DOCUMENTS))
+
+    assert stats == {"documents": 2, "batches": 2, "retries": 2}
+    contains = [row for params in driver.written(":CONTAINS]->(b)") for row in params["rows"]]
+    assert sorted(row["target_id"] for row in contains) == ["Tool:Docker", "Tool:Python"]
+    # Each batch first drops the previous CONTAINS edges of its documents
+    assert sorted(name for params in driver.written("DELETE r") for name in params["names"]) == ["a.md", "b.md"]
@@ -0,0 +1,15 @@
+import parse_documents
+from benchmark_pipeline import generate_corpus, run_benchmark
+
+def test_parse_and_triage_stages_bypass_the_parse_cache(tmp_path, monkeypatch):
+    def no_cache():
+        raise AssertionError("the benchmark must not use the parse cache")
+    monkeypatch.setattr(parse_documents, "get_parse_cache", no_cache)
+    enabled = parse_documents.PARSE_CACHE_ENABLED
+
+    corpus = generate_corpus(str(tmp_path), 4, formats=("md", "json"), paragraphs_per_doc=2)
+    results = run_benchmark(corpus, stages=("parse", "triage"))
+
+    assert results["parse"]["failures"] == 0
+    assert "skipped" not in results["triage"]
+    assert parse_documents.PARSE_CACHE_ENABLED == enabled
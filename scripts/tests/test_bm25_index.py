@@ -0,0 +1,25 @@
+from bm25_index import BM25Index
+
+def _record(i, text):
+    return {"file_path": f"/notes/doc{i}.md", "content": text,
+            "metadata": {"type": "Markdown", "relevance": 3, "tags": ["notes"]}}
+
+def test_search_after_re_adding_records(tmp_path):
+    index = BM25Index(str(tmp_path))
+    for i in range(10):
+        index.add_record(_record(i, f"neo4j graph note {i}"))
+    index.save()
+    for i in range(2):
+        index.add_record(_record(i, f"neo4j graph note {i} revised"))
+    index.save(compact=False)
+
+    results = index.search("neo4j", top_k=20)
+    assert len(results) == 10
+    assert all(result["score"] > 0 for result in results)
+    assert index.search("revised")[0]["key"] in ("/notes/doc0.md", "/notes/doc1.md")
+
+    # Still correct when the replaced versions are only pending
+    for i in range(2, 9):
+        index.add_record(_record(i, f"neo4j graph note {i} edited"))
+    assert len(index.search("neo4j", top_k=20)) == 10
+    index.close()
@@ -0,0 +1,32 @@
+import json
+import os
+
+from docx import Document
+
+import convert_docs_to_text
+from convert_docs_to_text import CONVERSION_MANIFEST, convert_docx_to_txt
+
+def _docx(path, text):
+    document = Document()
+    document.add_paragraph(text)
+    document.save(path)
+
+def test_outdated_conversions_are_redone(tmp_path, monkeypatch):
+    source, output = tmp_path / "docs", tmp_path / "text"
+    source.mkdir()
+    _docx(source / "a.docx", "Alpha")
+    assert convert_docx_to_txt(str(source), str(output), workers=1)["converted"] == 1
+    assert convert_docx_to_txt(str(source), str(output), workers=1)["skipped"] == 1
+
+    # A new converter version invalidates the earlier output
+    monkeypatch.setattr(convert_docs_to_text, "CONVERTER_VERSION", convert_docs_to_text.CONVERTER_VERSION + 1)
+    assert convert_docx_to_txt(str(source), str(output), workers=1)["converted"] == 1
+
+    # So does a manifest entry written before versions were recorded
+    manifest_path = os.path.join(output, CONVERSION_MANIFEST)
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"a.docx": manifest["a.docx"]["hash"]}, f)
+    assert convert_docx_to_txt(str(source), str(output), workers=1)["converted"] == 1
+    assert (output / "a.txt").read_text(encoding="utf-8") == "Alpha\n"
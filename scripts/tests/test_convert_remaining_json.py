@@ -0,0 +1,45 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+CONVERTER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "knowledge-assets", "Script", "[Script][Relevance-3][automation,code]-convert_remaining_json.py")
+
+@pytest.fixture(scope="module")
+def converter():
+    spec = importlib.util.spec_from_file_location("convert_remaining_json", CONVERTER_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+ANALYSIS = {
+    "videoTitle": "t",
+    "analysisTimestamp": 1234567.25,
+    "transcript": ["dropped", {"nested": [1, 2.5e3, None]}],
+    "coreTopicsDiscussed": ["AI", "Neo4j"],
+    "generalVideoSummary": 'Summary with "quotes" and a } brace',
+    "views": 98765,
+}
+
+def test_streaming_load_with_any_chunk_size(tmp_path, converter):
+    path = tmp_path / "analysis.json"
+    path.write_text(json.dumps(ANALYSIS), encoding="utf-8")
+    expected = {key: value for key, value in ANALYSIS.items() if key in converter.ANALYSIS_KEYS}
+    for chunk_size in range(1, len(path.read_text()) + 2):
+        assert converter.load_analysis_streaming(str(path), chunk_size=chunk_size) == expected
+
+def test_streaming_load_rejects_non_objects(tmp_path, converter):
+    path = tmp_path / "list.json"
+    path.write_text("[1, 2]", encoding="utf-8")
+    assert converter.load_analysis_streaming(str(path)) is None
+
+def test_output_dir_keeps_relative_folders(tmp_path, converter):
+    root = tmp_path / "in"
+    assert converter.output_path_for(str(root / "a" / "notes.json"), str(tmp_path / "out"), str(root)) != \
+        converter.output_path_for(str(root / "b" / "notes.json"), str(tmp_path / "out"), str(root))
+    collisions = converter.find_output_collisions([str(root / "a b.json"), str(root / "a_b.json")],
+                                                  str(tmp_path / "out"), str(root))
+    assert len(collisions) == 1
@@ -0,0 +1,39 @@
+from embedding_pipeline import HashingEmbedder, chunk_id, embed_and_upsert, iter_chunks
+from local_vector_index import LocalVectorIndex
+
+def _embed(index, records, stats):
+    chunks = iter_chunks(records, max_tokens=4, overlap=1, stats=stats, index=index)
+    embed_and_upsert(chunks, HashingEmbedder(dimension=16), index, batch_size=2, concurrency=1, stats=stats)
+
+def test_reembedding_a_document_replaces_its_chunks(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), dimension=16)
+    _embed(index, [{"file_path": "/notes/a.md", "content": "one two three four five six seven"}], {})
+    assert len(index) == 2
+
+    stats = {}
+    _embed(index, [{"file_path": "/notes/a.md", "content": "one two three four eight"}], stats)
+    assert index.ids_for_file("/notes/a.md") == {chunk_id("one two three four"), chunk_id("four eight")}
+    assert len(index) == 2
+    assert stats["deleted"] == 1 and stats["skipped"] == 1
+
+def test_chunk_metadata_has_no_null_values():
+    chunks = list(iter_chunks([{"file_path": "/notes/a.md", "content": "text", "metadata": {"type": None}}]))
+    assert None not in chunks[0]["metadata"].values()
+    assert "type" not in chunks[0]["metadata"]
+
+class _RecordingIndex:
+
+    def __init__(self):
+        self.vectors = []
+
+    def __contains__(self, vector_id):
+        return False
+
+    def upsert(self, vectors):
+        self.vectors.extend(vectors)
+
+def test_upserted_values_are_plain_lists():
+    index = _RecordingIndex()
+    embed_and_upsert(iter_chunks([{"file_path": "/notes/a.md", "content": "text"}]),
+                     HashingEmbedder(dimension=8), index)
+    assert type(index.vectors[0]["values"]) is list
@@ -0,0 +1,26 @@
+import random
+
+from entity_extraction import ENTITY_RULES, extract_schema_from_content_with_llm
+
+def _naive_entities(content):
+    # The original rule semantics: any keyword occurring as a substring fires its rule
+    names = []
+    for name, _, keywords in ENTITY_RULES:
+        if name not in names and any(keyword in content for keyword in keywords):
+            names.append(name)
+    return names
+
+def test_automaton_matches_substring_rules():
+    keywords = [keyword for _, _, rule_keywords in ENTITY_RULES for keyword in rule_keywords]
+    rng = random.Random(0)
+    for _ in range(50):
+        words = rng.sample(keywords, 5) + ["plain", "text", "Gitlab", "MFAs"]
+        rng.shuffle(words)
+        content = " ".join(words)
+        extracted = extract_schema_from_content_with_llm(content)
+        assert [entity["name"] for entity in extracted["entities"]] == _naive_entities(content)
+
+def test_relationships_need_both_endpoints():
+    extracted = extract_schema_from_content_with_llm("We run Docker containers; no orchestration.")
+    assert {"source": "Docker", "target": "Containerization", "type": "FACILITATES"} in extracted["relationships"]
+    assert extract_schema_from_content_with_llm("Docker only")["relationships"] == []
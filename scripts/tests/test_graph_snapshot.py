@@ -0,0 +1,26 @@
+from graph_snapshot import GraphSnapshot, build_from_documents
+
+DOCUMENTS = [
+    {"file_path": "/notes/a.md", "entities": [{"name": "Docker", "type": "Tool"},
+                                              {"name": "Containerization", "type": "Concept"}],
+     "relationships": [{"source": "Docker", "target": "Containerization", "type": "FACILITATES"}]},
+    {"file_path": "/notes/b.md", "entities": [{"name": "Docker", "type": "Tool"},
+                                              {"name": "Containerization", "type": "Concept"}],
+     "relationships": []},
+    {"file_path": "/notes/c.md", "entities": [{"name": "Neo4j", "type": "Tool"}], "relationships": []},
+]
+
+def test_saved_snapshot_round_trips(tmp_path):
+    snapshot = GraphSnapshot(build_from_documents(DOCUMENTS, str(tmp_path)))
+
+    assert snapshot.labels() == {"Source": 3, "Tool": 2, "Concept": 1}
+    assert snapshot.edge_counts == {"CONTAINS": 5, "FACILITATES": 1}
+    source = snapshot.node_id("Source", "a.md")
+    assert snapshot.file_path(source) == "/notes/a.md"
+    assert {snapshot.node(int(n)) for n in snapshot.successors(source, "CONTAINS")} == {
+        ("Tool", "Docker"), ("Concept", "Containerization")}
+
+    labels = snapshot.connected_components()
+    assert labels[snapshot.node_id("Source", "b.md")] == labels[source]
+    assert labels[snapshot.node_id("Source", "c.md")] != labels[source]
+    assert snapshot.co_occurrence() == [(("Tool", "Docker"), ("Concept", "Containerization"), 2)]
@@ -0,0 +1,26 @@
+from hybrid_query import AdjacencySnapshot, HybridQueryEngine
+
+def _engine():
+    snapshot = AdjacencySnapshot()
+    snapshot.add_document({"file_path": "/notes/tools.md", "relationships": [],
+                           "entities": [{"name": "Git", "type": "Tool"}, {"name": "Pip", "type": "Tool"},
+                                        {"name": "VS Code", "type": "Tool"},
+                                        {"name": "Artificial Intelligence", "type": "Concept"}]})
+    return snapshot, HybridQueryEngine(snapshot)
+
+def test_entity_names_match_whole_words_only():
+    snapshot, engine = _engine()
+    git = snapshot.node_ids[("Tool", "Git")]
+    pip = snapshot.node_ids[("Tool", "Pip")]
+
+    assert git not in engine.keyword_seeds("digital transformation")
+    assert pip not in engine.keyword_seeds("a data pipeline")
+    assert git in engine.keyword_seeds("versioning with git, daily")
+    assert snapshot.node_ids[("Tool", "VS Code")] in engine.keyword_seeds("Open it in VS Code.")
+
+def test_rule_keywords_match_whole_words_only():
+    snapshot, engine = _engine()
+    assert engine.keyword_seeds("Pipeline status DETAILS of Gitlab") == {}
+    # Rule keywords still seed their entity, case-insensitively
+    assert engine.keyword_seeds("pushed to GitHub") == {snapshot.node_ids[("Tool", "Git")]: 1.0}
+    assert snapshot.node_ids[("Concept", "Artificial Intelligence")] in engine.keyword_seeds("where ai helps")
@@ -0,0 +1,60 @@
+from ingest_to_neo4j import Neo4jIngestor
+
+from neo4j_stub import StubDriver
+
+def test_reingested_document_replaces_its_contains_edges():
+    driver = StubDriver()
+    ingestor = Neo4jIngestor(None, None, None, driver=driver)
+    ingestor.ingest_data_bulk([
+        {"file_path": "/notes/a.md", "entities": [{"name": "Python", "type": "Tool"}], "relationships": []},
+        # A new version without entities still drops the old edges
+        {"file_path": "/notes/b.md", "entities": [], "relationships": []},
+    ])
+
+    queries = [query for query, _ in driver.queries if "UNWIND" in query]
+    assert "DELETE r" in queries[0] and "CONTAINS" in queries[0]
+    assert driver.written("DELETE r") == [{"names": ["a.md", "b.md"]}]
+    assert driver.written(":CONTAINS]->(b)") == [{"rows": [{"source_id": "Source:a.md", "target_id": "Tool:Python"}]}]
+
+def test_bulk_ingestion_batches_nodes_before_edges():
+    driver = StubDriver()
+    ingestor = Neo4jIngestor(None, None, None, driver=driver)
+    documents = [
+        {"file_path": f"/notes/{i}.md", "entities": [{"name": f"Tool{i}", "type": "Tool"}], "relationships": []}
+        for i in range(5)
+    ]
+    transactions = ingestor.ingest_data_bulk(documents, batch_size=2)
+
+    writes = [query for query, _ in driver.queries if query.startswith("UNWIND")]
+    assert transactions == len(writes)
+    assert all(len(params["rows"]) <= 2 for params in driver.written("UNWIND $rows"))
+    # Every flush merges its nodes before the edges that address them by element id
+    first_edge = next(i for i, query in enumerate(writes) if ":CONTAINS]->(b)" in query)
+    assert any("MERGE (s:Source" in query for query in writes[:first_edge])
+    contains = [row for params in driver.written(":CONTAINS]->(b)") for row in params["rows"]]
+    assert sorted(row["target_id"] for row in contains) == [f"Tool:Tool{i}" for i in range(5)]
+
+def test_relationship_endpoints_resolve_through_the_entity_index():
+    driver = StubDriver()
+    ingestor = Neo4jIngestor(None, None, None, driver=driver)
+    ingestor.ingest_data([{
+        "file_path": "/notes/a.md",
+        "entities": [{"name": "Docker", "type": "Tool"}, {"name": "Containerization", "type": "Concept"}],
+        "relationships": [{"source": "Docker", "target": "Containerization", "type": "FACILITATES"},
+                          {"source": "Docker", "target": "Kubernetes", "type": "FACILITATES"}],
+    }])
+    facilitates = [query for query, _ in driver.queries if "FACILITATES" in query]
+    # The unknown endpoint is skipped, the known ones are matched by their own labels
+    assert len(facilitates) == 1
+    assert "(a:Tool {name: $source_name}), (b:Concept {name: $target_name})" in facilitates[0]
+
+def test_name_constraints_are_created_once_per_label():
+    driver = StubDriver()
+    ingestor = Neo4jIngestor(None, None, None, driver=driver)
+    ingestor.ensure_schema(["Source", "Tool"])
+    ingestor.ensure_schema(["Source", "Tool"])
+    constraints = [query for query, _ in driver.queries if query.startswith("CREATE CONSTRAINT")]
+    assert constraints == [
+        "CREATE CONSTRAINT Source_name_unique IF NOT EXISTS FOR (n:Source) REQUIRE n.name IS UNIQUE",
+        "CREATE CONSTRAINT Tool_name_unique IF NOT EXISTS FOR (n:Tool) REQUIRE n.name IS UNIQUE",
+    ]
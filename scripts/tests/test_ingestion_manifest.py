@@ -0,0 +1,31 @@
+from ingest_to_neo4j import extract_structured_data
+from ingestion_manifest import IngestionManifest
+
+def test_iter_extractions_skips_superseded_versions(tmp_path):
+    with IngestionManifest(str(tmp_path / "manifest.db")) as manifest:
+        manifest.record_extraction("old", "/notes/a.md", {"entities": [{"name": "Git", "type": "Tool"}]})
+        manifest.record_extraction("other", "/notes/b.md", {"entities": []})
+        manifest.mark_ingested(["old", "other"])
+        manifest.record_extraction("new", "/notes/a.md", {"entities": [{"name": "Pip", "type": "Tool"}]})
+
+        latest = list(manifest.iter_extractions())
+        assert [item["file_path"] for item in latest] == ["/notes/a.md", "/notes/b.md"]
+        assert latest[0]["entities"] == [{"name": "Pip", "type": "Tool"}]
+        # The new version is not in Neo4j yet, so the ingested one is what Neo4j holds
+        ingested = list(manifest.iter_extractions(ingested_only=True))
+        assert ingested[0]["entities"] == [{"name": "Git", "type": "Tool"}]
+        assert len(ingested) == 2
+
+def test_rerun_only_extracts_new_or_changed_documents(tmp_path):
+    records = [{"file_path": "/notes/a.md", "content": "Docker"}, {"file_path": "/notes/b.md", "content": "Neo4j"}]
+    with IngestionManifest(str(tmp_path / "manifest.db")) as manifest:
+        processed = []
+        assert len(list(extract_structured_data(records, manifest, processed_hashes=processed))) == 2
+        manifest.mark_ingested(processed)
+
+        records[1] = {"file_path": "/notes/b.md", "content": "Neo4j and Obsidian"}
+        stats = {}
+        delta = list(extract_structured_data(records, manifest, stats=stats))
+        assert [item["file_path"] for item in delta] == ["/notes/b.md"]
+        assert stats["skipped"] == 1
+        assert {entity["name"] for entity in delta[0]["entities"]} == {"Neo4j", "Obsidian"}
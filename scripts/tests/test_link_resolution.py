@@ -0,0 +1,51 @@
+import os
+
+from ingest_to_neo4j import Neo4jIngestor
+from ingestion_manifest import IngestionManifest
+from record_stream import JsonlWriter
+from link_resolution import LinkCollector
+from watch_staging import StagingProcessor
+
+from neo4j_stub import StubDriver
+
+def _note(directory, name, text):
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+def _links(driver):
+    return {(row["source"], row["target"]) for params in driver.written("LINKS_TO]->(b)") for row in params["rows"]}
+
+def test_ingest_links_bulk_replaces_outgoing_links():
+    driver = StubDriver()
+    ingestor = Neo4jIngestor(None, None, None, driver=driver)
+    ingestor.ingest_links_bulk([], replace_sources=["/notes/a.md"])
+    # A note whose links were all removed still has its old edges deleted
+    assert driver.written(":LINKS_TO]->() DELETE") == [{"names": ["a.md"]}]
+
+    driver.queries.clear()
+    ingestor.ingest_links_bulk([("/notes/a.md", "/notes/b.md")], replace_sources=["/notes/a.md"])
+    queries = [query for query, _ in driver.queries if "UNWIND" in query]
+    assert "DELETE r" in queries[0] and "MERGE" in queries[1]
+
+def test_staging_watcher_resolves_links_across_batches(tmp_path):
+    staging = tmp_path / "staging"
+    staging.mkdir()
+    driver = StubDriver()
+    with IngestionManifest(str(tmp_path / "manifest.db")) as manifest, \
+            JsonlWriter(str(tmp_path / "triage.jsonl")) as output:
+        processor = StagingProcessor(Neo4jIngestor(None, None, None, driver=driver), manifest, output,
+                                     destination_dir=str(tmp_path / "organized"),
+                                     link_collector=LinkCollector())
+        first = _note(staging, "alpha.md", "# Alpha\n\nSee [[beta]] about Python.\n")
+        assert processor.process([first]) == []
+        # beta has not arrived yet
+        assert _links(driver) == set()
+
+        driver.queries.clear()
+        second = _note(staging, "beta.md", "# Beta\n\nBack to [[Alpha]] with Docker.\n")
+        assert processor.process([second]) == []
+        # Both directions are written once both ends have been triaged
+        assert _links(driver) == {("beta.md", "alpha.md"), ("alpha.md", "beta.md")}
+        assert driver.written(":LINKS_TO]->() DELETE") == [{"names": ["beta.md"]}]
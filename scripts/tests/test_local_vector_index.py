@@ -0,0 +1,33 @@
+import numpy as np
+
+import local_vector_index
+from local_vector_index import LocalVectorIndex
+
+def _vectors(count, dimension=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dimension)).astype(np.float32)
+
+def test_unflushed_upserts_and_deletes_survive_reopening(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), dimension=8, initial_capacity=2)
+    vectors = _vectors(5)
+    index.upsert([(f"v{i}", vector, {"file_path": f"/notes/{i}.md"}) for i, vector in enumerate(vectors)])
+    index.delete(["v1"])
+    index.upsert([("v3", vectors[0], {"file_path": "/notes/moved.md"})])
+    del index   # No flush()
+
+    reopened = LocalVectorIndex(str(tmp_path), dimension=8)
+    assert len(reopened) == 4 and "v1" not in reopened
+    assert reopened.fetch(["v3"])["v3"]["metadata"] == {"file_path": "/notes/moved.md"}
+    match = reopened.query(vectors[4], top_k=1)["matches"][0]
+    assert match["id"] == "v4"
+
+def test_blocked_search_matches_a_full_scan(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_vector_index, "QUERY_BLOCK_ROWS", 7)
+    index = LocalVectorIndex(str(tmp_path), dimension=8)
+    vectors = _vectors(50)
+    index.upsert([(f"v{i}", vector) for i, vector in enumerate(vectors)])
+    queries = _vectors(3, seed=1)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    for query, result in zip(queries, index.query_batch(queries, top_k=5)):
+        expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+        assert [match["id"] for match in result["matches"]] == [f"v{i}" for i in expected]
@@ -0,0 +1,26 @@
+import pytest
+
+from parse_documents import LazyFrontmatter, parse_markdown
+from verify_markdown_parser import EDGE_CASES, compare
+
+def _write(tmp_path):
+    paths = []
+    for name, text in EDGE_CASES.items():
+        path = tmp_path / name
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        paths.append(str(path))
+    return paths
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_fast_parser_matches_python_frontmatter_on_edge_cases(tmp_path, lazy):
+    assert compare(_write(tmp_path), lazy=lazy) == []
+
+def test_lazy_metadata_is_parsed_on_first_access(tmp_path):
+    path = tmp_path / "note.md"
+    path.write_text("---\ntitle: Lazy\ncreated: 2024-05-01\n---\nbody [[a]]")
+    parsed = parse_markdown(str(path), lazy_metadata=True)
+    metadata = parsed["metadata"]
+    assert isinstance(metadata, LazyFrontmatter) and not metadata.loaded
+    assert parsed["links"] == ["a"]
+    assert metadata["created"] == "2024-05-01" and metadata.loaded
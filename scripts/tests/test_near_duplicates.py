@@ -0,0 +1,27 @@
+import random
+
+from ingestion_manifest import IngestionManifest
+from near_duplicates import NearDuplicateIndex
+
+def _text(seed, words=300):
+    rng = random.Random(seed)
+    return " ".join(f"word{rng.randrange(5000)}" for _ in range(words))
+
+def test_reformatted_copy_is_flagged_and_distinct_text_is_not():
+    index = NearDuplicateIndex()
+    original = _text(0)
+    assert index.check("/notes/a.md", original) is None
+    # The same words with other punctuation, case and line breaks, and one edit
+    variant = original.upper().replace(" ", ",\n", 50) + " appendix"
+    assert index.check("/export/a.pdf", variant) == "/notes/a.md"
+    assert index.check("/notes/b.md", _text(1)) is None
+
+def test_edited_file_replaces_its_previous_version(tmp_path):
+    with IngestionManifest(str(tmp_path / "manifest.db")) as manifest:
+        index = NearDuplicateIndex.from_manifest(manifest)
+        assert index.check("/notes/a.md", _text(0)) is None
+        assert index.check("/notes/a.md", _text(0) + " edited") is None
+        assert len(index) == 1
+        # Signatures persist across runs
+        reloaded = NearDuplicateIndex.from_manifest(manifest)
+        assert reloaded.check("/notes/copy.md", _text(0) + " edited") == "/notes/a.md"
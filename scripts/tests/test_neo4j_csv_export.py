@@ -0,0 +1,23 @@
+import csv
+
+from neo4j_csv_export import Neo4jCsvExporter
+
+def _rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+def test_export_writes_deduplicated_import_files(tmp_path):
+    document = {"file_path": "/notes/a.md",
+                "entities": [{"name": "Docker", "type": "Tool"}, {"name": "Containerization", "type": "Concept"}],
+                "relationships": [{"source": "Docker", "target": "Containerization", "type": "FACILITATES"}]}
+    with Neo4jCsvExporter(str(tmp_path)) as exporter:
+        counts = exporter.export([document, dict(document, file_path="/other/a.md")])
+    assert counts == {"documents": 2, "nodes": 3, "relationships": 3}
+
+    header, data = exporter.node_files["Source"]
+    assert _rows(header) == [["name:ID(Source)", "filePath", ":LABEL"]]
+    assert _rows(data) == [["a.md", "/notes/a.md", "Source"]]
+    header, data = exporter.relationship_files[("FACILITATES", "Tool", "Concept")]
+    assert _rows(header) == [[":START_ID(Tool)", ":END_ID(Concept)", ":TYPE"]]
+    assert _rows(data) == [["Docker", "Containerization", "FACILITATES"]]
+    assert "--relationships=" + ",".join((header, data)) in exporter.import_command()
@@ -0,0 +1,25 @@
+import os
+
+from ingestion_manifest import hash_file
+from parse_cache import ParseCache
+
+def test_moved_file_is_a_hit(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    note = tmp_path / "note.md"
+    note.write_text("# Note\n")
+    cache.put(str(note), {"content": "Note"})
+
+    moved = tmp_path / "organized" / "[Markdown][Relevance-3][notes]-note.md"
+    moved.parent.mkdir()
+    os.replace(note, moved)
+    assert cache.get(str(moved)) == {"content": "Note"}
+    # Same contents under another extension go through another parser
+    assert cache.get(str(moved.with_suffix(".json")), hash_file(str(moved))) is None
+
+def test_overwriting_an_entry_keeps_the_size_accurate(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    note = tmp_path / "note.md"
+    note.write_text("text")
+    for _ in range(3):
+        cache.put(str(note), {"content": "x" * 100})
+    assert cache.stats()["size_bytes"] == sum(size for _, _, size in cache._scan_entries())
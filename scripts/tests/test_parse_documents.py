@@ -0,0 +1,17 @@
+from benchmark_pipeline import _write_docx, _write_pdf
+from parse_documents import iter_document_chunks, parse_document
+
+def test_pdf_pages_are_extracted_in_order(tmp_path):
+    path = str(tmp_path / "doc.pdf")
+    _write_pdf(path, ["first page text", "second page text"], lines_per_page=2)
+
+    chunks = list(iter_document_chunks(path))
+    assert len(chunks) == 2
+    assert "first page text" in chunks[0] and "second page text" in chunks[1]
+    assert parse_document(path, use_cache=False)["content"] == "".join(chunks)
+
+def test_docx_chunks_join_to_the_parsed_content(tmp_path):
+    path = str(tmp_path / "doc.docx")
+    _write_docx(path, ["One.", "Two."])
+    assert list(iter_document_chunks(path)) == ["One.\n", "Two.\n"]
+    assert parse_document(path, use_cache=False)["content"] == "One.\nTwo.\n"
@@ -0,0 +1,28 @@
+import argparse
+import json
+
+from pipeline_metrics import NULL_METRICS, PipelineMetrics, add_metrics_arguments, metrics_from_args
+
+def test_report_keeps_the_slowest_items_per_stage(tmp_path):
+    metrics = PipelineMetrics(slowest_n=2, run_name="triage")
+    for seconds, item in ((0.3, "b.md"), (0.1, "a.md"), (0.5, "c.md")):
+        metrics.record("parse", seconds, item)
+    metrics.incr("files", 3)
+
+    report_path, prometheus_path = tmp_path / "report.json", tmp_path / "metrics.prom"
+    metrics.write_outputs(str(report_path), str(prometheus_path))
+    report = json.loads(report_path.read_text())
+    parse = report["stages"]["parse"]
+    assert parse["calls"] == 3 and parse["max_seconds"] == 0.5
+    assert [entry["item"] for entry in parse["slowest"]] == ["c.md", "b.md"]
+    assert report["counters"] == {"files": 3}
+    assert 'fae_pipeline_count{run="triage",counter="files"} 3' in prometheus_path.read_text()
+
+def test_metrics_are_off_unless_an_output_is_requested():
+    parser = argparse.ArgumentParser()
+    add_metrics_arguments(parser)
+    assert metrics_from_args(parser.parse_args([]), "triage") is NULL_METRICS
+    with NULL_METRICS.stage("parse", "a.md"):
+        NULL_METRICS.incr("files")
+    assert NULL_METRICS.stages == {} and NULL_METRICS.counters == {}
+    assert metrics_from_args(parser.parse_args(["--metrics-report", "r.json"]), "triage").enabled
@@ -0,0 +1,19 @@
+import json
+
+import pytest
+
+from record_stream import iter_records
+
+RECORDS = [12345, -6.25e-3, 7, {"file_path": "/a.md", "tags": ["x"], "n": 10}, "text", True, None, 0.5, [1, 22]]
+
+@pytest.mark.parametrize("separators", [(",", ":"), (", ", ": ")])
+def test_json_array_with_one_char_chunks(tmp_path, separators):
+    path = tmp_path / "records.json"
+    path.write_text(json.dumps(RECORDS, separators=separators), encoding="utf-8")
+    assert list(iter_records(str(path), chunk_size=1)) == RECORDS
+
+def test_numbers_split_across_chunks(tmp_path):
+    path = tmp_path / "numbers.json"
+    path.write_text("[1234, 56.78e2 ,\n 9]", encoding="utf-8")
+    for chunk_size in range(1, 8):
+        assert list(iter_records(str(path), chunk_size=chunk_size)) == [1234, 5678.0, 9]
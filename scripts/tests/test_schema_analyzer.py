@@ -0,0 +1,21 @@
+from schema_analyzer import SchemaStats, print_schema_report
+
+def _stats(*items):
+    stats = SchemaStats()
+    for item in items:
+        stats.add(item)
+    return stats
+
+def _report(capsys, first, second):
+    print_schema_report(SchemaStats().merge(first).merge(second))
+    return capsys.readouterr().out
+
+def test_report_does_not_depend_on_merge_order(capsys):
+    docs = [
+        {"file_path": "/notes/a.md", "metadata": {"type": "Note", "links": ["Zeta", "Alpha"]}},
+        {"file_path": "/notes/b.md", "metadata": {"tags": [], "links": ["Mu"]}},
+    ]
+    forward = _report(capsys, _stats(docs[0]), _stats(docs[1]))
+    backward = _report(capsys, _stats(docs[1]), _stats(docs[0]))
+    assert forward == backward
+    assert forward.index("- alpha: 1") < forward.index("- mu: 1") < forward.index("- zeta: 1")
@@ -0,0 +1,17 @@
+from triage_and_tag import iter_triage_results
+
+def _strip_timings(results):
+    return [(path, metadata, content, error) for path, metadata, content, error, _ in results]
+
+def test_process_pool_yields_serial_results_in_input_order(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"note{i}.md"
+        path.write_text(f"---\ntitle: Note {i}\n---\n# Note {i}\n\nDocker and [[note{i + 1}]].\n")
+        paths.append(str(path))
+    paths.append(str(tmp_path / "missing.md"))
+
+    serial = _strip_timings(iter_triage_results(paths, workers=1))
+    parallel = _strip_timings(iter_triage_results(paths, workers=2))
+    assert [result[0] for result in parallel] == paths
+    assert parallel == serial
@@ -0,0 +1,17 @@
+import triage_classifier
+from triage_classifier import CONTENT_RULES, TriageClassifier
+
+def test_last_matching_rule_sets_type_and_all_add_tags():
+    result = TriageClassifier().classify("A Strategy with a Python SCRIPT.", ".md")
+    assert result == {"type": "Code", "relevance": 3, "tags": ["planning", "development", "text", "notes"]}
+    assert TriageClassifier().classify("", ".pdf") == {"type": "PDF", "relevance": 3,
+                                                      "tags": ["document", "external"]}
+
+def test_compiled_automaton_agrees_with_substring_checks(monkeypatch):
+    docs = [("quarterly report and plan", ".md"), ("nothing to see", ".docx"), ("Shell script", ".sh"), ("", ".py")]
+    inline = TriageClassifier().classify_batch(docs)
+    monkeypatch.setattr(triage_classifier, "INLINE_KEYWORD_LIMIT", 0)
+    compiled = TriageClassifier(CONTENT_RULES)
+    assert compiled._automaton is not None
+    assert compiled.classify_batch(docs) == inline
+    assert [compiled.classify(content, extension) for content, extension in docs] == inline
@@ -0,0 +1,18 @@
+from ingest_to_neo4j import Neo4jIngestor
+from ingestion_manifest import IngestionManifest
+from record_stream import JsonlWriter, iter_records
+from watch_staging import StagingProcessor
+
+from neo4j_stub import StubDriver
+
+def test_files_deleted_before_processing_are_dropped_from_the_batch(tmp_path):
+    staging = tmp_path / "staging"
+    staging.mkdir()
+    kept = staging / "kept.md"
+    kept.write_text("# Kept\n\nAbout Python.\n")
+    with IngestionManifest(str(tmp_path / "manifest.db")) as manifest, \
+            JsonlWriter(str(tmp_path / "triage.jsonl")) as output:
+        processor = StagingProcessor(Neo4jIngestor(None, None, None, driver=StubDriver()), manifest, output,
+                                     destination_dir=str(tmp_path / "organized"))
+        assert processor.process([str(staging / "gone.md"), str(kept)]) == []
+    assert [record["file_path"] for record in iter_records(str(tmp_path / "triage.jsonl"))] == [str(kept)]
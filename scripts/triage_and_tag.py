@@ -1,14 +1,23 @@
 import os
 import shutil
-import json
-from parse_documents import parse_document # Import the new parsing utility
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from parse_documents import parse_document, get_parse_cache # Import the new parsing utility
+from ingestion_manifest import IngestionManifest, MANIFEST_PATH, hash_file
+from triage_classifier import get_triage_classifier
+from record_stream import JsonlWriter
+from pipeline_metrics import NULL_METRICS, add_metrics_arguments, metrics_from_args
 
 # --- Configuration ---
 STAGING_DIR = "/home/rosie/projects/fae-intelligence/knowledge-staging"
 DESTINATION_DIR = "/home/rosie/projects/fae-intelligence/knowledge-assets"
-PROCESSED_DATA_OUTPUT = "/home/rosie/projects/fae-intelligence/scripts/triage_output.json"
+# JSON Lines: one record per triaged file, written as each file is processed
+PROCESSED_DATA_OUTPUT = "/home/rosie/projects/fae-intelligence/scripts/triage_output.jsonl"
+# Optional BM25 full-text index updated with each triaged file (--search-index)
+SEARCH_INDEX_DIR = "/home/rosie/projects/fae-intelligence/.search-index"
 
-def triage_file_with_llm(file_path):
+def triage_file_with_llm(file_path, timings=None, use_cache=True):
     """
     **Placeholder for LLM-based file triage.**
 
@@ -17,15 +26,21 @@ def triage_file_with_llm(file_path):
 
     Args:
         file_path (str): The absolute path to the file.
+        timings (dict): If given, receives the time spent in 'parse' and in the
+                        whole 'triage' call, in seconds.
+        use_cache (bool): Whether parse_document may use the parse cache.
 
     Returns:
         tuple: A tuple containing (dict: metadata, str: content_text).
     """
+    start = time.perf_counter()
     file_name = os.path.basename(file_path)
     file_extension = os.path.splitext(file_path)[1].lower()
 
     # Use the parse_document function to get parsed data (dict with 'content', 'metadata', 'links')
-    parsed_data = parse_document(file_path)
+    parsed_data = parse_document(file_path, use_cache=use_cache)
+    if timings is not None:
+        timings['parse'] = time.perf_counter() - start
 
     if not parsed_data:
         return {"type": "Unknown", "relevance": 0, "tags": ["error"]}, ""
@@ -41,39 +56,16 @@ def triage_file_with_llm(file_path):
     tags = initial_metadata.get('tags', ["untagged"]) # Use tags from frontmatter if available
 
     # --- SIMULATED LLM ANALYSIS ---
-    if content_text:
-        if "strategy" in content_text.lower() or "plan" in content_text.lower():
-            suggested_type = "StrategyDoc"
-            relevance = 5
-            tags.append("planning")
-        if "report" in content_text.lower() or "analysis" in content_text.lower():
-            suggested_type = "Report"
-            relevance = 4
-            tags.append("analysis")
-        if "code" in content_text.lower() or "script" in content_text.lower():
-            suggested_type = "Code"
-            relevance = 3
-            tags.append("development")
-
-    # Fallback/refinement based on file extension if content analysis is not specific enough
-    if file_extension == '.md':
-        if suggested_type == "Document": suggested_type = "Markdown"
-        tags.extend(["text", "notes"])
-    elif file_extension == '.pdf':
-        if suggested_type == "Document": suggested_type = "PDF"
-        tags.extend(["document", "external"])
-    elif file_extension == '.json':
-        if suggested_type == "Document": suggested_type = "JSON"
-        tags.extend(["data", "configuration"])
-    elif file_extension == '.docx':
-        if suggested_type == "Document": suggested_type = "WordDocument"
-        tags.extend(["document", "office"])
-    elif file_extension in ('.sh', '.py'):
-        if suggested_type == "Document": suggested_type = "Script"
-        tags.extend(["automation", "code"])
-
-    # Remove duplicates from tags
-    tags = list(set(tags))
+    # Content keywords and the file-extension fallbacks come from the compiled
+    # triage rule table; the content is lowercased and scanned once.
+    classification = get_triage_classifier().classify(content_text, file_extension, suggested_type, relevance)
+    suggested_type = classification['type']
+    relevance = classification['relevance']
+    tags.extend(classification['tags'])
+
+    # Remove duplicates from tags, keeping first-seen order so that the generated
+    # file names do not depend on the (per-process) string hash seed
+    tags = list(dict.fromkeys(tags))
 
     # Combine initial metadata with LLM-derived metadata
     final_metadata = {
@@ -84,12 +76,105 @@ def triage_file_with_llm(file_path):
         "links": links # Add extracted wiki links to metadata
     }
 
+    if timings is not None:
+        timings['triage'] = time.perf_counter() - start
     return final_metadata, content_text
 
-def main():
+def _triage_worker(file_path):
+    """
+    Triages a single file, isolating any failure to that file.
+
+    Runs in a worker process when triage is parallelized, so it must stay a
+    module-level function.
+
+    Args:
+        file_path (str): The absolute path to the file.
+
+    Returns:
+        tuple: (file_path, metadata, content_text, error, timings). `error` is
+               None on success, otherwise a description of the failure.
+               `timings` holds the per-stage durations measured in the worker.
+    """
+    timings = {}
+    try:
+        metadata, content = triage_file_with_llm(file_path, timings=timings)
+        return file_path, metadata, content, None, timings
+    except Exception as e:
+        return file_path, None, None, f"{type(e).__name__}: {e}", timings
+
+def iter_triage_results(source_paths, workers=1):
+    """
+    Triages files, in a process pool when `workers` > 1.
+
+    Results are yielded in the same order as `source_paths`, regardless of which
+    worker finishes first.
+
+    Args:
+        source_paths (list): Absolute paths of the files to triage.
+        workers (int): Number of worker processes. 1 triages serially in-process.
+
+    Yields:
+        tuple: (file_path, metadata, content_text, error, timings) per file.
+    """
+    if workers <= 1:
+        for source_path in source_paths:
+            yield _triage_worker(source_path)
+        return
+
+    chunksize = max(1, len(source_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_triage_worker, source_paths, chunksize=chunksize)
+
+def organize_file(source_path, metadata, destination_dir=DESTINATION_DIR, metrics=NULL_METRICS):
+    """
+    Moves a triaged file to <destination_dir>/<type>/ under its organized name,
+    "[<type>][Relevance-<n>][<tags>]-<original name>".
+
+    Returns:
+        str: The destination path.
+    """
+    file_name = os.path.basename(source_path)
+    # 1. Create the new, organized file name
+    tag_str = ",".join(metadata['tags'])
+    new_file_name = f"[{metadata['type']}][Relevance-{metadata['relevance']}][{tag_str}]-{file_name}"
+
+    # 2. Create the destination directory based on type
+    type_dir = os.path.join(destination_dir, metadata['type'])
+    os.makedirs(type_dir, exist_ok=True)
+
+    # 3. Move and rename the file
+    destination_path = os.path.join(type_dir, new_file_name)
+    print(f"  - Moving {file_name} -> {destination_path}")
+    with metrics.stage("move", file_name):
+        file_size = os.path.getsize(source_path)
+        shutil.move(source_path, destination_path)
+    metrics.incr("bytes", file_size)
+    return destination_path
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Triage, tag and organize files from the staging directory.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes used to parse and triage files (default: 1, serial).")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-triage every file, ignoring results cached in the ingestion manifest.")
+    parser.add_argument("--output", default=PROCESSED_DATA_OUTPUT,
+                        help="JSON Lines file the triage records are written to.")
+    parser.add_argument("--search-index", metavar="DIR", nargs="?", const=SEARCH_INDEX_DIR,
+                        help="Also add the triaged files to the BM25 full-text index in DIR "
+                             f"(see bm25_index.py; default: {SEARCH_INDEX_DIR}).")
+    parser.add_argument("--no-dedupe", action="store_true",
+                        help="Do not flag near-duplicates of files triaged in this or earlier runs "
+                             "(see near_duplicates.py).")
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """
     Main function to drive the triage and organization process.
     """
+    args = parse_args(argv)
+    metrics = metrics_from_args(args, run_name="triage")
+
     print(f"Starting triage process for directory: {STAGING_DIR}")
 
     if not os.path.exists(STAGING_DIR):
@@ -97,50 +182,123 @@ def main():
         print("Please create it and place files there for triage.")
         return
 
-    files_to_process = [f for f in os.listdir(STAGING_DIR) if os.path.isfile(os.path.join(STAGING_DIR, f))]
+    # Sorted so that moves and the output manifest are deterministic.
+    files_to_process = sorted(f for f in os.listdir(STAGING_DIR) if os.path.isfile(os.path.join(STAGING_DIR, f)))
 
     if not files_to_process:
         print("No files found in the staging directory. Nothing to do.")
         return
 
     print(f"Found {len(files_to_process)} files to triage...")
+    if args.workers > 1:
+        print(f"Parsing and triaging with {args.workers} worker processes.")
+
+    failed_files = []
 
-    processed_data_for_ingestion = []
+    manifest = IngestionManifest(MANIFEST_PATH)
+    source_paths = [os.path.join(STAGING_DIR, f) for f in files_to_process]
+
+    # Files whose content hash is already in the manifest reuse their stored parse
+    # and triage results; only new or changed files are parsed and triaged.
+    content_hashes = {}
+    cached_results = {}
+    for source_path in source_paths:
+        try:
+            content_hashes[source_path] = hash_file(source_path)
+        except OSError as e:
+            print(f"  - Could not hash {os.path.basename(source_path)}: {e}")
+            content_hashes[source_path] = None
+            continue
+        if not args.full:
+            cached = manifest.get_triage(content_hashes[source_path])
+            if cached:
+                cached_results[source_path] = cached
+
+    paths_to_triage = [p for p in source_paths if p not in cached_results]
+    if cached_results:
+        print(f"{len(cached_results)} files are unchanged since a previous run; reusing their triage results.")
+    triage_results = iter_triage_results(paths_to_triage, workers=args.workers)
+    output = JsonlWriter(args.output)
+    search_index = None
+    if args.search_index:
+        from bm25_index import BM25Index
+        search_index = BM25Index(args.search_index)
+    duplicates = None
+    if not args.no_dedupe:
+        from near_duplicates import NearDuplicateIndex
+        duplicates = NearDuplicateIndex.from_manifest(manifest)
+
+    for source_path in source_paths:
+        file_name = os.path.basename(source_path)
+        content_hash = content_hashes[source_path]
+        if source_path in cached_results:
+            metadata, content = cached_results[source_path]
+            error = None
+            metrics.incr("files_cached")
+        else:
+            _, metadata, content, error, timings = next(triage_results)
+            for stage, seconds in timings.items():
+                metrics.record(stage, seconds, file_name)
+            if not error and content_hash and "error" not in metadata.get('tags', []):
+                manifest.record_triage(content_hash, source_path, metadata, content)
+
+        # 1. Get AI-powered metadata and content (files that failed stay in staging)
+        if error:
+            print(f"  - Error triaging {file_name}: {error}. Leaving it in staging.")
+            failed_files.append(file_name)
+            metrics.incr("files_failed")
+            continue
+
+        metrics.incr("files")
+        metrics.incr("content_chars", len(content))
+
+        # Near-duplicates (the same report as PDF, DOCX and TXT, re-exports) are
+        # flagged with the file they duplicate and skipped by ingest_to_neo4j.py
+        if duplicates is not None and content:
+            with metrics.stage("dedupe", file_name):
+                duplicate_of = duplicates.check(source_path, content, content_hash)
+            if duplicate_of:
+                print(f"  - {file_name} is a near-duplicate of {os.path.basename(duplicate_of)}")
+                metadata = {**metadata, "duplicate_of": duplicate_of}
+                metrics.incr("duplicates")
 
-    for file_name in files_to_process:
-        source_path = os.path.join(STAGING_DIR, file_name)
-        
-        # 1. Get AI-powered metadata and content
-        metadata, content = triage_file_with_llm(source_path)
-        
         # Store data for later ingestion
-        processed_data_for_ingestion.append({
+        record = {
             "file_path": source_path,
+            "content_hash": content_hash,
             "metadata": metadata,
             "content": content
-        })
-
-        # 2. Create the new, organized file name
-        tag_str = ",".join(metadata['tags'])
-        new_file_name = f"[{metadata['type']}][Relevance-{metadata['relevance']}][{tag_str}]-{file_name}"
-        
-        # 3. Create the destination directory based on type
-        type_dir = os.path.join(DESTINATION_DIR, metadata['type'])
-        os.makedirs(type_dir, exist_ok=True)
-        
-        # 4. Move and rename the file
-        destination_path = os.path.join(type_dir, new_file_name)
-        print(f"  - Moving {file_name} -> {destination_path}")
-        shutil.move(source_path, destination_path)
+        }
+        output.write(record)
+        if search_index is not None:
+            with metrics.stage("index", file_name):
+                search_index.add_record(record)
 
-    # Write the processed data to a JSON file for the ingestion script
-    with open(PROCESSED_DATA_OUTPUT, 'w', encoding='utf-8') as f:
-        json.dump(processed_data_for_ingestion, f, indent=2)
-    print(f"\nProcessed data saved to: {PROCESSED_DATA_OUTPUT}")
+        # 2. Move and rename the file into the organized tree
+        organize_file(source_path, metadata, metrics=metrics)
+
+    manifest.close()
+    output.close()
+    print(f"\nProcessed data saved to: {args.output}")
+    if search_index is not None:
+        search_index.save()
+        search_index.close()
+        print(f"Search index updated: {args.search_index} ({len(search_index)} documents)")
 
     print("\n--- Triage Complete ---")
-    print(f"Successfully organized {len(files_to_process)} files.")
+    print(f"Successfully organized {output.count} files.")
     print(f"Files have been moved and renamed in: {DESTINATION_DIR}")
+    parse_cache = get_parse_cache()
+    if parse_cache is not None and args.workers <= 1:
+        cache_stats = parse_cache.stats()
+        print(f"Parse cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.0%} hit rate), {cache_stats['evictions']} evictions.")
+    if failed_files:
+        print(f"{len(failed_files)} files could not be triaged and were left in {STAGING_DIR}:")
+        for file_name in failed_files:
+            print(f"  - {file_name}")
+
+    metrics.write_outputs(args.metrics_report, args.metrics_prometheus)
 
 if __name__ == "__main__":
     main()
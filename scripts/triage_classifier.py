@@ -0,0 +1,149 @@
+import os
+import json
+
+from keyword_automaton import KeywordAutomaton
+
+# --- Triage Rules (Simulated LLM Logic) ---
+# Content rules fire when any of their keywords occurs in the lowercased content.
+# Every matching rule adds its tags; the type and relevance of the last matching
+# rule win. Each document is lowercased once; small tables (like the built-in
+# one) are matched with plain substring checks, larger ones are compiled once into
+# a single keyword automaton, so a document is scanned once however many rules
+# are defined.
+#
+# Set FAE_TRIAGE_RULES to a JSON file with the same structure
+# ({"content_rules": [...], "extension_rules": {...}}) to replace the built-in table.
+TRIAGE_RULES_PATH = os.environ.get("FAE_TRIAGE_RULES")
+
+CONTENT_RULES = [
+    {"keywords": ["strategy", "plan"], "type": "StrategyDoc", "relevance": 5, "tags": ["planning"]},
+    {"keywords": ["report", "analysis"], "type": "Report", "relevance": 4, "tags": ["analysis"]},
+    {"keywords": ["code", "script"], "type": "Code", "relevance": 3, "tags": ["development"]},
+]
+
+# Fallback/refinement by file extension: the type replaces the default type only,
+# the tags are always added.
+EXTENSION_RULES = {
+    ".md": {"type": "Markdown", "tags": ["text", "notes"]},
+    ".pdf": {"type": "PDF", "tags": ["document", "external"]},
+    ".json": {"type": "JSON", "tags": ["data", "configuration"]},
+    ".docx": {"type": "WordDocument", "tags": ["document", "office"]},
+    ".sh": {"type": "Script", "tags": ["automation", "code"]},
+    ".py": {"type": "Script", "tags": ["automation", "code"]},
+}
+
+DEFAULT_TYPE = "Document"
+DEFAULT_RELEVANCE = 3
+
+# Up to this many distinct keywords, one `in` check per keyword (a C-level scan
+# each) is faster than the pure-Python automaton; they break even at about 80.
+INLINE_KEYWORD_LIMIT = 64
+
+class TriageClassifier:
+    """
+    Compiled triage rule table.
+
+    Content keywords are lowercased and mapped to the rules they trigger. Tables
+    with more than INLINE_KEYWORD_LIMIT keywords are compiled into one
+    KeywordAutomaton, so classification cost depends on the document length, not
+    on the number of rules; smaller tables use substring checks.
+    """
+
+    def __init__(self, content_rules=CONTENT_RULES, extension_rules=EXTENSION_RULES, default_type=DEFAULT_TYPE):
+        self.content_rules = list(content_rules)
+        self.extension_rules = dict(extension_rules)
+        self.default_type = default_type
+        self._rules_by_keyword = {}
+        for index, rule in enumerate(self.content_rules):
+            for keyword in rule["keywords"]:
+                self._rules_by_keyword.setdefault(keyword.lower(), []).append(index)
+        self._keywords = list(self._rules_by_keyword)
+        self._automaton = None
+        if len(self._keywords) > INLINE_KEYWORD_LIMIT:
+            self._automaton = KeywordAutomaton(self._keywords)
+
+    @classmethod
+    def from_json(cls, path):
+        """
+        Loads a rule table from a JSON file with 'content_rules' and optionally
+        'extension_rules' and 'default_type'; missing sections use the built-in ones.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+        return cls(table.get("content_rules", CONTENT_RULES),
+                   table.get("extension_rules", EXTENSION_RULES),
+                   table.get("default_type", DEFAULT_TYPE))
+
+    def _find(self, lowered):
+        if self._automaton is not None:
+            return self._automaton.find_all(lowered)
+        return [keyword for keyword in self._keywords if keyword in lowered]
+
+    def _apply(self, keywords, extension, suggested_type, relevance):
+        matched = sorted({index for keyword in keywords for index in self._rules_by_keyword[keyword]})
+        tags = []
+        for index in matched:
+            rule = self.content_rules[index]
+            suggested_type = rule["type"]
+            relevance = rule["relevance"]
+            tags.extend(rule["tags"])
+        extension_rule = self.extension_rules.get(extension)
+        if extension_rule:
+            if suggested_type == self.default_type:
+                suggested_type = extension_rule["type"]
+            tags.extend(extension_rule["tags"])
+        return {"type": suggested_type, "relevance": relevance, "tags": tags}
+
+    def classify(self, content, extension, suggested_type=DEFAULT_TYPE, relevance=DEFAULT_RELEVANCE):
+        """
+        Classifies one document.
+
+        Args:
+            content (str): The document text.
+            extension (str): The lowercased file extension, e.g. '.md'.
+            suggested_type (str): Type before classification (e.g. from frontmatter).
+            relevance (int): Relevance before classification.
+
+        Returns:
+            dict: 'type', 'relevance' and the 'tags' to add, in rule order.
+        """
+        keywords = self._find(content.lower()) if content else ()
+        return self._apply(keywords, extension, suggested_type, relevance)
+
+    def classify_batch(self, docs):
+        """
+        Classifies many documents; with a compiled automaton, in a single pass
+        over all of them.
+
+        Args:
+            docs (iterable): (content, extension) tuples, or dicts with 'content',
+                             'extension' and optionally 'type' and 'relevance'.
+
+        Returns:
+            list: One classify() result per document, in input order.
+        """
+        items = []
+        for doc in docs:
+            if isinstance(doc, dict):
+                items.append((doc.get("content") or "", doc.get("extension", ""),
+                              doc.get("type", self.default_type), doc.get("relevance", DEFAULT_RELEVANCE)))
+            else:
+                items.append((doc[0] or "", doc[1], self.default_type, DEFAULT_RELEVANCE))
+        lowered = [content.lower() for content, _, _, _ in items]
+        if self._automaton is not None:
+            found = self._automaton.find_all_batch(lowered)
+        else:
+            found = [self._find(content) for content in lowered]
+        return [self._apply(keywords, extension, suggested_type, relevance)
+                for keywords, (_, extension, suggested_type, relevance) in zip(found, items)]
+
+_classifier = None
+
+def get_triage_classifier():
+    """
+    Returns the process-wide classifier, compiling the rule table on first use.
+    """
+    global _classifier
+    if _classifier is None:
+        _classifier = TriageClassifier.from_json(TRIAGE_RULES_PATH) if TRIAGE_RULES_PATH else TriageClassifier()
+    return _classifier
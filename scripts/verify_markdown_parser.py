@@ -0,0 +1,142 @@
+import io
+import os
+import re
+import sys
+import time
+import contextlib
+import shutil
+import argparse
+import datetime
+import tempfile
+
+import frontmatter
+
+from parse_documents import parse_markdown
+
+# --- Configuration ---
+KNOWLEDGE_ASSETS_DIR = "/home/rosie/projects/fae-intelligence/knowledge-assets"
+
+# Edge cases of the frontmatter grammar, checked in addition to the real notes
+EDGE_CASES = {
+    "empty.md": "",
+    "no_frontmatter.md": "# Title\nBody with [[Link]] and [[Other#Heading|alias]].",
+    "yaml.md": "---\ntitle: Test Doc\ntags: [a, b]\ncreated: 2024-05-01\nupdated: 2024-05-01 10:30:00\n---\n# Hello\n[[wiki link]]",
+    "long_delimiters.md": "-----   \ntitle: x\n------\nbody",
+    "unterminated.md": "---\ntitle: x\nbody without a closing delimiter",
+    "empty_yaml.md": "---\n---\nbody",
+    "scalar_yaml.md": "---\njust a string\n---\nbody",
+    "list_yaml.md": "---\n- a\n- b\n---\nbody",
+    "crlf.md": "---\r\ntitle: crlf\r\n---\r\nbody [[a]]\r\n",
+    "leading_space.md": "\n\n  ---\ntitle: x\n---\nbody",
+    "json.md": '{\n"title": "json"\n}\nbody',
+    "dashes_in_body.md": "---\ntitle: x\n---\nintro\n---\nafter a rule",
+    "multiline_links.md": "[[not\nclosed]] [[a|b]] [[c\\|d]] [[]]",
+}
+
+def legacy_parse_markdown(file_path):
+    """
+    The original parse_markdown (frontmatter.load plus an uncompiled link regex),
+    kept as the reference the fast path is checked against.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            post = frontmatter.load(f)
+
+        links = re.findall(r'\[\[(.*?)\]\]', post.content)
+
+        metadata = post.metadata
+        for key, value in metadata.items():
+            if isinstance(value, (datetime.datetime, datetime.date)):
+                metadata[key] = value.isoformat()
+
+        return {
+            "metadata": metadata,
+            "content": post.content,
+            "links": links
+        }
+    except Exception as e:
+        return ("error", type(e).__name__)
+
+def _fast(file_path, lazy):
+    result = parse_markdown(file_path, lazy_metadata=lazy)
+    if result is None:
+        return None
+    if lazy:
+        # Invalid YAML only raises once the lazy metadata is accessed
+        try:
+            result["metadata"] = dict(result["metadata"])
+        except Exception:
+            return None
+    return result
+
+def compare(paths, lazy=False):
+    """
+    Parses every file with both parsers and returns the paths whose results differ.
+    """
+    mismatches = []
+    for path in paths:
+        expected = legacy_parse_markdown(path)
+        actual = _fast(path, lazy)
+        if isinstance(expected, tuple):
+            # The legacy parser failed; the fast path must fail as well (None)
+            if actual is not None:
+                mismatches.append(path)
+        elif actual != expected:
+            mismatches.append(path)
+    return mismatches
+
+def time_parser(parse, paths, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            parse(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def find_markdown_files(root):
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        paths.extend(os.path.join(dirpath, name) for name in filenames if name.endswith('.md'))
+    return sorted(paths)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the fast Markdown parser against python-frontmatter.")
+    parser.add_argument("root", nargs="?", default=KNOWLEDGE_ASSETS_DIR,
+                        help=f"Directory searched for .md files (default: {KNOWLEDGE_ASSETS_DIR}).")
+    args = parser.parse_args(argv)
+
+    edge_dir = tempfile.mkdtemp(prefix="md_edge_cases_")
+    try:
+        edge_paths = []
+        for name, text in EDGE_CASES.items():
+            path = os.path.join(edge_dir, name)
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+            edge_paths.append(path)
+        paths = edge_paths + find_markdown_files(args.root)
+
+        results = []
+        # parse_markdown reports unparseable files on stdout; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            for lazy in (False, True):
+                results.append(("lazy" if lazy else "eager", compare(paths, lazy=lazy)))
+            legacy = time_parser(legacy_parse_markdown, paths)
+            fast = time_parser(parse_markdown, paths)
+            lazy = time_parser(lambda path: parse_markdown(path, lazy_metadata=True), paths)
+
+        failures = 0
+        for mode, mismatches in results:
+            failures += len(mismatches)
+            print(f"{mode}: {len(paths) - len(mismatches)}/{len(paths)} files identical")
+            for path in mismatches:
+                print(f"  MISMATCH: {path}")
+        print(f"legacy: {legacy * 1000:.1f} ms, fast: {fast * 1000:.1f} ms ({legacy / fast:.1f}x), "
+              f"lazy metadata: {lazy * 1000:.1f} ms ({legacy / lazy:.1f}x) for {len(paths)} files")
+    finally:
+        shutil.rmtree(edge_dir)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+import os
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import argparse
+
+from triage_and_tag import (STAGING_DIR, DESTINATION_DIR, PROCESSED_DATA_OUTPUT, SEARCH_INDEX_DIR,
+                            iter_triage_results, organize_file)
+from ingest_to_neo4j import (Neo4jIngestor, extract_structured_data, ingest_links, NEO4J_URI, NEO4J_USER,
+                             NEO4J_PASSWORD, BATCH_SIZE)
+from ingestion_manifest import IngestionManifest, MANIFEST_PATH, hash_file
+from record_stream import JsonlWriter
+from pipeline_metrics import NULL_METRICS, add_metrics_arguments, metrics_from_args
+
+# --- Configuration ---
+DEBOUNCE_SECONDS = 2.0   # A file is processed once it has been quiet for this long
+POLL_INTERVAL = 1.0      # Scan interval of the polling watcher
+MAX_BATCH_FILES = 50     # Files triaged and ingested per micro-batch
+RETRY_SECONDS = 30.0     # Delay before a batch that failed to ingest is retried
+
+# Names of files that are still being written by editors, browsers and sync tools
+IGNORED_PREFIXES = ('.', '~$')
+IGNORED_SUFFIXES = ('~', '.tmp', '.part', '.crdownload', '.swp')
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+def is_candidate(file_name):
+    return not (file_name.startswith(IGNORED_PREFIXES) or file_name.endswith(IGNORED_SUFFIXES))
+
+class InotifyWatcher:
+    """
+    Reports files closed after writing or moved into a directory, via Linux inotify.
+    """
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout):
+        """
+        Blocks up to `timeout` seconds and returns the names of the changed files.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        names = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """
+    Portable fallback: rescans the directory and reports new or modified files.
+    """
+
+    def __init__(self, directory, interval=POLL_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self._state = self._scan()
+
+    def _scan(self):
+        state = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    state[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return state
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        state = self._scan()
+        changed = {name for name, signature in state.items() if self._state.get(name) != signature}
+        self._state = state
+        return changed
+
+    def close(self):
+        pass
+
+def create_watcher(directory, polling=False, interval=POLL_INTERVAL):
+    if not polling:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"inotify is not available ({e}); falling back to polling every {interval}s.")
+    return PollingWatcher(directory, interval)
+
+class StagingProcessor:
+    """
+    Triages, organizes and ingests micro-batches of staged files.
+
+    The Neo4j driver, manifest and output file stay open for the lifetime of the
+    daemon, so a batch costs only its own triage, extraction and write transactions.
+    """
+
+    def __init__(self, ingestor, manifest, output, workers=1, batch_size=BATCH_SIZE,
+                 destination_dir=DESTINATION_DIR, search_index=None, duplicates=None, link_collector=None,
+                 metrics=NULL_METRICS):
+        self.ingestor = ingestor
+        self.manifest = manifest
+        self.output = output
+        self.destination_dir = destination_dir
+        self.workers = workers
+        self.batch_size = batch_size
+        self.search_index = search_index
+        self.duplicates = duplicates
+        # Optional LinkCollector, kept across batches, for LINKS_TO edges
+        self.link_collector = link_collector
+        self.metrics = metrics
+
+    def process(self, source_paths):
+        """
+        Handles one micro-batch. Files that fail to triage stay in staging.
+
+        Files are only written to the triage output and moved out of staging once
+        their batch has been ingested, so a batch that raises (e.g. while Neo4j
+        is unavailable) leaves every file in staging, and the manifest still
+        lists them as not ingested for the retry.
+
+        Returns:
+            list: The paths that could not be triaged.
+        """
+        records = []
+        failed = []
+        hashes = {}
+        for source_path in source_paths:
+            try:
+                hashes[source_path] = hash_file(source_path)
+            except FileNotFoundError:
+                # Deleted or moved away again after its change was reported
+                print(f"  - {os.path.basename(source_path)} no longer exists. Skipping it.")
+        source_paths = list(hashes)
+        paths_to_triage = []
+        for source_path in source_paths:
+            cached = self.manifest.get_triage(hashes[source_path])
+            if cached:
+                records.append((source_path, *cached))
+            else:
+                paths_to_triage.append(source_path)
+
+        for source_path, metadata, content, error, timings in iter_triage_results(paths_to_triage, self.workers):
+            for stage, seconds in timings.items():
+                self.metrics.record(stage, seconds, os.path.basename(source_path))
+            if error or "error" in metadata.get('tags', []):
+                print(f"  - Error triaging {os.path.basename(source_path)}: {error or 'could not parse'}. "
+                      "Leaving it in staging.")
+                failed.append(source_path)
+                continue
+            self.manifest.record_triage(hashes[source_path], source_path, metadata, content)
+            records.append((source_path, metadata, content))
+
+        triage_records = []
+        for source_path, metadata, content in records:
+            if self.duplicates is not None and content:
+                duplicate_of = self.duplicates.check(source_path, content, hashes[source_path])
+                if duplicate_of:
+                    print(f"  - {os.path.basename(source_path)} is a near-duplicate of {os.path.basename(duplicate_of)}")
+                    metadata = {**metadata, "duplicate_of": duplicate_of}
+                    self.metrics.incr("duplicates")
+            triage_records.append({"file_path": source_path, "content_hash": hashes[source_path],
+                                   "metadata": metadata, "content": content})
+            if self.link_collector is not None:
+                self.link_collector.add_record(triage_records[-1])
+
+        processed_hashes = []
+        structured_data = extract_structured_data(triage_records, self.manifest,
+                                                  processed_hashes=processed_hashes, metrics=self.metrics)
+        self.ingestor.ingest_data_bulk(structured_data, batch_size=self.batch_size)
+        if self.link_collector is not None:
+            ingest_links(self.ingestor, self.link_collector, self.manifest, processed_hashes,
+                         batch_size=self.batch_size)
+        self.manifest.mark_ingested(processed_hashes)
+
+        for record in triage_records:
+            self.output.write(record)
+            if self.search_index is not None:
+                self.search_index.add_record(record)
+            try:
+                organize_file(record["file_path"], record["metadata"], self.destination_dir, metrics=self.metrics)
+            except OSError as e:
+                print(f"  - Could not move {os.path.basename(record['file_path'])} out of staging: {e}")
+            self.metrics.incr("files")
+        if self.search_index is not None:
+            self.search_index.save()
+        return failed
+
+def watch(directory, processor, watcher, debounce=DEBOUNCE_SECONDS, max_batch=MAX_BATCH_FILES, once=False,
+          retry=RETRY_SECONDS):
+    """
+    Runs the watch loop: collects changed files, waits until each has been quiet
+    for `debounce` seconds, and hands them to `processor` in batches of up to
+    `max_batch` files. Files already in the directory at start-up are processed
+    first. With `once`, returns after the start-up batch.
+
+    A batch that raises is logged and its files are retried after `retry`
+    seconds; the loop itself keeps running.
+    """
+    pending = {}   # file name -> time of the last event
+    failed = {}    # file name -> (size, mtime_ns) when it failed; retried once it changes
+    now = time.monotonic()
+    for name in os.listdir(directory):
+        pending[name] = now - debounce
+
+    while True:
+        now = time.monotonic()
+        ready = sorted(name for name, last_event in pending.items() if now - last_event >= debounce)
+        while ready:
+            batch, ready = ready[:max_batch], ready[max_batch:]
+            paths = []
+            for name in batch:
+                del pending[name]
+                path = os.path.join(directory, name)
+                if not is_candidate(name):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if not os.path.isfile(path) or failed.get(name) == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                paths.append(path)
+            if not paths:
+                continue
+            start = time.perf_counter()
+            print(f"Processing {len(paths)} staged files...")
+            try:
+                failed_paths = processor.process(paths)
+            except Exception as e:
+                print(f"Error processing batch of {len(paths)} files: {e!r}. Retrying in {retry:.0f}s.")
+                # The retry becomes due once `retry` seconds have passed
+                retry_at = time.monotonic() + retry - debounce
+                for path in paths:
+                    pending[os.path.basename(path)] = retry_at
+                continue
+            for path in failed_paths:
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                failed[os.path.basename(path)] = (stat.st_size, stat.st_mtime_ns)
+            print(f"Batch of {len(paths)} files triaged and ingested in {time.perf_counter() - start:.2f}s.")
+        if once:
+            return
+
+        timeout = debounce
+        if pending:
+            timeout = max(0.05, min(debounce - (now - last_event) for last_event in pending.values()))
+        for name in watcher.wait(timeout):
+            pending[name] = max(pending.get(name, 0.0), time.monotonic())
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Watch the staging directory and triage and ingest new files in micro-batches.")
+    parser.add_argument("--directory", default=STAGING_DIR, help=f"Directory to watch (default: {STAGING_DIR}).")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS,
+                        help=f"Seconds a file must be quiet before it is processed (default: {DEBOUNCE_SECONDS}).")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_FILES,
+                        help=f"Maximum files per micro-batch (default: {MAX_BATCH_FILES}).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes used to triage a batch (default: 1, serial).")
+    parser.add_argument("--poll", action="store_true", help="Poll the directory instead of using inotify.")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL,
+                        help=f"Seconds between scans when polling (default: {POLL_INTERVAL}).")
+    parser.add_argument("--output", default=PROCESSED_DATA_OUTPUT,
+                        help="JSON Lines file the triage records are appended to.")
+    parser.add_argument("--search-index", metavar="DIR", nargs="?", const=SEARCH_INDEX_DIR,
+                        help="Also add each batch to the BM25 full-text index in DIR "
+                             f"(see bm25_index.py; default: {SEARCH_INDEX_DIR}).")
+    parser.add_argument("--no-dedupe", action="store_true",
+                        help="Do not flag near-duplicates of earlier files (see near_duplicates.py).")
+    parser.add_argument("--no-links", action="store_true",
+                        help="Do not resolve wiki links into LINKS_TO edges (see link_resolution.py).")
+    parser.add_argument("--retry", type=float, default=RETRY_SECONDS,
+                        help=f"Seconds before a batch that failed is retried (default: {RETRY_SECONDS}).")
+    parser.add_argument("--once", action="store_true",
+                        help="Process the files currently in staging and exit.")
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    metrics = metrics_from_args(args, run_name="watch")
+    if not os.path.isdir(args.directory):
+        print(f"Error: Staging directory not found at {args.directory}")
+        return
+
+    manifest = IngestionManifest(MANIFEST_PATH)
+    output = JsonlWriter(args.output, append=True)
+    ingestor = Neo4jIngestor(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, metrics=metrics)
+    watcher = create_watcher(args.directory, polling=args.poll, interval=args.poll_interval)
+    search_index = None
+    if args.search_index:
+        from bm25_index import BM25Index
+        search_index = BM25Index(args.search_index)
+    duplicates = None
+    if not args.no_dedupe:
+        from near_duplicates import NearDuplicateIndex
+        duplicates = NearDuplicateIndex.from_manifest(manifest)
+    link_collector = None
+    if not args.no_links:
+        from link_resolution import LinkCollector
+        link_collector = LinkCollector()
+    try:
+        ingestor.ensure_schema()
+        processor = StagingProcessor(ingestor, manifest, output, workers=args.workers,
+                                     search_index=search_index, duplicates=duplicates,
+                                     link_collector=link_collector, metrics=metrics)
+        print(f"Watching {args.directory} (debounce {args.debounce}s, {type(watcher).__name__}). Press Ctrl+C to stop.")
+        watch(args.directory, processor, watcher, debounce=args.debounce, max_batch=args.max_batch, once=args.once,
+              retry=args.retry)
+    except KeyboardInterrupt:
+        print("\nStopping watcher.")
+    finally:
+        watcher.close()
+        if search_index is not None:
+            search_index.close()
+        ingestor.close()
+        output.close()
+        manifest.close()
+        metrics.write_outputs(args.metrics_report, args.metrics_prometheus)
+
+if __name__ == "__main__":
+    main()